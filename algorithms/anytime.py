@@ -0,0 +1,152 @@
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from algorithms.base import Algorithm
+from core.grid import Grid
+from core.heuristics import manhattan
+from core.metrics import Instrumentation, Metrics
+from core.pqueue import BinaryHeap
+
+Coord = Tuple[int, int]
+
+INF = float('inf')
+
+# Clock reads are batched: the deadline is checked every this many expansions
+_CLOCK_EVERY = 64
+
+
+class ARAStar(Algorithm):
+    """Anytime Repairing A* (Likhachev, Gordon and Thrun).
+
+    Runs weighted A* with ``epsilon`` first and publishes that path, then
+    lowers epsilon by ``decrement`` per iteration down to ``final_epsilon``.
+    Each iteration reuses the g-values and the open list of the previous one;
+    cells that improve after they were expanded wait in an INCONS list
+    instead of being re-expanded within the same iteration.
+
+    ``search`` stops at ``deadline_ms`` (wall clock from the call) or after
+    ``max_expansions`` and returns the best path found so far. ``Metrics``
+    gets the proven ``suboptimality_bound`` of that path (cost <= bound *
+    optimal) and a ``solution_trace`` of every published solution.
+    The heuristic must be admissible for the bound to hold.
+    """
+
+    def __init__(self, epsilon: float = 3.0, decrement: float = 0.5, final_epsilon: float = 1.0,
+                 heuristic=manhattan, instrumentation: Instrumentation = Instrumentation.FULL):
+        if final_epsilon < 1.0 or epsilon < final_epsilon:
+            raise ValueError("need epsilon >= final_epsilon >= 1")
+        if decrement <= 0:
+            raise ValueError("decrement must be positive")
+        self.epsilon = epsilon
+        self.decrement = decrement
+        self.final_epsilon = final_epsilon
+        self.heuristic = heuristic
+        self.instrumentation = instrumentation
+
+    def search(self, grid: Grid, start: Coord, goal: Coord, deadline_ms: Optional[float] = None,
+               max_expansions: Optional[int] = None) -> Tuple[List[Coord], Metrics]:
+        self._refresh_heuristic()
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        deadline_ns = None if deadline_ms is None else start_ns + deadline_ms * 1_000_000
+        tracing = self.instrumentation >= Instrumentation.FULL
+        h = self.heuristic
+
+        g: Dict[Coord, float] = {start: 0.0}
+        parents: Dict[Coord, Coord] = {}
+        eps = self.epsilon
+        open_queue = BinaryHeap()
+        open_queue.push(start, eps * h(start, goal))
+        incons: Set[Coord] = set()
+        best_path: List[Coord] = []
+
+        while True:
+            # -- ImprovePath: weighted A* that expands each cell at most once --
+            closed: Set[Coord] = set()
+            stopped = False
+            while open_queue:
+                f_min = open_queue.pop()
+                if g.get(goal, INF) <= f_min[0]:
+                    # goal's f is no worse than anything left: put the cell back
+                    open_queue.push(f_min[1], f_min[0])
+                    break
+                if len(open_queue) + 1 > metrics.max_open_size:
+                    metrics.max_open_size = len(open_queue) + 1
+                current = f_min[1]
+                closed.add(current)
+                if tracing and current not in metrics.explored:
+                    metrics.explored.add(current)
+                    metrics.explored_order[current] = metrics.nodes_expanded
+                metrics.nodes_expanded += 1
+
+                g_cur = g[current]
+                for nb, cost in grid.successors(current):
+                    cand = g_cur + cost
+                    if cand < g.get(nb, INF):
+                        g[nb] = cand
+                        parents[nb] = current
+                        if nb in closed:
+                            incons.add(nb)
+                        else:
+                            open_queue.push(nb, cand + eps * h(nb, goal))
+
+                if max_expansions is not None and metrics.nodes_expanded >= max_expansions:
+                    stopped = True
+                    break
+                if (deadline_ns is not None and metrics.nodes_expanded % _CLOCK_EVERY == 0
+                        and time.perf_counter_ns() >= deadline_ns):
+                    stopped = True
+                    break
+
+            if stopped:
+                break
+
+            g_goal = g.get(goal, INF)
+            if g_goal == INF:
+                break  # open list exhausted: no path
+            # bound from the smallest unexpanded g + h (open and inconsistent cells)
+            lower = min((g[s] + h(s, goal) for s in set(open_queue) | incons), default=g_goal)
+            bound = min(eps, g_goal / lower) if lower > 0 else 1.0
+            best_path = _extract(parents, start, goal)
+            metrics.suboptimality_bound = max(bound, 1.0)
+            metrics.solution_trace.append(((time.perf_counter_ns() - start_ns) / 1_000_000.0,
+                                           g_goal, metrics.suboptimality_bound))
+            if bound <= self.final_epsilon:
+                break
+
+            # next iteration: lower epsilon, merge INCONS into OPEN, re-key
+            eps = max(self.final_epsilon, eps - self.decrement)
+            rekeyed = BinaryHeap()
+            for s in set(open_queue) | incons:
+                rekeyed.push(s, g[s] + eps * h(s, goal))
+            open_queue = rekeyed
+            incons = set()
+
+        metrics.path_length = len(best_path)
+        metrics.end_timer(start_ns)
+        return best_path, metrics
+
+
+class WeightedAStar(ARAStar):
+    """Weighted A*: f = g + epsilon * h, path cost within ``epsilon`` of optimal.
+
+    A single ARA* iteration, so cells are never re-expanded; accepts the same
+    ``deadline_ms`` and ``max_expansions`` limits.
+    """
+
+    def __init__(self, epsilon: float = 2.0, heuristic=manhattan,
+                 instrumentation: Instrumentation = Instrumentation.FULL):
+        super().__init__(epsilon=epsilon, decrement=1.0, final_epsilon=epsilon,
+                         heuristic=heuristic, instrumentation=instrumentation)
+
+
+def _extract(parents: Dict[Coord, Coord], start: Coord, goal: Coord) -> List[Coord]:
+    path = [goal]
+    while path[-1] != start:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path
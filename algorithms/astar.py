@@ -1,68 +1,141 @@
 from __future__ import annotations
-import heapq
-import itertools
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
 
-from algorithms.base import Algorithm
-from core.metrics import Metrics
+from algorithms.base import Algorithm, GoalPath
+from algorithms.stepper import Steps, drain
+from core.metrics import Instrumentation, Metrics
 from core.grid import Grid
-from core.heuristics import manhattan
+from core.heuristics import manhattan, zero
+from core.pqueue import queue_factory
 
 Coord = Tuple[int, int]
 
+INF = float('inf')
+
+
+def _reconstruct(parents: Dict[Coord, Coord], start: Coord, goal: Coord) -> List[Coord]:
+    path: List[Coord] = [goal]
+    while path[-1] != start:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path
+
 
 class AStar(Algorithm):
-    def __init__(self, heuristic=manhattan):
+    """A* over ``Grid.successors``.
+
+    ``queue`` selects the open-list backend from ``core.pqueue.QUEUES``
+    ('binary', 'dary', 'bucket', 'radix') or is a zero-argument factory. The
+    integer backends need integer costs and a consistent integer heuristic.
+    """
+
+    def __init__(self, heuristic=manhattan, instrumentation: Instrumentation = Instrumentation.FULL,
+                 queue: Union[str, Callable[[], object]] = 'binary'):
         self.heuristic = heuristic
+        self.instrumentation = instrumentation
+        self.queue = queue
+        self._make_queue = queue_factory(queue)
 
     def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
+        self._refresh_heuristic()
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        path = drain(self._steps(grid, start, goal, metrics))
+        metrics.path_length = len(path)
+        metrics.end_timer(start_ns)
+        return path, metrics
+
+    def search_many(self, grid: Grid, start: Coord, goals: Iterable[Coord],
+                    k: int = 1) -> Tuple[List[GoalPath], Metrics]:
+        """Nearest ``k`` of ``goals`` from one A* expansion, nearest first.
+
+        The heuristic is the minimum of ``heuristic(v, g)`` over all goals,
+        which stays consistent when ``heuristic`` is, so goals are settled in
+        order of their true cost. The search stops at the ``k``-th goal.
+        Evaluating h costs O(len(goals)); for large goal sets Dijkstra is
+        usually faster.
+        """
+        self._refresh_heuristic()
         start_ns = Metrics().start_timer()
         metrics = Metrics()
-        step_counter = [0]  # Use list to allow increment in nested scope
+        targets = self._reachable_goals(grid, start, goals, k, metrics)
+        found: List[GoalPath] = []
+        if targets:
+            heuristic = self.heuristic
+            if heuristic is zero:
+                def h(v: Coord) -> float:
+                    return 0.0
+            elif len(targets) == 1:
+                only = targets[0]
 
-        open_heap: List[Tuple[float, int, Coord]] = []
-        counter = itertools.count()
+                def h(v: Coord) -> float:
+                    return heuristic(v, only)
+            else:
+                def h(v: Coord) -> float:
+                    return min([heuristic(v, g) for g in targets])
+            drain(self._expand(grid, start, set(targets), h, metrics, found, k))
+        if found:
+            metrics.path_length = len(found[0].path)
+        metrics.end_timer(start_ns)
+        return found, metrics
+
+    def _steps(self, grid: Grid, start: Coord, goal: Coord, metrics: Metrics) -> Steps:
+        heuristic = self.heuristic
+
+        def h(v: Coord) -> float:
+            return heuristic(v, goal)
+        return self._expand(grid, start, {goal}, h, metrics, [], 1)
+
+    def _expand(self, grid: Grid, start: Coord, goals: Set[Coord], h: Callable[[Coord], float], metrics: Metrics,
+                found: List[GoalPath], k: int) -> Steps:
+        """The A* loop behind ``search``, ``search_many`` and ``stepper``.
+
+        Yields after every expansion. Each goal popped from the open list is
+        removed from ``goals`` and appended to ``found``; the search returns
+        that goal's path once ``k`` goals are found or none remain, and []
+        when the open list runs dry.
+        """
+        counting = self.instrumentation >= Instrumentation.COUNTERS
+        tracing = self.instrumentation >= Instrumentation.FULL
+        open_queue = self._make_queue()
         g_score: Dict[Coord, float] = {start: 0.0}
         parents: Dict[Coord, Coord] = {}
+        open_queue.push(start, h(start))
 
-        f0 = self.heuristic(start, goal)
-        heapq.heappush(open_heap, (f0, next(counter), start))
-
-        open_set = {start}
-
-        while open_heap:
-            metrics.max_open_size = max(metrics.max_open_size, len(open_heap))
-            _, _, current = heapq.heappop(open_heap)
-            open_set.discard(current)
-
-            if current == goal:
-                # reconstruct
-                path: List[Coord] = []
-                node = current
-                while True:
-                    path.append(node)
-                    if node == start:
-                        break
-                    node = parents[node]
-                path.reverse()
-                metrics.path_length = len(path)
-                metrics.end_timer(start_ns)
-                return path, metrics
-
-            metrics.nodes_expanded += 1
-            metrics.explored.add(current)
-            metrics.explored_order[current] = step_counter[0]
-            step_counter[0] += 1
-
-            for neighbor in grid.neighbors(current):
-                tentative_g = g_score[current] + grid.get_cost(current, neighbor)
-                if tentative_g < g_score.get(neighbor, float('inf')):
+        while open_queue:
+            if counting and len(open_queue) > metrics.max_open_size:
+                metrics.max_open_size = len(open_queue)
+            _, current = open_queue.pop()
+
+            if current in goals:
+                goals.discard(current)
+                path = _reconstruct(parents, start, current)
+                found.append(GoalPath(current, g_score[current], path))
+                if len(found) == k or not goals:
+                    return path
+
+            if counting:
+                if tracing:
+                    metrics.explored.add(current)
+                    metrics.explored_order[current] = metrics.nodes_expanded
+                metrics.nodes_expanded += 1
+
+            pushed: List[Coord] = []
+            g_cur = g_score[current]
+            for neighbor, cost in grid.successors(current):
+                tentative_g = g_cur + cost
+                if tentative_g < g_score.get(neighbor, INF):
                     parents[neighbor] = current
                     g_score[neighbor] = tentative_g
-                    f = tentative_g + self.heuristic(neighbor, goal)
-                    if neighbor not in open_set:
-                        heapq.heappush(open_heap, (f, next(counter), neighbor))
-                        open_set.add(neighbor)
+                    # re-queues cells whose g improved, even after they were expanded;
+                    # an infinite heuristic proves the goal unreachable from there
+                    f = tentative_g + h(neighbor)
+                    if f != INF:
+                        open_queue.push(neighbor, f)
+                        pushed.append(neighbor)
+            yield current, pushed
 
-        metrics.end_timer(start_ns)
-        return [], metrics
+        return []
@@ -1,15 +1,84 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List, Tuple
-from core.metrics import Metrics
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+from algorithms.stepper import SearchStepper, Steps
+from core.metrics import Instrumentation, Metrics
 from core.grid import Grid
 
 Coord = Tuple[int, int]
 
 
+@dataclass
+class GoalPath:
+    """One goal reached by ``search_many``: its path cost and the path to it."""
+
+    goal: Coord
+    cost: float
+    path: List[Coord]
+
+
 class Algorithm(ABC):
     """Base algorithm interface. Implementations should not rely on global state."""
 
+    # Bookkeeping level honoured by algorithms that support it (see Instrumentation)
+    instrumentation: Instrumentation = Instrumentation.FULL
+
     @abstractmethod
     def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
         """Return path (list of coords from start to goal inclusive) and Metrics."""
+
+    def stepper(self, grid: Grid, start: Coord, goal: Coord) -> SearchStepper:
+        """Return a SearchStepper that runs this search incrementally.
+
+        Only algorithms that implement ``_steps`` support stepping.
+        """
+        self._refresh_heuristic()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            return SearchStepper(None, metrics)
+        return SearchStepper(self._steps(grid, start, goal, metrics), metrics)
+
+    def search_many(self, grid: Grid, start: Coord, goals: Iterable[Coord],
+                    k: int = 1) -> Tuple[List[GoalPath], Metrics]:
+        """Find the ``k`` goals nearest to ``start`` in one expansion, nearest first.
+
+        Fewer are returned when fewer are reachable. Only algorithms that
+        support several goals implement this.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support several goals")
+
+    def _steps(self, grid: Grid, start: Coord, goal: Coord, metrics: Metrics) -> Steps:
+        raise NotImplementedError(f"{type(self).__name__} does not support stepping")
+
+    def _refresh_heuristic(self) -> None:
+        # Heuristics with state derived from the grid (core.landmarks.LandmarkTable)
+        # rebuild in ``refresh`` after edits; called before a search starts its
+        # clock so the rebuild is not timed as part of the search
+        refresh = getattr(getattr(self, 'heuristic', None), 'refresh', None)
+        if refresh is not None:
+            refresh()
+
+    @staticmethod
+    def reject_unreachable(grid: Grid, start: Coord, goal: Coord, metrics: Metrics) -> bool:
+        """True if the grid's connectivity index proves there is no path.
+
+        Grids without an index (see ``Grid.enable_connectivity_index``) are
+        never rejected. The short-circuit is recorded in ``metrics``.
+        """
+        index = getattr(grid, 'connectivity', None)
+        if index is None or index.may_connect(start, goal):
+            return False
+        metrics.rejected_unreachable = 1
+        return True
+
+    @classmethod
+    def _reachable_goals(cls, grid: Grid, start: Coord, goals: Iterable[Coord], k: int,
+                         metrics: Metrics) -> List[Coord]:
+        # goals the connectivity index cannot rule out, in first-seen order
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        kept = [g for g in dict.fromkeys(goals) if not cls.reject_unreachable(grid, start, g, metrics)]
+        if kept:
+            metrics.rejected_unreachable = 0
+        return kept
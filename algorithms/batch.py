@@ -0,0 +1,177 @@
+from __future__ import annotations
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from core.grid import Grid
+from core.gridfile import MappedGrid, write_grid
+from core.heuristics import for_grid
+from core.metrics import Metrics
+
+Coord = Tuple[int, int]
+Query = Tuple[Coord, Coord]
+Chunk = List[Tuple[int, Coord, Coord]]  # (query index, start, goal)
+
+# Each worker's view of the shared grid and its copy of the algorithm, set up
+# once by _init_worker
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_grid: Optional[MappedGrid] = None
+_worker_algorithm = None
+
+
+@dataclass
+class QueryResult:
+    """Answer to one query of a batch; ``index`` is its position in the input."""
+
+    index: int
+    start: Coord
+    goal: Coord
+    path: List[Coord]
+    metrics: Metrics
+
+
+class BatchRun:
+    """Iterator over the results of ``solve_many`` in completion order.
+
+    ``totals`` merges the metrics of every result yielded so far (see
+    ``Metrics.merge``); ``completed`` and ``solved`` count results and found
+    paths. Call ``close`` (or use as a context manager) to stop early; queued
+    chunks are cancelled and the shared grid is released.
+    """
+
+    def __init__(self, results: Iterator[QueryResult], total: int) -> None:
+        self._results = results
+        self.total = total
+        self.completed = 0
+        self.solved = 0
+        self.totals = Metrics()
+
+    def __iter__(self) -> 'BatchRun':
+        return self
+
+    def __next__(self) -> QueryResult:
+        result = next(self._results)
+        self.completed += 1
+        self.solved += bool(result.path)
+        self.totals.merge(result.metrics)
+        return result
+
+    def __enter__(self) -> 'BatchRun':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._results.close()
+
+
+def schedule(queries: Sequence[Query], estimate: Callable[[Coord, Coord], float], workers: int,
+             factor: int = 4) -> List[Chunk]:
+    """Cut queries into chunks, longest estimated queries first.
+
+    Each chunk takes about 1 / (``factor`` * ``workers``) of the estimated
+    work still unassigned, so the long queries at the front travel in small
+    chunks, the short tail in larger ones, and the final chunks shrink to
+    even out the finish across workers.
+    """
+    cost = [estimate(s, g) + 1.0 for s, g in queries]  # +1: even a trivial query costs something
+    order = sorted(range(len(queries)), key=cost.__getitem__, reverse=True)
+    remaining = sum(cost)
+    chunks: List[Chunk] = []
+    chunk: Chunk = []
+    work = 0.0
+    target = remaining / (factor * workers)
+    for i in order:
+        chunk.append((i, queries[i][0], queries[i][1]))
+        work += cost[i]
+        if work >= target:
+            chunks.append(chunk)
+            remaining -= work
+            chunk, work = [], 0.0
+            target = remaining / (factor * workers)
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _init_worker(shm_name: str, algorithm, straight_cost: float, diagonal_cost: float, corner_cutting: int,
+                 connectivity: bool) -> None:
+    global _worker_shm, _worker_grid, _worker_algorithm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_grid = MappedGrid.from_buffer(_worker_shm.buf, straight_cost=straight_cost, diagonal_cost=diagonal_cost,
+                                          corner_cutting=corner_cutting, name=shm_name)
+    if connectivity:
+        _worker_grid.enable_connectivity_index()
+    _worker_algorithm = algorithm
+
+
+def _solve_chunk(chunk: Chunk) -> List[Tuple[int, List[Coord], Metrics]]:
+    out = []
+    for index, start, goal in chunk:
+        path, metrics = _worker_algorithm.search(_worker_grid, start, goal)
+        # per-cell traces stay in the worker; only counters travel back
+        metrics.explored = set()
+        metrics.explored_order = {}
+        out.append((index, path, metrics))
+    return out
+
+
+def _run_local(grid: Grid, queries: Sequence[Query], algorithm) -> Iterator[QueryResult]:
+    for index, (start, goal) in enumerate(queries):
+        path, metrics = algorithm.search(grid, start, goal)
+        yield QueryResult(index, start, goal, path, metrics)
+
+
+def _run_pool(grid: Grid, queries: Sequence[Query], algorithm, workers: int, factor: int) -> Iterator[QueryResult]:
+    buf = io.BytesIO()
+    write_grid(grid, buf)
+    data = buf.getbuffer()
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shm.buf[:len(data)] = data
+        del data
+        buf.close()
+        chunks = schedule(queries, for_grid(grid), workers, factor)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(shm.name, algorithm, grid.straight_cost, grid.diagonal_cost,
+                                             int(grid.corner_cutting), grid.connectivity is not None))
+        try:
+            # submission order is the LPT order: workers take the long chunks first
+            futures = [pool.submit(_solve_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for index, path, metrics in future.result():
+                    start, goal = queries[index]
+                    yield QueryResult(index, start, goal, path, metrics)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def solve_many(grid: Grid, queries: Sequence[Query], algorithm, workers: Optional[int] = None,
+               factor: int = 4) -> BatchRun:
+    """Answer many start/goal queries on one grid across a process pool.
+
+    The grid is written once into a ``multiprocessing.shared_memory`` block
+    in the grid file layout; each worker maps it as a read-only
+    :class:`MappedGrid` (same move costs and corner policy) and receives the
+    algorithm once, so tasks carry nothing but coordinates. Queries are
+    dispatched in chunks by ``schedule`` and results stream back in completion
+    order. The grid must not change while the batch runs.
+
+    ``workers`` defaults to the CPU count; ``workers=1`` searches in this
+    process in input order, with no pool or shared memory.
+    """
+    queries = list(queries)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if workers == 1 or len(queries) <= 1:
+        return BatchRun(_run_local(grid, queries, algorithm), len(queries))
+    return BatchRun(_run_pool(grid, queries, algorithm, workers, factor), len(queries))
@@ -1,50 +1,87 @@
 from __future__ import annotations
 from collections import deque
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Set, Tuple
 
-from algorithms.base import Algorithm
+from algorithms.base import Algorithm, GoalPath
+from algorithms.stepper import Steps, drain
 from core.grid import Grid
-from core.metrics import Metrics
+from core.metrics import Instrumentation, Metrics
 
 Coord = Tuple[int, int]
 
 
 class BFS(Algorithm):
+    def __init__(self, instrumentation: Instrumentation = Instrumentation.FULL):
+        self.instrumentation = instrumentation
+
     def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
         start_ns = Metrics().start_timer()
         metrics = Metrics()
-        step_counter = [0]
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        path = drain(self._steps(grid, start, goal, metrics))
+        metrics.path_length = len(path)
+        metrics.end_timer(start_ns)
+        return path, metrics
+
+    def search_many(self, grid: Grid, start: Coord, goals: Iterable[Coord],
+                    k: int = 1) -> Tuple[List[GoalPath], Metrics]:
+        """Nearest ``k`` of ``goals`` by move count from one BFS, nearest first.
+
+        Like ``search`` this ignores move costs; ``GoalPath.cost`` is the
+        number of moves.
+        """
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        targets = self._reachable_goals(grid, start, goals, k, metrics)
+        found: List[GoalPath] = []
+        if targets:
+            drain(self._expand(grid, start, set(targets), metrics, found, k))
+        if found:
+            metrics.path_length = len(found[0].path)
+        metrics.end_timer(start_ns)
+        return found, metrics
+
+    def _steps(self, grid: Grid, start: Coord, goal: Coord, metrics: Metrics) -> Steps:
+        return self._expand(grid, start, {goal}, metrics, [], 1)
 
+    def _expand(self, grid: Grid, start: Coord, goals: Set[Coord], metrics: Metrics, found: List[GoalPath],
+                k: int) -> Steps:
+        """The BFS loop behind ``search``, ``search_many`` and ``stepper``; see ``AStar._expand``."""
+        counting = self.instrumentation >= Instrumentation.COUNTERS
+        tracing = self.instrumentation >= Instrumentation.FULL
         q = deque([start])
         parents: Dict[Coord, Coord] = {}
         visited = {start}
 
         while q:
             current = q.popleft()
-            metrics.nodes_expanded += 1
-            metrics.explored.add(current)
-            metrics.explored_order[current] = step_counter[0]
-            step_counter[0] += 1
-            
-            if current == goal:
-                path: List[Coord] = []
-                node = current
-                while True:
-                    path.append(node)
-                    if node == start:
-                        break
-                    node = parents[node]
+            if counting:
+                if tracing:
+                    metrics.explored.add(current)
+                    metrics.explored_order[current] = metrics.nodes_expanded
+                metrics.nodes_expanded += 1
+
+            if current in goals:
+                goals.discard(current)
+                path: List[Coord] = [current]
+                while path[-1] != start:
+                    path.append(parents[path[-1]])
                 path.reverse()
-                metrics.path_length = len(path)
-                metrics.end_timer(start_ns)
-                return path, metrics
+                found.append(GoalPath(current, float(len(path) - 1), path))
+                if len(found) == k or not goals:
+                    return path
 
+            pushed: List[Coord] = []
             for nb in grid.neighbors(current):
                 if nb not in visited:
                     visited.add(nb)
                     parents[nb] = current
                     q.append(nb)
-                    metrics.max_open_size = max(metrics.max_open_size, len(q))
+                    pushed.append(nb)
+            if counting and len(q) > metrics.max_open_size:
+                metrics.max_open_size = len(q)
+            yield current, pushed
 
-        metrics.end_timer(start_ns)
-        return [], metrics
+        return []
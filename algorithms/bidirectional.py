@@ -1,101 +1,189 @@
 from __future__ import annotations
+import heapq
+import itertools
 from collections import deque
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 
 from algorithms.base import Algorithm
+from algorithms.stepper import Steps, drain
 from core.grid import Grid
-from core.metrics import Metrics
+from core.heuristics import manhattan, zero
+from core.metrics import Instrumentation, Metrics
 
 Coord = Tuple[int, int]
 
 
+def _join(parents_f: Dict[Coord, Coord], parents_b: Dict[Coord, Coord],
+          start: Coord, goal: Coord, meeting: Coord) -> List[Coord]:
+    # Reconstruct path from start -> meeting -> goal
+    path_f: List[Coord] = []
+    node = meeting
+    while node != start:
+        path_f.append(node)
+        node = parents_f[node]
+    path_f.append(start)
+    path_f.reverse()
+
+    path_b: List[Coord] = []
+    node = meeting
+    while node != goal:
+        node = parents_b.get(node, node)
+        path_b.append(node)
+
+    return path_f + path_b
+
+
 class BidirectionalBFS(Algorithm):
+    def __init__(self, instrumentation: Instrumentation = Instrumentation.FULL):
+        self.instrumentation = instrumentation
+
     def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
         start_ns = Metrics().start_timer()
         metrics = Metrics()
-        step_counter = [0]
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        path = drain(self._steps(grid, start, goal, metrics))
+        metrics.path_length = len(path)
+        metrics.end_timer(start_ns)
+        return path, metrics
 
+    def _steps(self, grid: Grid, start: Coord, goal: Coord, metrics: Metrics) -> Steps:
+        # Whole BFS layers alternate between the two sides; yields after every expansion
+        counting = self.instrumentation >= Instrumentation.COUNTERS
+        tracing = self.instrumentation >= Instrumentation.FULL
         if start == goal:
-            metrics.path_length = 1
-            metrics.explored.add(start)
-            metrics.explored_order[start] = 0
+            if tracing:
+                metrics.explored.add(start)
+                metrics.explored_order[start] = 0
+            return [start]
+
+        sides = ((deque([start]), {start}, {}), (deque([goal]), {goal}, {}))
+        while sides[0][0] and sides[1][0]:
+            open_size = len(sides[0][0]) + len(sides[1][0])
+            if counting and open_size > metrics.max_open_size:
+                metrics.max_open_size = open_size
+
+            for (q, seen, parents), (_, other_seen, _) in zip(sides, sides[::-1]):
+                for _ in range(len(q)):
+                    cur = q.popleft()
+                    if counting:
+                        if tracing:
+                            metrics.explored.add(cur)
+                            metrics.explored_order[cur] = metrics.nodes_expanded
+                        metrics.nodes_expanded += 1
+                    pushed: List[Coord] = []
+                    for nb in grid.neighbors(cur):
+                        if nb in other_seen:
+                            parents[nb] = cur
+                            return _join(sides[0][2], sides[1][2], start, goal, nb)
+                        if nb not in seen:
+                            seen.add(nb)
+                            parents[nb] = cur
+                            q.append(nb)
+                            pushed.append(nb)
+                    yield cur, pushed
+
+        return []
+
+
+class BidirectionalAStar(Algorithm):
+    """Bidirectional A* for weighted grids.
+
+    Both searches use the average potential ``p(v) = (h(v, goal) - h(start, v)) / 2``
+    (forward) and ``-p(v)`` (backward), which stays consistent when ``h`` is,
+    so each side behaves like Dijkstra on reduced costs. The forward search
+    walks ``Grid.successors`` and the backward one ``Grid.predecessors``. The best
+    meeting cost ``mu`` is tracked on every relaxation that touches a cell seen
+    by the other side, and the search stops once the two smallest open keys sum
+    to at least ``mu``, so the returned path is optimal.
+    """
+
+    def __init__(self, heuristic=manhattan):
+        self.heuristic = heuristic
+
+    def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
+        self._refresh_heuristic()
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
             metrics.end_timer(start_ns)
-            return [start], metrics
+            return [], metrics
+        step_counter = 0
+        h = self.heuristic
+
+        def potential(v: Coord) -> float:
+            return 0.5 * (h(v, goal) - h(start, v))
 
-        q_f = deque([start])
-        q_b = deque([goal])
+        counter = itertools.count()
+        g_f: Dict[Coord, float] = {start: 0.0}
+        g_b: Dict[Coord, float] = {goal: 0.0}
         parents_f: Dict[Coord, Coord] = {}
         parents_b: Dict[Coord, Coord] = {}
-        seen_f = {start}
-        seen_b = {goal}
-
-        meeting: Optional[Coord] = None
-
-        while q_f and q_b:
-            metrics.max_open_size = max(metrics.max_open_size, len(q_f) + len(q_b))
-
-            # forward step
-            for _ in range(len(q_f)):
-                cur = q_f.popleft()
-                metrics.nodes_expanded += 1
-                metrics.explored.add(cur)
-                metrics.explored_order[cur] = step_counter[0]
-                step_counter[0] += 1
-                for nb in grid.neighbors(cur):
-                    if nb in seen_b:
-                        meeting = nb
-                        parents_f[nb] = cur
-                        break
-                    if nb not in seen_f:
-                        seen_f.add(nb)
-                        parents_f[nb] = cur
-                        q_f.append(nb)
-                if meeting:
-                    break
-            if meeting:
+        closed_f: Set[Coord] = set()
+        closed_b: Set[Coord] = set()
+        heap_f: List[Tuple[float, int, Coord]] = [(potential(start), next(counter), start)]
+        heap_b: List[Tuple[float, int, Coord]] = [(-potential(goal), next(counter), goal)]
+
+        best = 0.0 if start == goal else float('inf')
+        meeting: Optional[Coord] = start if start == goal else None
+
+        while True:
+            # drop entries for cells already settled on that side
+            while heap_f and heap_f[0][2] in closed_f:
+                heapq.heappop(heap_f)
+            while heap_b and heap_b[0][2] in closed_b:
+                heapq.heappop(heap_b)
+            if not heap_f or not heap_b:
+                break
+            if heap_f[0][0] + heap_b[0][0] >= best:
                 break
+            metrics.max_open_size = max(metrics.max_open_size, len(heap_f) + len(heap_b))
 
-            # backward step
-            for _ in range(len(q_b)):
-                cur = q_b.popleft()
-                metrics.nodes_expanded += 1
-                metrics.explored.add(cur)
-                metrics.explored_order[cur] = step_counter[0]
-                step_counter[0] += 1
-                for nb in grid.neighbors(cur):
-                    if nb in seen_f:
+            forward = heap_f[0][0] <= heap_b[0][0]
+            if forward:
+                heap, g_own, g_other, parents, closed, sign = heap_f, g_f, g_b, parents_f, closed_f, 1.0
+            else:
+                heap, g_own, g_other, parents, closed, sign = heap_b, g_b, g_f, parents_b, closed_b, -1.0
+            _, _, current = heapq.heappop(heap)
+            closed.add(current)
+            metrics.nodes_expanded += 1
+            metrics.explored.add(current)
+            metrics.explored_order[current] = step_counter
+            step_counter += 1
+
+            if not forward and not grid.passable(current):
+                continue  # a blocked cell has no incoming edges (e.g. a blocked goal)
+            g_cur = g_own[current]
+            for nb, cost in (grid.successors(current) if forward else grid.predecessors(current)):
+                tentative_g = g_cur + cost
+                if tentative_g < g_own.get(nb, float('inf')):
+                    g_own[nb] = tentative_g
+                    parents[nb] = current
+                    heapq.heappush(heap, (tentative_g + sign * potential(nb), next(counter), nb))
+                    if nb in g_other and tentative_g + g_other[nb] < best:
+                        best = tentative_g + g_other[nb]
                         meeting = nb
-                        parents_b[nb] = cur
-                        break
-                    if nb not in seen_b:
-                        seen_b.add(nb)
-                        parents_b[nb] = cur
-                        q_b.append(nb)
-                if meeting:
-                    break
-            if meeting:
-                break
 
         if meeting is None:
             metrics.end_timer(start_ns)
             return [], metrics
 
-        # Reconstruct path from start -> meeting -> goal
-        path_f: List[Coord] = []
+        path: List[Coord] = [meeting]
         node = meeting
         while node != start:
-            path_f.append(node)
             node = parents_f[node]
-        path_f.append(start)
-        path_f.reverse()
-
-        path_b: List[Coord] = []
+            path.append(node)
+        path.reverse()
         node = meeting
         while node != goal:
-            node = parents_b.get(node, node)
-            path_b.append(node)
-
-        path = path_f + path_b
+            node = parents_b[node]
+            path.append(node)
         metrics.path_length = len(path)
         metrics.end_timer(start_ns)
         return path, metrics
+
+
+class BidirectionalDijkstra(BidirectionalAStar):
+    def __init__(self) -> None:
+        super().__init__(heuristic=zero)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+from typing import List, Optional, Tuple
+
+from algorithms.base import Algorithm
+from core.grid import CornerCutting, Grid
+from core.metrics import Instrumentation, Metrics
+
+Coord = Tuple[int, int]
+Board = int  # row-major bitboard, see BitBFS
+
+
+def decode(board: Board, cols: int) -> List[Coord]:
+    """Cells set in a bitboard laid out with ``cols`` cells plus a guard bit per row."""
+    width = cols + 1
+    cells = []
+    while board:
+        low = board & -board
+        r, c = divmod(low.bit_length() - 1, width)
+        cells.append((r, c))
+        board ^= low
+    return cells
+
+
+def _popcount(board: Board) -> int:
+    return bin(board).count('1')
+
+
+class BitBFS(Algorithm):
+    """Breadth-first search over big-int bitboards, a whole layer per step.
+
+    Cell (r, c) is bit ``r * (cols + 1) + c``. The extra guard column per row
+    is never passable, so a horizontal or diagonal shift that runs off one
+    end of a row lands on a guard bit and is masked away instead of wrapping
+    into the next row. Each layer is the union of the frontier shifted in
+    every direction, masked with the open cells and minus the visited ones;
+    diagonal shifts first keep only the frontier cells whose corner rule
+    allows the move. Paths are recovered by walking back through the stored
+    layers. Pure Python, no NumPy.
+
+    Like ``BFS`` this ignores move costs and weights: paths have the fewest
+    moves. The open-cell board is cached per grid version.
+    """
+
+    def __init__(self, instrumentation: Instrumentation = Instrumentation.FULL):
+        self.instrumentation = instrumentation
+        self._cache = None
+
+    def __getstate__(self):
+        # the cached boards hold the grid; workers build their own
+        state = self.__dict__.copy()
+        state['_cache'] = None
+        return state
+
+    def _boards(self, grid: Grid) -> Tuple[Board, List[Tuple[int, Optional[Board]]]]:
+        """Open-cell board and the move table: (index delta, board of cells allowed to take the move or None)."""
+        cache = self._cache
+        if cache is not None and cache[0] is grid and cache[1] == grid.version:
+            return cache[2], cache[3]
+        rows, cols = grid.rows, grid.cols
+        width = cols + 1
+        # one row of open cells repeated: (2^(rows*width) - 1) / (2^width - 1) has a bit at every row start
+        full = ((1 << (rows * width)) - 1) // ((1 << width) - 1) * ((1 << cols) - 1)
+        blocked = bytearray((rows * width + 7) // 8)
+        for r, c in grid.blocks:
+            if 0 <= r < rows and 0 <= c < cols:
+                i = r * width + c
+                blocked[i >> 3] |= 1 << (i & 7)
+        open_cells = full & ~int.from_bytes(blocked, 'little')
+
+        moves: List[Tuple[int, Optional[Board]]] = []
+        need = grid.corner_cutting
+        for dr, dc in grid.directions:
+            allowed = None
+            if dr and dc and need:
+                # a cell may take the move when enough of (r + dr, c) and (r, c + dc) are open
+                vertical = _shift(open_cells, dr * width)
+                horizontal = _shift(open_cells, dc)
+                allowed = vertical & horizontal if need == CornerCutting.NEVER else vertical | horizontal
+            moves.append((dr * width + dc, allowed))
+        self._cache = (grid, grid.version, open_cells, moves)
+        return open_cells, moves
+
+    def layers(self, grid: Grid, start: Coord, goal: Optional[Coord] = None) -> List[Board]:
+        """Distance layers from ``start``: layer i holds the cells exactly i moves away.
+
+        Stops after the layer containing ``goal`` when one is given. A blocked
+        start still expands, as in ``BFS``.
+        """
+        open_cells, moves = self._boards(grid)
+        width = grid.cols + 1
+        frontier = 1 << (start[0] * width + start[1])
+        goal_bit = 0 if goal is None else 1 << (goal[0] * width + goal[1])
+        visited = frontier
+        layers = [frontier]
+        while frontier and not frontier & goal_bit:
+            reached = 0
+            for delta, allowed in moves:
+                src = frontier if allowed is None else frontier & allowed
+                reached |= src << delta if delta > 0 else src >> -delta
+            frontier = reached & open_cells & ~visited
+            if frontier:
+                visited |= frontier
+                layers.append(frontier)
+        return layers
+
+    def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        if not (grid.in_bounds(start) and grid.in_bounds(goal)):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        layers = self.layers(grid, start, goal)
+        width = grid.cols + 1
+        goal_bit = 1 << (goal[0] * width + goal[1])
+        found = bool(layers[-1] & goal_bit)
+
+        if self.instrumentation >= Instrumentation.COUNTERS:
+            # the goal's layer is where a queue-based BFS would stop
+            expanded = layers[:-1] if found else layers
+            metrics.nodes_expanded = sum(_popcount(layer) for layer in expanded)
+            metrics.max_open_size = max(_popcount(layer) for layer in layers)
+            if self.instrumentation >= Instrumentation.FULL:
+                for layer in expanded:
+                    for cell in decode(layer, grid.cols):
+                        metrics.explored.add(cell)
+                        metrics.explored_order[cell] = len(metrics.explored_order)
+
+        path = self._walk_back(grid, layers, goal) if found else []
+        metrics.path_length = len(path)
+        metrics.end_timer(start_ns)
+        return path, metrics
+
+    def _walk_back(self, grid: Grid, layers: List[Board], goal: Coord) -> List[Coord]:
+        # From the goal's layer down to the start, step to any cell of the
+        # previous layer that has a legal move into the current cell
+        _, moves = self._boards(grid)
+        width = grid.cols + 1
+        path = [goal]
+        i = goal[0] * width + goal[1]
+        for layer in reversed(layers[:-1]):
+            for delta, allowed in moves:
+                j = i - delta
+                if j >= 0 and (layer >> j) & 1 and (allowed is None or (allowed >> j) & 1):
+                    i = j
+                    break
+            else:
+                raise AssertionError("broken layer chain")
+            path.append(divmod(i, width))
+        path.reverse()
+        return path
+
+
+def _shift(board: Board, delta: int) -> Board:
+    # bit i of the result is bit i + delta of ``board``
+    return board >> delta if delta > 0 else board << -delta
@@ -0,0 +1,216 @@
+from __future__ import annotations
+import heapq
+import itertools
+from abc import abstractmethod
+from array import array
+from typing import List, Tuple
+
+from algorithms.base import Algorithm
+from core.compact_grid import CompactGrid
+from core.grid import Grid
+from core.heuristics import manhattan
+from core.metrics import Metrics
+
+Coord = Tuple[int, int]
+
+
+def _reconstruct(parents: array, start: int, goal: int) -> List[int]:
+    path = [goal]
+    node = goal
+    while node != start:
+        node = parents[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+
+class CompactAlgorithm(Algorithm):
+    """Base for searches that run on :class:`CompactGrid` cell indices.
+
+    ``search`` is a thin adapter over ``search_index``: it converts a plain
+    :class:`Grid` (or reuses a ``CompactGrid``) and maps the resulting index
+    path back to coordinates. Only counters are recorded in Metrics; the
+    per-cell ``explored`` trace is left empty to keep the hot loop tuple-free.
+    """
+
+    def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
+        self._refresh_heuristic()
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        cgrid = grid if isinstance(grid, CompactGrid) else CompactGrid.from_grid(grid)
+        path, metrics = self.search_index(cgrid, cgrid.index(start), cgrid.index(goal))
+        return [cgrid.coord(i) for i in path], metrics
+
+    @abstractmethod
+    def search_index(self, cgrid: CompactGrid, start: int, goal: int) -> Tuple[List[int], Metrics]:
+        """Return path (list of flat indices from start to goal inclusive) and Metrics."""
+
+
+class CompactAStar(CompactAlgorithm):
+    def __init__(self, heuristic=manhattan):
+        self.heuristic = heuristic
+
+    def search_index(self, cgrid: CompactGrid, start: int, goal: int) -> Tuple[List[int], Metrics]:
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        n = cgrid.size
+        cells, weights, moves, width = cgrid.cells, cgrid.weights, cgrid.moves, cgrid.width
+        need = cgrid.corner_cutting
+        heuristic = self.heuristic
+        goal_coord = cgrid.coord(goal)
+
+        g_score = array('d', [float('inf')]) * n
+        parents = array('i', [-1]) * n
+        closed = bytearray(n)
+        metrics.memory_estimate_bytes = cgrid.memory_bytes + n * (g_score.itemsize + parents.itemsize + 1)
+
+        counter = itertools.count()
+        g_score[start] = 0.0
+        open_heap: List[Tuple[float, int, int]] = [(heuristic(cgrid.coord(start), goal_coord), next(counter), start)]
+        max_open = 1
+        expanded = 0
+
+        while open_heap:
+            if len(open_heap) > max_open:
+                max_open = len(open_heap)
+            _, _, current = heapq.heappop(open_heap)
+            if closed[current]:
+                continue  # stale duplicate left behind by a decrease
+            if current == goal:
+                path = _reconstruct(parents, start, goal)
+                metrics.nodes_expanded = expanded
+                metrics.max_open_size = max_open
+                metrics.path_length = len(path)
+                metrics.end_timer(start_ns)
+                return path, metrics
+
+            closed[current] = 1
+            expanded += 1
+            g_cur = g_score[current]
+            for off, base, side_a, side_b in moves:
+                nb = current + off
+                if not cells[nb]:
+                    continue
+                if side_a and cells[current + side_a] + cells[current + side_b] < need:
+                    continue
+                tentative_g = g_cur + base * weights[nb]
+                if tentative_g < g_score[nb]:
+                    g_score[nb] = tentative_g
+                    parents[nb] = current
+                    closed[nb] = 0
+                    r, c = divmod(nb, width)
+                    f = tentative_g + heuristic((r - 1, c - 1), goal_coord)
+                    heapq.heappush(open_heap, (f, next(counter), nb))
+
+        metrics.nodes_expanded = expanded
+        metrics.max_open_size = max_open
+        metrics.end_timer(start_ns)
+        return [], metrics
+
+
+class CompactBFS(CompactAlgorithm):
+    def search_index(self, cgrid: CompactGrid, start: int, goal: int) -> Tuple[List[int], Metrics]:
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        n = cgrid.size
+        cells, moves, need = cgrid.cells, cgrid.moves, cgrid.corner_cutting
+
+        parents = array('i', [-1]) * n
+        parents[start] = start
+        queue = array('i', [start])
+        metrics.memory_estimate_bytes = cgrid.memory_bytes + n * parents.itemsize
+        head = 0
+
+        while head < len(queue):
+            current = queue[head]
+            head += 1
+            if current == goal:
+                path = _reconstruct(parents, start, goal)
+                metrics.nodes_expanded = head
+                metrics.path_length = len(path)
+                metrics.end_timer(start_ns)
+                return path, metrics
+
+            for off, _, side_a, side_b in moves:
+                nb = current + off
+                if side_a and cells[current + side_a] + cells[current + side_b] < need:
+                    continue
+                if cells[nb] and parents[nb] < 0:
+                    parents[nb] = current
+                    queue.append(nb)
+            if len(queue) - head > metrics.max_open_size:
+                metrics.max_open_size = len(queue) - head
+
+        metrics.nodes_expanded = head
+        metrics.end_timer(start_ns)
+        return [], metrics
+
+
+class CompactBidirectionalBFS(CompactAlgorithm):
+    def search_index(self, cgrid: CompactGrid, start: int, goal: int) -> Tuple[List[int], Metrics]:
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+
+        if start == goal:
+            metrics.path_length = 1
+            metrics.end_timer(start_ns)
+            return [start], metrics
+
+        n = cgrid.size
+        cells, moves, need = cgrid.cells, cgrid.moves, cgrid.corner_cutting
+        parents_f = array('i', [-1]) * n
+        parents_b = array('i', [-1]) * n
+        parents_f[start] = start
+        parents_b[goal] = goal
+        metrics.memory_estimate_bytes = cgrid.memory_bytes + 2 * n * parents_f.itemsize
+
+        frontier_f = [start]
+        frontier_b = [goal]
+        meeting = -1
+
+        while frontier_f and frontier_b:
+            metrics.max_open_size = max(metrics.max_open_size, len(frontier_f) + len(frontier_b))
+
+            # expand one whole layer per direction, alternating like BidirectionalBFS
+            for own, other, frontier in ((parents_f, parents_b, frontier_f), (parents_b, parents_f, frontier_b)):
+                next_layer: List[int] = []
+                for cur in frontier:
+                    metrics.nodes_expanded += 1
+                    for off, _, side_a, side_b in moves:
+                        nb = cur + off
+                        if not cells[nb]:
+                            continue
+                        if side_a and cells[cur + side_a] + cells[cur + side_b] < need:
+                            continue
+                        if other[nb] >= 0:
+                            if own[nb] < 0:
+                                own[nb] = cur
+                            meeting = nb
+                            break
+                        if own[nb] < 0:
+                            own[nb] = cur
+                            next_layer.append(nb)
+                    if meeting >= 0:
+                        break
+                if meeting >= 0:
+                    break
+                frontier[:] = next_layer
+
+            if meeting >= 0:
+                break
+
+        if meeting < 0:
+            metrics.end_timer(start_ns)
+            return [], metrics
+
+        path = _reconstruct(parents_f, start, meeting)
+        node = meeting
+        while node != goal:
+            node = parents_b[node]
+            path.append(node)
+        metrics.path_length = len(path)
+        metrics.end_timer(start_ns)
+        return path, metrics
@@ -4,13 +4,13 @@ from typing import Tuple, List
 from algorithms.astar import AStar
 from core.heuristics import zero
 from core.grid import Grid
-from core.metrics import Metrics
+from core.metrics import Instrumentation, Metrics
 
 Coord = Tuple[int, int]
 
 
 class Dijkstra(AStar):
-    def __init__(self) -> None:
-        super().__init__(heuristic=zero)
+    def __init__(self, instrumentation: Instrumentation = Instrumentation.FULL, queue='binary') -> None:
+        super().__init__(heuristic=zero, instrumentation=instrumentation, queue=queue)
 
     # Inherits search from AStar but with zero heuristic to behave as Dijkstra
@@ -0,0 +1,190 @@
+from __future__ import annotations
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+from algorithms.base import Algorithm
+from core.grid import Grid
+from core.heuristics import for_grid
+from core.metrics import Metrics
+
+Coord = Tuple[int, int]
+Key = Tuple[float, float]
+
+INF = float('inf')
+# Keys are float sums taken in different orders, so equal keys can differ in
+# the last bits; compare them with this tolerance
+KEY_EPS = 1e-9
+
+
+def _key_less(a: Key, b: Key) -> bool:
+    if a[0] < b[0] - KEY_EPS:
+        return True
+    return a[0] <= b[0] + KEY_EPS and a[1] < b[1] - KEY_EPS
+
+
+class DStarLite(Algorithm):
+    """Incremental planner (D* Lite) that keeps its search state between calls.
+
+    The search runs backwards from the goal, so repeated ``search`` calls on
+    the same grid and goal only repair the part of the search affected by
+    cells edited since the previous call (read from ``Grid.changes_since``)
+    and by the start moving. An agent that walks along the path simply calls
+    ``search`` again with its current position. A different grid or goal, or a
+    journal that no longer covers the last seen version, starts over.
+    """
+
+    def __init__(self, heuristic=None):
+        self.heuristic = heuristic
+        self.reset()
+
+    def reset(self) -> None:
+        self._grid: Optional[Grid] = None
+        self._goal: Optional[Coord] = None
+        self._last: Optional[Coord] = None
+        self._version = -1
+        self._km = 0.0
+        self._g: Dict[Coord, float] = {}
+        self._rhs: Dict[Coord, float] = {}
+        self._open_heap: List[Tuple[Key, int, Coord]] = []
+        self._open: Dict[Coord, Key] = {}
+        self._counter = itertools.count()
+
+    def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+
+        changes = None
+        if grid is self._grid and goal == self._goal:
+            changes = grid.changes_since(self._version)
+        if changes is None:
+            self._initialize(grid, start, goal)
+        else:
+            if start != self._last:
+                self._km += self._h(self._last, start)
+                self._last = start
+            for cell in dict.fromkeys(changes):
+                self._update_vertex(cell)
+                # every cell around an edit, not just its current neighbors: a
+                # block can also open or close diagonal moves that squeeze past it
+                r, c = cell
+                for dr, dc in grid.directions:
+                    nb = (r + dr, c + dc)
+                    if grid.in_bounds(nb):
+                        self._update_vertex(nb)
+        self._version = grid.version
+
+        self._compute_shortest_path(start, metrics)
+        path = self._extract_path(start, goal, metrics, replan=changes is not None)
+        metrics.path_length = len(path)
+        metrics.end_timer(start_ns)
+        return path, metrics
+
+    def _initialize(self, grid: Grid, start: Coord, goal: Coord) -> None:
+        self.reset()
+        self._grid = grid
+        self._goal = goal
+        self._last = start
+        self._h = self.heuristic or for_grid(grid)
+        self._rhs[goal] = 0.0
+        self._push(goal, (self._h(start, goal), 0.0))
+
+    def _key(self, s: Coord) -> Key:
+        best = min(self._g.get(s, INF), self._rhs.get(s, INF))
+        return best + self._h(self._last, s) + self._km, best
+
+    def _push(self, s: Coord, key: Key) -> None:
+        self._open[s] = key
+        heapq.heappush(self._open_heap, (key, next(self._counter), s))
+
+    def _top(self) -> Optional[Tuple[Key, Coord]]:
+        heap = self._open_heap
+        while heap:
+            key, _, s = heap[0]
+            if self._open.get(s) == key:
+                return key, s
+            heapq.heappop(heap)  # stale entry left by a removal or re-key
+        return None
+
+    def _update_vertex(self, u: Coord) -> None:
+        grid = self._grid
+        if u != self._goal:
+            best = INF
+            if grid.passable(u):
+                for s, cost in grid.successors(u):
+                    cand = cost + self._g.get(s, INF)
+                    if cand < best:
+                        best = cand
+            self._rhs[u] = best
+        self._open.pop(u, None)
+        if self._g.get(u, INF) != self._rhs.get(u, INF):
+            self._push(u, self._key(u))
+
+    def _compute_shortest_path(self, start: Coord, metrics: Metrics) -> None:
+        grid = self._grid
+        step_counter = 0
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            k_old, u = top
+            if not _key_less(k_old, self._key(start)) and self._rhs.get(start, INF) == self._g.get(start, INF):
+                break
+            metrics.max_open_size = max(metrics.max_open_size, len(self._open))
+
+            k_new = self._key(u)
+            if _key_less(k_old, k_new):
+                self._push(u, k_new)
+                continue
+
+            del self._open[u]
+            metrics.nodes_expanded += 1
+            metrics.explored.add(u)
+            metrics.explored_order[u] = step_counter
+            step_counter += 1
+
+            g_u, rhs_u = self._g.get(u, INF), self._rhs.get(u, INF)
+            if g_u > rhs_u:
+                self._g[u] = rhs_u
+                for p in grid.neighbors(u):
+                    self._update_vertex(p)
+            else:
+                self._g[u] = INF
+                self._update_vertex(u)
+                for p in grid.neighbors(u):
+                    self._update_vertex(p)
+
+    def _extract_path(self, start: Coord, goal: Coord, metrics: Metrics, replan: bool = False) -> List[Coord]:
+        path = self._descend(start, goal)
+        if not path and replan:
+            # an incremental repair found nothing: confirm with a fresh plan
+            # rather than trust state that may have been left inconsistent
+            self._initialize(self._grid, start, goal)
+            self._compute_shortest_path(start, metrics)
+            path = self._descend(start, goal)
+        return path
+
+    def _descend(self, start: Coord, goal: Coord) -> List[Coord]:
+        if self._g.get(start, INF) == INF:
+            return []
+        grid = self._grid
+        path = [start]
+        current = start
+        # g-values are consistent here, so greedy descent reaches the goal in at
+        # most one step per settled cell; the bound only guards against misuse
+        for _ in range(len(self._g) + 1):
+            if current == goal:
+                return path
+            best, nxt = INF, None
+            for s, cost in grid.successors(current):
+                cand = cost + self._g.get(s, INF)
+                if cand < best:
+                    best, nxt = cand, s
+            if nxt is None:
+                return []
+            path.append(nxt)
+            current = nxt
+        return []
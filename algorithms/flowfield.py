@@ -0,0 +1,235 @@
+from __future__ import annotations
+import heapq
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.grid import CornerCutting, Grid
+
+Coord = Tuple[int, int]
+
+INF = float('inf')
+NO_MOVE = 255  # direction byte of the goal and of cells that cannot reach it
+# Past this share of invalidated cells a full rebuild is cheaper than a repair
+REBUILD_FRACTION = 0.25
+
+
+class FlowField:
+    """Next-move table toward one goal, shared by any number of agents.
+
+    One reverse search from the goal (BFS on uniform-cost grids, Dijkstra
+    otherwise) fills ``dist`` (cost to the goal, flat ``array('d')``) and
+    ``moves``, one byte per cell holding the index into ``grid.directions``
+    of the cell's next step, or NO_MOVE. An agent's path is a walk through
+    ``moves``; its cost matches an optimal single search.
+
+    Edits are picked up from the grid's change journal on the next use:
+    ``update`` invalidates only the cells whose route ran through an edited
+    cell (the edited cells' subtrees in the field) and repairs them with a
+    Dijkstra seeded from the valid cells around them. A journal overflow, an
+    edit of the goal cell or an invalidated share above REBUILD_FRACTION
+    rebuilds from scratch.
+    """
+
+    def __init__(self, grid: Grid, goal: Coord) -> None:
+        if not grid.in_bounds(goal):
+            raise IndexError("goal out of bounds")
+        self.grid = grid
+        self.goal = goal
+        self.rebuilds = 0
+        self.repaired = 0  # cells recomputed by the last update
+        self.build()
+
+    # -- construction ------------------------------------------------------------
+
+    def build(self) -> None:
+        grid = self.grid
+        n = grid.rows * grid.cols
+        self._index_of: Dict[Coord, int] = {d: i for i, d in enumerate(grid.directions)}
+        self.dist = array('d', [INF]) * n
+        self.moves = bytearray([NO_MOVE]) * n
+        self._version = grid.version
+        self.rebuilds += 1
+        self.repaired = n
+        goal = self.goal
+        if not grid.passable(goal):
+            return  # searches never enter a blocked goal
+        self.dist[goal[0] * grid.cols + goal[1]] = 0.0
+        if grid.weights or (grid.diagonal and grid.diagonal_cost != grid.straight_cost):
+            self._relax([(0.0, goal)])
+        else:
+            self._bfs()
+
+    def _bfs(self) -> None:
+        grid = self.grid
+        cols, dist, moves, index_of = grid.cols, self.dist, self.moves, self._index_of
+        step = grid.straight_cost
+        queue = deque([self.goal])
+        while queue:
+            u = queue.popleft()
+            du = dist[u[0] * cols + u[1]] + step
+            for p, _ in grid.predecessors(u):
+                idx = p[0] * cols + p[1]
+                if dist[idx] == INF:
+                    dist[idx] = du
+                    moves[idx] = index_of[(u[0] - p[0], u[1] - p[1])]
+                    queue.append(p)
+
+    def _relax(self, heap: List[Tuple[float, Coord]]) -> None:
+        # Reverse Dijkstra: a popped cell's label is final, so pass it on to
+        # every cell that can step into it
+        grid = self.grid
+        cols, dist, moves, index_of = grid.cols, self.dist, self.moves, self._index_of
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u[0] * cols + u[1]]:
+                continue
+            for p, cost in grid.predecessors(u):
+                cand = d + cost
+                idx = p[0] * cols + p[1]
+                if cand < dist[idx]:
+                    dist[idx] = cand
+                    moves[idx] = index_of[(u[0] - p[0], u[1] - p[1])]
+                    heapq.heappush(heap, (cand, p))
+
+    # -- incremental repair --------------------------------------------------------
+
+    @property
+    def stale(self) -> bool:
+        return self.grid.version != self._version
+
+    def update(self) -> None:
+        """Bring the field in line with the grid's edits since the last build or update."""
+        grid = self.grid
+        if grid.version == self._version:
+            return
+        changes = grid.changes_since(self._version)
+        if changes is None or self.goal in changes:
+            self.build()
+            return
+        changed = set(changes)
+        self._version = grid.version
+
+        roots = set(changed)
+        if grid.diagonal and grid.corner_cutting != CornerCutting.ALWAYS:
+            roots.update(self._squeezed_past(changed))
+        invalid = self._subtrees(roots)
+        if len(invalid) > REBUILD_FRACTION * len(self.moves):
+            self.build()
+            return
+
+        cols, dist, moves, index_of = grid.cols, self.dist, self.moves, self._index_of
+        for r, c in invalid:
+            dist[r * cols + c] = INF
+            moves[r * cols + c] = NO_MOVE
+        heap: List[Tuple[float, Coord]] = []
+        # invalidated cells restart from their best still-valid successor
+        for v in invalid:
+            if not grid.passable(v):
+                continue
+            best, best_u = INF, None
+            for u, cost in grid.successors(v):
+                cand = cost + dist[u[0] * cols + u[1]]
+                if cand < best:
+                    best, best_u = cand, u
+            if best_u is not None:
+                idx = v[0] * cols + v[1]
+                dist[idx] = best
+                moves[idx] = index_of[(best_u[0] - v[0], best_u[1] - v[1])]
+                heap.append((best, v))
+        # cells around an edit may now offer cheaper moves to their predecessors
+        for r, c in changed:
+            for dr, dc in grid.directions:
+                u = (r + dr, c + dc)
+                if grid.in_bounds(u) and u not in invalid:
+                    d = dist[u[0] * cols + u[1]]
+                    if d != INF:
+                        heap.append((d, u))
+        self._relax(heap)
+        self.repaired = len(invalid)
+
+    def _squeezed_past(self, changed: Iterable[Coord]) -> Set[Coord]:
+        # Cells whose diagonal next move passes an edited cell: with a corner
+        # rule, blocking that cell can make the move illegal. Such cells are
+        # always orthogonal neighbors of the edited cell.
+        grid = self.grid
+        cols, moves, directions = grid.cols, self.moves, grid.directions
+        out: Set[Coord] = set()
+        for r, c in changed:
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                v = (r + dr, c + dc)
+                if not grid.in_bounds(v):
+                    continue
+                m = moves[v[0] * cols + v[1]]
+                if m == NO_MOVE:
+                    continue
+                mr, mc = directions[m]
+                if mr and mc and ((v[0] + mr, v[1]) == (r, c) or (v[0], v[1] + mc) == (r, c)):
+                    out.add(v)
+        return out
+
+    def _subtrees(self, roots: Iterable[Coord]) -> Set[Coord]:
+        """``roots`` and every cell whose stored route passes through one of them."""
+        grid = self.grid
+        cols, moves, directions = grid.cols, self.moves, grid.directions
+        seen = set(roots)
+        stack = list(seen)
+        while stack:
+            r, c = stack.pop()
+            for i, (dr, dc) in enumerate(directions):
+                v = (r - dr, c - dc)
+                if v not in seen and grid.in_bounds(v) and moves[v[0] * cols + v[1]] == i:
+                    seen.add(v)
+                    stack.append(v)
+        return seen
+
+    # -- queries ---------------------------------------------------------------
+
+    def distance(self, coord: Coord) -> float:
+        if self.stale:
+            self.update()
+        return self.dist[coord[0] * self.grid.cols + coord[1]]
+
+    def next_cell(self, coord: Coord) -> Optional[Coord]:
+        """The next cell on an optimal route from ``coord``, or None at the goal or when it is unreachable."""
+        if self.stale:
+            self.update()
+        grid = self.grid
+        if not grid.passable(coord):
+            # searches may start on a blocked cell, which can still step out
+            best, best_u = INF, None
+            for u, cost in grid.successors(coord):
+                cand = cost + self.dist[u[0] * grid.cols + u[1]]
+                if cand < best:
+                    best, best_u = cand, u
+            return best_u
+        m = self.moves[coord[0] * grid.cols + coord[1]]
+        if m == NO_MOVE:
+            return None
+        dr, dc = grid.directions[m]
+        return coord[0] + dr, coord[1] + dc
+
+    def path_from(self, start: Coord) -> List[Coord]:
+        """Route from ``start`` to the goal by walking the table ([] if unreachable)."""
+        if self.stale:
+            self.update()
+        if start == self.goal:
+            return [start]
+        grid = self.grid
+        cols, moves, directions = grid.cols, self.moves, grid.directions
+        nxt = self.next_cell(start)
+        if nxt is None:
+            return []
+        path = [start, nxt]
+        r, c = nxt
+        while (r, c) != self.goal:
+            m = moves[r * cols + c]
+            dr, dc = directions[m]
+            r, c = r + dr, c + dc
+            path.append((r, c))
+        return path
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.moves) + len(self.dist) * self.dist.itemsize
@@ -0,0 +1,404 @@
+from __future__ import annotations
+import heapq
+import itertools
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from algorithms.base import Algorithm
+from core.grid import Grid
+from core.heuristics import for_grid
+from core.metrics import Metrics
+
+Coord = Tuple[int, int]
+Cluster = Tuple[int, int]
+# ('v'|'h', cluster row, cluster col) of the left/top cluster, or ('x', ...) of
+# the top-left cluster for the junction where four clusters meet at a corner
+Border = Tuple[str, int, int]
+
+INF = float('inf')
+
+# Entrances at least this wide get a transition at each end instead of one in the middle
+MAX_SINGLE_ENTRANCE = 6
+
+
+class HierarchicalAStar(Algorithm):
+    """Hierarchical pathfinding (HPA*) over fixed-size clusters.
+
+    The grid is cut into ``cluster_size`` squares. Entrances along shared
+    cluster borders become abstract nodes, linked by single-step transitions
+    across the border and by precomputed optimal intra-cluster costs. A query
+    connects start and goal to their clusters, runs A* on the small abstract
+    graph and then refines only the chosen edges with searches confined to one
+    cluster. On diagonal grids a diagonal step across a border becomes a
+    transition where no straight entrance covers it, and so does a diagonal
+    step through the corner where four clusters meet, so the abstract graph
+    is complete: no abstract path means no path.
+
+    Paths are near-optimal, not optimal: every route is forced through one
+    transition per entrance and refined one abstract edge at a time. Queries
+    between neighbouring clusters also try a direct search over those
+    clusters and keep the cheaper path. With the default cluster size expect
+    a few percent over the optimum (up to about 1.3 times on weighted maps);
+    clusters of only a few cells on cluttered weighted maps can occasionally
+    give twice the optimal cost.
+
+    The abstract graph is built on first use and kept in sync through
+    ``Grid.changes_since``: an edit inside a cluster recomputes that cluster's
+    intra edges, an edit on a border cell also recomputes that border's
+    entrances and the cluster on the other side.
+    """
+
+    def __init__(self, cluster_size: int = 16, heuristic=None):
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+        self.cluster_size = cluster_size
+        self.heuristic = heuristic
+        self._grid: Optional[Grid] = None
+        self._version = -1
+
+    # -- abstract graph construction ------------------------------------------
+
+    def build(self, grid: Grid) -> None:
+        self._grid = grid
+        self._version = grid.version
+        self._h = self.heuristic or for_grid(grid)
+        size = self.cluster_size
+        self._cluster_rows = (grid.rows + size - 1) // size
+        self._cluster_cols = (grid.cols + size - 1) // size
+        self._border_nodes: Dict[Border, List[Coord]] = {}
+        self._inter: Dict[Coord, Dict[Coord, float]] = {}
+        self._intra: Dict[Coord, Dict[Coord, float]] = {}
+        self._intra_nodes: Dict[Cluster, Set[Coord]] = {}
+
+        for cr in range(self._cluster_rows):
+            for cc in range(self._cluster_cols):
+                for border in self._borders_of((cr, cc)):
+                    if border not in self._border_nodes:
+                        self._build_border(border)
+        for cr in range(self._cluster_rows):
+            for cc in range(self._cluster_cols):
+                self._build_intra((cr, cc))
+
+    def _sync(self, grid: Grid) -> None:
+        changes = grid.changes_since(self._version) if grid is self._grid else None
+        if changes is None:
+            self.build(grid)
+            return
+        self._version = grid.version
+        dirty_borders: Set[Border] = set()
+        dirty_clusters: Set[Cluster] = set()
+        for cell in changes:
+            dirty_clusters.add(self._cluster_of(cell))
+            dirty_borders.update(self._borders_touching(cell))
+        for border in dirty_borders:
+            self._clear_border(border)
+        for border in dirty_borders:
+            self._build_border(border)
+            dirty_clusters.update(self._clusters_of_border(border))
+        for cluster in dirty_clusters:
+            self._build_intra(cluster)
+
+    def _cluster_of(self, coord: Coord) -> Cluster:
+        return coord[0] // self.cluster_size, coord[1] // self.cluster_size
+
+    def _bounds(self, cluster: Cluster) -> Tuple[int, int, int, int]:
+        size = self.cluster_size
+        r0, c0 = cluster[0] * size, cluster[1] * size
+        return r0, min(r0 + size, self._grid.rows) - 1, c0, min(c0 + size, self._grid.cols) - 1
+
+    def _borders_of(self, cluster: Cluster) -> List[Border]:
+        cr, cc = cluster
+        borders: List[Border] = []
+        if cc + 1 < self._cluster_cols:
+            borders.append(('v', cr, cc))
+        if cc > 0:
+            borders.append(('v', cr, cc - 1))
+        if cr + 1 < self._cluster_rows:
+            borders.append(('h', cr, cc))
+        if cr > 0:
+            borders.append(('h', cr - 1, cc))
+        if self._grid.diagonal:
+            for jr in (cr - 1, cr):
+                for jc in (cc - 1, cc):
+                    if 0 <= jr < self._cluster_rows - 1 and 0 <= jc < self._cluster_cols - 1:
+                        borders.append(('x', jr, jc))
+        return borders
+
+    def _borders_touching(self, cell: Coord) -> List[Border]:
+        cluster = self._cluster_of(cell)
+        r0, r1, c0, c1 = self._bounds(cluster)
+        r, c = cell
+        cr, cc = cluster
+        touching = []
+        for border in self._borders_of(cluster):
+            kind, br, bc = border
+            if kind == 'v' and c == (c1 if bc == cc else c0):
+                touching.append(border)
+            elif kind == 'h' and r == (r1 if br == cr else r0):
+                touching.append(border)
+            elif kind == 'x' and r == (r1 if br == cr else r0) and c == (c1 if bc == cc else c0):
+                touching.append(border)
+        return touching
+
+    @staticmethod
+    def _clusters_of_border(border: Border) -> Tuple[Cluster, ...]:
+        kind, cr, cc = border
+        if kind == 'x':
+            return (cr, cc), (cr, cc + 1), (cr + 1, cc), (cr + 1, cc + 1)
+        return ((cr, cc), (cr, cc + 1)) if kind == 'v' else ((cr, cc), (cr + 1, cc))
+
+    def _border_pairs(self, border: Border) -> List[Tuple[Coord, Coord]]:
+        # Facing cell pairs along a border, in order
+        kind, cr, cc = border
+        r0, r1, c0, c1 = self._bounds((cr, cc))
+        if kind == 'v':
+            return [((r, c1), (r, c1 + 1)) for r in range(r0, r1 + 1)]
+        return [((r1, c), (r1 + 1, c)) for c in range(c0, c1 + 1)]
+
+    def _build_border(self, border: Border) -> None:
+        grid = self._grid
+        crossings = self._junction_crossings(border) if border[0] == 'x' else self._border_crossings(border)
+        nodes: List[Coord] = []
+        for x, y in crossings:
+            self._inter.setdefault(x, {})[y] = grid.get_cost(x, y)
+            self._inter.setdefault(y, {})[x] = grid.get_cost(y, x)
+            nodes += [x, y]
+        self._border_nodes[border] = nodes
+
+    def _border_crossings(self, border: Border) -> List[Tuple[Coord, Coord]]:
+        grid = self._grid
+        pairs = self._border_pairs(border)
+        crossings: List[Tuple[Coord, Coord]] = []
+        in_run: Set[Coord] = set()
+        run: List[Tuple[Coord, Coord]] = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and grid.passable(a) and grid.passable(b):
+                run.append((a, b))
+                in_run.update((a, b))
+                continue
+            if run:
+                crossings += [run[len(run) // 2]] if len(run) < MAX_SINGLE_ENTRANCE else [run[0], run[-1]]
+                run = []
+        if grid.diagonal:
+            # A diagonal step across the border is only needed when neither end
+            # belongs to a straight entrance: otherwise that entrance already
+            # reaches the far cell through a straight move along the border
+            for (a0, b0), (a1, b1) in zip(pairs, pairs[1:]):
+                for x, y in ((a0, b1), (a1, b0)):
+                    if (x not in in_run and y not in in_run and grid.passable(x)
+                            and any(v == y for v, _ in grid.successors(x))):
+                        crossings.append((x, y))
+        return crossings
+
+    def _junction_crossings(self, border: Border) -> List[Tuple[Coord, Coord]]:
+        # The two diagonal steps through a four-cluster corner; each crosses
+        # both borders at once, so neither border's entrances covers it
+        grid = self._grid
+        _, r1, _, c1 = self._bounds(border[1:])
+        crossings = []
+        for x, y in (((r1, c1), (r1 + 1, c1 + 1)), ((r1, c1 + 1), (r1 + 1, c1))):
+            if grid.passable(x) and any(v == y for v, _ in grid.successors(x)):
+                crossings.append((x, y))
+        return crossings
+
+    def _clear_border(self, border: Border) -> None:
+        nodes = self._border_nodes.pop(border, [])
+        pairs = [(nodes[i], nodes[i + 1]) for i in range(0, len(nodes), 2)]
+        for x, y in pairs:
+            for u, v in ((x, y), (y, x)):
+                edges = self._inter.get(u)
+                if edges is not None:
+                    edges.pop(v, None)
+                    if not edges:
+                        del self._inter[u]
+
+    def _cluster_nodes(self, cluster: Cluster) -> Set[Coord]:
+        nodes: Set[Coord] = set()
+        for border in self._borders_of(cluster):
+            nodes.update(n for n in self._border_nodes.get(border, ()) if self._cluster_of(n) == cluster)
+        return nodes
+
+    def _build_intra(self, cluster: Cluster) -> None:
+        nodes = self._cluster_nodes(cluster)
+        for n in self._intra_nodes.get(cluster, set()) - nodes:
+            del self._intra[n]
+        self._intra_nodes[cluster] = nodes
+        adjacency = self._local_graph(self._bounds(cluster)) if nodes else {}
+        for n in nodes:
+            dist = self._local_dijkstra(n, adjacency, nodes)
+            self._intra[n] = {m: d for m, d in dist.items() if m != n}
+
+    # -- local (single-cluster) searches ----------------------------------------
+
+    def _local_graph(self, bounds: Tuple[int, int, int, int], reverse: bool = False) -> Dict[Coord, List[Tuple[Coord, float]]]:
+        """Adjacency (with edge costs) of one cluster, built once per cluster pass.
+
+        With ``reverse`` every edge is flipped, for searches that compute costs
+        *to* a cell rather than from it.
+        """
+        grid = self._grid
+        r0, r1, c0, c1 = bounds
+        adjacency: Dict[Coord, List[Tuple[Coord, float]]] = {}
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                u = (r, c)
+                adjacency.setdefault(u, [])
+                for v, cost in grid.successors(u):
+                    if r0 <= v[0] <= r1 and c0 <= v[1] <= c1:
+                        if reverse:
+                            adjacency.setdefault(v, []).append((u, cost))
+                        else:
+                            adjacency[u].append((v, cost))
+        return adjacency
+
+    @staticmethod
+    def _local_dijkstra(source: Coord, adjacency: Dict[Coord, List[Tuple[Coord, float]]], targets: Set[Coord],
+                        metrics: Optional[Metrics] = None) -> Dict[Coord, float]:
+        """Costs from ``source`` to each reachable target of a cluster graph."""
+        dist: Dict[Coord, float] = {source: 0.0}
+        found: Dict[Coord, float] = {}
+        heap = [(0.0, source)]
+        remaining = len(targets)
+        while heap and remaining:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if metrics is not None:
+                metrics.nodes_expanded += 1
+            if u in targets and u not in found:
+                found[u] = d
+                remaining -= 1
+            for v, cost in adjacency[u]:
+                nd = d + cost
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return found
+
+    def _local_path(self, start: Coord, goal: Coord, bounds: Tuple[int, int, int, int],
+                    metrics: Metrics) -> Tuple[List[Coord], float]:
+        grid, h = self._grid, self._h
+        r0, r1, c0, c1 = bounds
+        counter = itertools.count()
+        g_score: Dict[Coord, float] = {start: 0.0}
+        parents: Dict[Coord, Coord] = {}
+        heap = [(h(start, goal), next(counter), start)]
+        closed = set()
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == goal:
+                path = [u]
+                while u != start:
+                    u = parents[u]
+                    path.append(u)
+                path.reverse()
+                return path, g_score[goal]
+            closed.add(u)
+            metrics.nodes_expanded += 1
+            for v, cost in grid.successors(u):
+                if not (r0 <= v[0] <= r1 and c0 <= v[1] <= c1):
+                    continue
+                ng = g_score[u] + cost
+                if ng < g_score.get(v, INF):
+                    g_score[v] = ng
+                    parents[v] = u
+                    heapq.heappush(heap, (ng + h(v, goal), next(counter), v))
+        return [], INF
+
+    # -- queries -----------------------------------------------------------------
+
+    def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
+        self._refresh_heuristic()
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        self._sync(grid)
+
+        abstract_t0 = time.perf_counter()
+        start_cluster, goal_cluster = self._cluster_of(start), self._cluster_of(goal)
+        start_nodes = self._cluster_nodes(start_cluster)
+        goal_nodes = self._cluster_nodes(goal_cluster)
+        from_start = self._local_dijkstra(start, self._local_graph(self._bounds(start_cluster)),
+                                          start_nodes, metrics)
+        to_goal = self._local_dijkstra(goal, self._local_graph(self._bounds(goal_cluster), reverse=True),
+                                       goal_nodes, metrics)
+        abstract_path, abstract_cost = self._abstract_search(start, goal, from_start, to_goal, metrics)
+        metrics.abstract_ms = (time.perf_counter() - abstract_t0) * 1000.0
+
+        refine_t0 = time.perf_counter()
+        path: List[Coord] = []
+        if abs(start_cluster[0] - goal_cluster[0]) <= 1 and abs(start_cluster[1] - goal_cluster[1]) <= 1:
+            # a short query may do better inside the clusters of start and goal
+            # than through their entrances, which can sit far from both
+            s0, s1, s2, s3 = self._bounds(start_cluster)
+            g0, g1, g2, g3 = self._bounds(goal_cluster)
+            bounds = min(s0, g0), max(s1, g1), min(s2, g2), max(s3, g3)
+            local, local_cost = self._local_path(start, goal, bounds, metrics)
+            if local and local_cost <= abstract_cost:
+                path = local
+                abstract_path = []
+        if abstract_path:
+            path = self._refine(abstract_path, metrics)
+        metrics.refine_ms = (time.perf_counter() - refine_t0) * 1000.0
+
+        metrics.path_length = len(path)
+        metrics.end_timer(start_ns)
+        return path, metrics
+
+    def _abstract_search(self, start: Coord, goal: Coord, from_start: Dict[Coord, float],
+                         to_goal: Dict[Coord, float], metrics: Metrics) -> Tuple[List[Coord], float]:
+        h = self._h
+        counter = itertools.count()
+        g_score: Dict[Coord, float] = {start: 0.0}
+        parents: Dict[Coord, Coord] = {}
+        # ties on f go to the entry closest to the goal: long abstract edges
+        # make equal-f plateaus common and FIFO order would flood them
+        h0 = h(start, goal)
+        heap = [(h0, h0, next(counter), start)]
+        closed = set()
+        while heap:
+            metrics.max_open_size = max(metrics.max_open_size, len(heap))
+            _, _, _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == goal:
+                path = [u]
+                while u != start:
+                    u = parents[u]
+                    path.append(u)
+                path.reverse()
+                return path, g_score[goal]
+            closed.add(u)
+            metrics.nodes_expanded += 1
+
+            if u == start:
+                edges: Iterable[Tuple[Coord, float]] = itertools.chain(from_start.items(),
+                                                                       self._inter.get(u, {}).items())
+            else:
+                edges = itertools.chain(self._intra.get(u, {}).items(), self._inter.get(u, {}).items())
+            if u in to_goal:
+                edges = itertools.chain(edges, ((goal, to_goal[u]),))
+            for v, cost in edges:
+                ng = g_score[u] + cost
+                if ng < g_score.get(v, INF):
+                    g_score[v] = ng
+                    parents[v] = u
+                    hv = h(v, goal)
+                    heapq.heappush(heap, (ng + hv, hv, next(counter), v))
+        return [], INF
+
+    def _refine(self, abstract_path: List[Coord], metrics: Metrics) -> List[Coord]:
+        path = [abstract_path[0]]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            if a == b:
+                continue
+            if b in self._inter.get(a, {}) and self._cluster_of(a) != self._cluster_of(b):
+                path.append(b)
+                continue
+            segment, _ = self._local_path(a, b, self._bounds(self._cluster_of(a)), metrics)
+            path.extend(segment[1:])
+        return path
@@ -0,0 +1,320 @@
+from __future__ import annotations
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+from algorithms.base import Algorithm
+from core.grid import CornerCutting, Grid
+from core.heuristics import for_grid
+from core.metrics import Metrics
+
+Coord = Tuple[int, int]
+
+
+def _sign(x: int) -> int:
+    return (x > 0) - (x < 0)
+
+
+class JumpPointSearch(Algorithm):
+    """Jump Point Search for uniform-cost grids.
+
+    A* over jump points only: straight (and, with ``Grid.diagonal``, diagonal)
+    runs are scanned without touching the open list until a forced neighbor or
+    the goal is found. The returned path is expanded back to one entry per
+    cell. Requires ``grid.weights`` to be empty.
+
+    On diagonal grids the pruning and jump rules follow
+    ``grid.corner_cutting``, so the result matches A* under the same policy.
+    """
+
+    def __init__(self, heuristic=None):
+        self.heuristic = heuristic
+
+    def search(self, grid: Grid, start: Coord, goal: Coord) -> Tuple[List[Coord], Metrics]:
+        if grid.weights:
+            raise ValueError("JumpPointSearch requires a grid without cell weights")
+        self._refresh_heuristic()
+        start_ns = Metrics().start_timer()
+        metrics = Metrics()
+        if self.reject_unreachable(grid, start, goal, metrics):
+            metrics.end_timer(start_ns)
+            return [], metrics
+        step_counter = 0
+        heuristic = self.heuristic or for_grid(grid)
+        if not grid.diagonal:
+            jump, prune = self._jump4, self._prune4
+        elif grid.corner_cutting == CornerCutting.NEVER:
+            jump, prune = self._jump8_never, self._prune8_never
+        elif grid.corner_cutting == CornerCutting.IF_ONE_OPEN:
+            jump, prune = self._jump8_one, self._prune8_one
+        else:
+            jump, prune = self._jump8, self._prune8
+        walk = self._walker(grid)
+
+        open_heap: List[Tuple[float, int, Coord]] = []
+        counter = itertools.count()
+        g_score: Dict[Coord, float] = {start: 0.0}
+        parents: Dict[Coord, Coord] = {}
+        closed = set()
+        heapq.heappush(open_heap, (heuristic(start, goal), next(counter), start))
+
+        while open_heap:
+            metrics.max_open_size = max(metrics.max_open_size, len(open_heap))
+            _, _, current = heapq.heappop(open_heap)
+            if current in closed:
+                continue
+
+            if current == goal:
+                path = self._expand(current, start, parents)
+                metrics.path_length = len(path)
+                metrics.end_timer(start_ns)
+                return path, metrics
+
+            closed.add(current)
+            metrics.nodes_expanded += 1
+            metrics.explored.add(current)
+            metrics.explored_order[current] = step_counter
+            step_counter += 1
+
+            parent = parents.get(current)
+            if parent is None:
+                candidates = list(grid.neighbors(current))
+            else:
+                candidates = prune(walk, current, _sign(current[0] - parent[0]), _sign(current[1] - parent[1]))
+
+            r, c = current
+            for nb in candidates:
+                dr, dc = nb[0] - r, nb[1] - c
+                jp = jump(walk, r, c, dr, dc, goal)
+                if jp is None or jp in closed:
+                    continue
+                steps = max(abs(jp[0] - r), abs(jp[1] - c))
+                tentative_g = g_score[current] + steps * grid.get_cost(current, nb)
+                if tentative_g < g_score.get(jp, float('inf')):
+                    g_score[jp] = tentative_g
+                    parents[jp] = current
+                    heapq.heappush(open_heap, (tentative_g + heuristic(jp, goal), next(counter), jp))
+
+        metrics.end_timer(start_ns)
+        return [], metrics
+
+    @staticmethod
+    def _expand(node: Coord, start: Coord, parents: Dict[Coord, Coord]) -> List[Coord]:
+        # Interpolate the straight/diagonal segments between consecutive jump points
+        path: List[Coord] = [node]
+        while node != start:
+            parent = parents[node]
+            dr, dc = _sign(parent[0] - node[0]), _sign(parent[1] - node[1])
+            r, c = node
+            while (r, c) != parent:
+                r, c = r + dr, c + dc
+                path.append((r, c))
+            node = parent
+        path.reverse()
+        return path
+
+    @staticmethod
+    def _walker(grid: Grid):
+        rows, cols, passable = grid.rows, grid.cols, grid.passable
+
+        def walk(r: int, c: int) -> bool:
+            return 0 <= r < rows and 0 <= c < cols and passable((r, c))
+        return walk
+
+    # -- 8-connected, diagonal moves may cut corners (CornerCutting.ALWAYS) --
+
+    def _prune8(self, walk, node: Coord, dr: int, dc: int) -> List[Coord]:
+        r, c = node
+        out: List[Coord] = []
+        if dr and dc:
+            out += [(r + dr, c), (r, c + dc), (r + dr, c + dc)]
+            if not walk(r, c - dc):
+                out.append((r + dr, c - dc))
+            if not walk(r - dr, c):
+                out.append((r - dr, c + dc))
+        elif dr:
+            out.append((r + dr, c))
+            if not walk(r, c + 1):
+                out.append((r + dr, c + 1))
+            if not walk(r, c - 1):
+                out.append((r + dr, c - 1))
+        else:
+            out.append((r, c + dc))
+            if not walk(r + 1, c):
+                out.append((r + 1, c + dc))
+            if not walk(r - 1, c):
+                out.append((r - 1, c + dc))
+        return [nb for nb in out if walk(nb[0], nb[1])]
+
+    def _jump8(self, walk, r: int, c: int, dr: int, dc: int, goal: Coord) -> Optional[Coord]:
+        while True:
+            r, c = r + dr, c + dc
+            if not walk(r, c):
+                return None
+            if (r, c) == goal:
+                return r, c
+            if dr and dc:
+                if ((walk(r + dr, c - dc) and not walk(r, c - dc)) or
+                        (walk(r - dr, c + dc) and not walk(r - dr, c))):
+                    return r, c
+                if (self._jump8(walk, r, c, dr, 0, goal) is not None or
+                        self._jump8(walk, r, c, 0, dc, goal) is not None):
+                    return r, c
+            elif dr:
+                if ((walk(r + dr, c + 1) and not walk(r, c + 1)) or
+                        (walk(r + dr, c - 1) and not walk(r, c - 1))):
+                    return r, c
+            else:
+                if ((walk(r + 1, c + dc) and not walk(r + 1, c)) or
+                        (walk(r - 1, c + dc) and not walk(r - 1, c))):
+                    return r, c
+
+    # -- 8-connected, a diagonal move needs one of its two orthogonal cells open --
+
+    def _prune8_one(self, walk, node: Coord, dr: int, dc: int) -> List[Coord]:
+        r, c = node
+        out: List[Coord] = []
+        if dr and dc:
+            vertical, horizontal = walk(r + dr, c), walk(r, c + dc)
+            if vertical:
+                out.append((r + dr, c))
+            if horizontal:
+                out.append((r, c + dc))
+            if vertical or horizontal:
+                out.append((r + dr, c + dc))
+            if not walk(r, c - dc) and vertical:
+                out.append((r + dr, c - dc))
+            if not walk(r - dr, c) and horizontal:
+                out.append((r - dr, c + dc))
+        elif dr:
+            if walk(r + dr, c):
+                out.append((r + dr, c))
+                if not walk(r, c + 1):
+                    out.append((r + dr, c + 1))
+                if not walk(r, c - 1):
+                    out.append((r + dr, c - 1))
+        else:
+            if walk(r, c + dc):
+                out.append((r, c + dc))
+                if not walk(r + 1, c):
+                    out.append((r + 1, c + dc))
+                if not walk(r - 1, c):
+                    out.append((r - 1, c + dc))
+        return [nb for nb in out if walk(nb[0], nb[1])]
+
+    def _jump8_one(self, walk, r: int, c: int, dr: int, dc: int, goal: Coord) -> Optional[Coord]:
+        while True:
+            r, c = r + dr, c + dc
+            if not walk(r, c):
+                return None
+            if (r, c) == goal:
+                return r, c
+            if dr and dc:
+                if ((walk(r + dr, c - dc) and not walk(r, c - dc)) or
+                        (walk(r - dr, c + dc) and not walk(r - dr, c))):
+                    return r, c
+                if (self._jump8_one(walk, r, c, dr, 0, goal) is not None or
+                        self._jump8_one(walk, r, c, 0, dc, goal) is not None):
+                    return r, c
+                if not (walk(r + dr, c) or walk(r, c + dc)):
+                    return None  # both sides of the next diagonal step are blocked
+            elif dr:
+                if ((walk(r + dr, c + 1) and not walk(r, c + 1)) or
+                        (walk(r + dr, c - 1) and not walk(r, c - 1))):
+                    return r, c
+            else:
+                if ((walk(r + 1, c + dc) and not walk(r + 1, c)) or
+                        (walk(r - 1, c + dc) and not walk(r - 1, c))):
+                    return r, c
+
+    # -- 8-connected, a diagonal move needs both orthogonal cells open --
+
+    def _prune8_never(self, walk, node: Coord, dr: int, dc: int) -> List[Coord]:
+        r, c = node
+        out: List[Coord] = []
+        if dr and dc:
+            vertical, horizontal = walk(r + dr, c), walk(r, c + dc)
+            if vertical:
+                out.append((r + dr, c))
+            if horizontal:
+                out.append((r, c + dc))
+            if vertical and horizontal:
+                out.append((r + dr, c + dc))
+        elif dr:
+            ahead, right, left = walk(r + dr, c), walk(r, c + 1), walk(r, c - 1)
+            if ahead:
+                out.append((r + dr, c))
+                if right:
+                    out.append((r + dr, c + 1))
+                if left:
+                    out.append((r + dr, c - 1))
+            if right:
+                out.append((r, c + 1))
+            if left:
+                out.append((r, c - 1))
+        else:
+            ahead, down, up = walk(r, c + dc), walk(r + 1, c), walk(r - 1, c)
+            if ahead:
+                out.append((r, c + dc))
+                if down:
+                    out.append((r + 1, c + dc))
+                if up:
+                    out.append((r - 1, c + dc))
+            if down:
+                out.append((r + 1, c))
+            if up:
+                out.append((r - 1, c))
+        return [nb for nb in out if walk(nb[0], nb[1])]
+
+    def _jump8_never(self, walk, r: int, c: int, dr: int, dc: int, goal: Coord) -> Optional[Coord]:
+        while True:
+            r, c = r + dr, c + dc
+            if not walk(r, c):
+                return None
+            if (r, c) == goal:
+                return r, c
+            if dr and dc:
+                if (self._jump8_never(walk, r, c, dr, 0, goal) is not None or
+                        self._jump8_never(walk, r, c, 0, dc, goal) is not None):
+                    return r, c
+                if not (walk(r + dr, c) and walk(r, c + dc)):
+                    return None  # the next diagonal step would cut a corner
+            elif dr:
+                # a side opens up right after passing an obstacle
+                if ((walk(r, c - 1) and not walk(r - dr, c - 1)) or
+                        (walk(r, c + 1) and not walk(r - dr, c + 1))):
+                    return r, c
+            else:
+                if ((walk(r - 1, c) and not walk(r - 1, c - dc)) or
+                        (walk(r + 1, c) and not walk(r + 1, c - dc))):
+                    return r, c
+
+    # -- 4-connected --
+
+    def _prune4(self, walk, node: Coord, dr: int, dc: int) -> List[Coord]:
+        r, c = node
+        if dc:
+            out = [(r - 1, c), (r + 1, c), (r, c + dc)]
+        else:
+            out = [(r, c - 1), (r, c + 1), (r + dr, c)]
+        return [nb for nb in out if walk(nb[0], nb[1])]
+
+    def _jump4(self, walk, r: int, c: int, dr: int, dc: int, goal: Coord) -> Optional[Coord]:
+        while True:
+            r, c = r + dr, c + dc
+            if not walk(r, c):
+                return None
+            if (r, c) == goal:
+                return r, c
+            if dc:
+                if ((walk(r - 1, c) and not walk(r - 1, c - dc)) or
+                        (walk(r + 1, c) and not walk(r + 1, c - dc))):
+                    return r, c
+            else:
+                if ((walk(r, c - 1) and not walk(r - dr, c - 1)) or
+                        (walk(r, c + 1) and not walk(r - dr, c + 1))):
+                    return r, c
+                # vertical runs must stop wherever a horizontal run finds a jump point
+                if (self._jump4(walk, r, c, 0, 1, goal) is not None or
+                        self._jump4(walk, r, c, 0, -1, goal) is not None):
+                    return r, c
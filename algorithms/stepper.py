@@ -0,0 +1,73 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import Generator, List, Optional, Tuple
+
+from core.metrics import Metrics
+
+Coord = Tuple[int, int]
+
+# What an algorithm's step generator yields once per expansion: the expanded
+# cell and the cells it pushed onto the open list. The generator's return
+# value is the final path ([] when there is none).
+Expansion = Tuple[Coord, List[Coord]]
+Steps = Generator[Expansion, None, List[Coord]]
+
+
+def drain(steps: Steps) -> List[Coord]:
+    """Run a step generator to completion and return its path; what ``search`` uses."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value or []
+
+
+@dataclass
+class StepDelta:
+    """Search state that changed during one ``SearchStepper.step`` call."""
+
+    opened: List[Coord] = field(default_factory=list)
+    closed: List[Coord] = field(default_factory=list)
+    done: bool = False
+    path: List[Coord] = field(default_factory=list)
+
+
+class SearchStepper:
+    """Runs a search a bounded number of expansions at a time.
+
+    Obtained from ``Algorithm.stepper``. Each ``step(n)`` performs at most
+    ``n`` expansions and returns only what changed, so a caller can spend a
+    fixed budget per frame and draw the deltas as they arrive. ``metrics``
+    accumulates across calls; ``runtime_ms`` counts only time spent stepping.
+    """
+
+    def __init__(self, steps: Optional[Steps], metrics: Metrics) -> None:
+        self._steps = steps
+        self.metrics = metrics
+        self.path: List[Coord] = []
+        self.done = steps is None
+
+    def step(self, n: int = 1) -> StepDelta:
+        delta = StepDelta(done=self.done, path=self.path)
+        if self.done:
+            return delta
+        start_ns = time.perf_counter_ns()
+        steps, opened, closed = self._steps, delta.opened, delta.closed
+        try:
+            for _ in range(n):
+                cell, pushed = next(steps)
+                closed.append(cell)
+                opened.extend(pushed)
+        except StopIteration as stop:
+            self.done = delta.done = True
+            self.path = delta.path = stop.value or []
+            self.metrics.path_length = len(self.path)
+        self.metrics.runtime_ms += (time.perf_counter_ns() - start_ns) / 1_000_000.0
+        return delta
+
+    def run(self) -> Tuple[List[Coord], Metrics]:
+        """Step to completion and return ``(path, metrics)`` like ``search``."""
+        while not self.done:
+            self.step(4096)
+        return self.path, self.metrics
@@ -0,0 +1,182 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.grid import CornerCutting, Grid
+
+Coord = Tuple[int, int]
+
+
+class DistanceField:
+    """Distance and parent field from a single source over a whole grid.
+
+    ``dist`` holds the cost from the source (``inf`` where unreachable) and
+    ``parents`` the index into ``directions`` of the move that reached each
+    cell (-1 for the source and unreachable cells). Paths are recovered by
+    walking the parent field back from the goal.
+    """
+
+    def __init__(self, source: Coord, directions: Sequence[Coord], dist: np.ndarray, parents: np.ndarray) -> None:
+        self.source = source
+        self.directions = list(directions)
+        self.dist = dist
+        self.parents = parents
+
+    def distance(self, coord: Coord) -> float:
+        return float(self.dist[coord])
+
+    def reachable(self, coord: Coord) -> bool:
+        return bool(np.isfinite(self.dist[coord]))
+
+    def path_to(self, goal: Coord) -> List[Coord]:
+        if not self.reachable(goal):
+            return []
+        path = [goal]
+        r, c = goal
+        parents, directions = self.parents, self.directions
+        while (r, c) != self.source:
+            dr, dc = directions[parents[r, c]]
+            r, c = r - dr, c - dc
+            path.append((r, c))
+        path.reverse()
+        return path
+
+
+def passable_mask(grid: Grid) -> np.ndarray:
+    mask = np.ones((grid.rows, grid.cols), dtype=bool)
+    blocks = [b for b in grid.blocks if grid.in_bounds(b)]
+    if blocks:
+        idx = np.array(blocks, dtype=np.intp)
+        mask[idx[:, 0], idx[:, 1]] = False
+    return mask
+
+
+def weight_array(grid: Grid) -> np.ndarray:
+    weights = np.ones((grid.rows, grid.cols), dtype=np.float64)
+    if grid.weights:
+        idx = np.array(list(grid.weights.keys()), dtype=np.intp)
+        weights[idx[:, 0], idx[:, 1]] = np.fromiter(grid.weights.values(), dtype=np.float64, count=len(idx))
+    return weights
+
+
+def _padded_flat(values: np.ndarray, fill) -> np.ndarray:
+    # Surround with a one-cell border so neighbor indices never leave the array
+    return np.pad(values, 1, constant_values=fill).ravel()
+
+
+def _flat_offsets(directions: Sequence[Coord], width: int) -> List[int]:
+    return [dr * width + dc for dr, dc in directions]
+
+
+def _corner_ok(open_flat: np.ndarray, cells: np.ndarray, direction: Coord, width: int,
+               corner_cutting: CornerCutting) -> np.ndarray:
+    # which of ``cells`` may take the move ``direction`` under the corner rule
+    dr, dc = direction
+    if not (dr and dc) or corner_cutting == CornerCutting.ALWAYS:
+        return np.ones(cells.size, dtype=bool)
+    sides = open_flat[cells + dr * width].astype(np.int8) + open_flat[cells + dc]
+    return sides >= int(corner_cutting)
+
+
+def _bfs_field(mask: np.ndarray, source: Coord, directions: Sequence[Coord], step_cost: float = 1.0,
+               corner_cutting: CornerCutting = CornerCutting.ALWAYS) -> Tuple[np.ndarray, np.ndarray]:
+    rows, cols = mask.shape
+    width = cols + 2
+    open_flat = _padded_flat(mask, False)
+    unvisited = open_flat.copy()
+    dist = np.full(unvisited.shape, np.inf)
+    parents = np.full(unvisited.shape, -1, dtype=np.int8)
+
+    src = (source[0] + 1) * width + source[1] + 1
+    dist[src] = 0.0
+    unvisited[src] = False
+    frontier = np.array([src], dtype=np.intp)
+    offsets = _flat_offsets(directions, width)
+
+    layer = 0
+    while frontier.size:
+        layer += 1
+        reached = []
+        for i, off in enumerate(offsets):
+            # Directions are applied in grid order and claimed cells are
+            # cleared immediately, so each cell gets exactly one parent.
+            cand = frontier + off
+            cand = cand[unvisited[cand] & _corner_ok(open_flat, frontier, directions[i], width, corner_cutting)]
+            unvisited[cand] = False
+            parents[cand] = i
+            reached.append(cand)
+        frontier = np.concatenate(reached)
+        dist[frontier] = layer * step_cost
+
+    shape = (rows + 2, width)
+    return dist.reshape(shape)[1:-1, 1:-1], parents.reshape(shape)[1:-1, 1:-1]
+
+
+def _dijkstra_field(mask: np.ndarray, weights: np.ndarray, source: Coord, directions: Sequence[Coord],
+                    base_costs: Optional[Sequence[float]] = None,
+                    corner_cutting: CornerCutting = CornerCutting.ALWAYS) -> Tuple[np.ndarray, np.ndarray]:
+    # Synchronous label-correcting relaxation: each round relaxes every edge
+    # out of the cells improved in the previous round, so the fixed point is
+    # the exact shortest-path field. Edge cost is the direction's base cost
+    # times the weight of the target cell, as in Grid.get_cost.
+    rows, cols = mask.shape
+    width = cols + 2
+    open_flat = _padded_flat(mask, False)
+    cost = _padded_flat(np.where(mask, weights, np.inf), np.inf)
+    if base_costs is None:
+        base_costs = [1.0] * len(directions)
+    dist = np.full(cost.shape, np.inf)
+    parents = np.full(cost.shape, -1, dtype=np.int8)
+
+    src = (source[0] + 1) * width + source[1] + 1
+    dist[src] = 0.0
+    active = np.array([src], dtype=np.intp)
+    offsets = _flat_offsets(directions, width)
+    dir_ids = np.arange(len(offsets), dtype=np.int8)
+
+    while active.size:
+        base = dist[active]
+        cand = np.concatenate([active + off for off in offsets])
+        step = np.concatenate([np.where(_corner_ok(open_flat, active, d, width, corner_cutting), move, np.inf)
+                               for d, move in zip(directions, base_costs)])
+        vals = np.tile(base, len(offsets)) + step * cost[cand]
+        dirs = np.repeat(dir_ids, active.size)
+        better = vals < dist[cand]
+        if not better.any():
+            break
+        cand, vals, dirs = cand[better], vals[better], dirs[better]
+        # keep the cheapest candidate per cell, earliest direction on ties
+        order = np.lexsort((dirs, vals, cand))
+        cand, vals, dirs = cand[order], vals[order], dirs[order]
+        first = np.ones(cand.size, dtype=bool)
+        first[1:] = cand[1:] != cand[:-1]
+        active = cand[first]
+        dist[active] = vals[first]
+        parents[active] = dirs[first]
+
+    shape = (rows + 2, width)
+    return dist.reshape(shape)[1:-1, 1:-1], parents.reshape(shape)[1:-1, 1:-1]
+
+
+def build_field(grid: Grid, source: Coord, weighted: Optional[bool] = None) -> DistanceField:
+    """Build the distance field from ``source`` to every cell of ``grid``.
+
+    Unit-cost grids use a layer-at-a-time wavefront; ``weighted`` (default:
+    whenever ``grid.weights`` is non-empty or diagonal moves cost more than
+    straight ones) switches to exact relaxation over the grid's move costs,
+    matching Dijkstra's costs. Both follow ``grid.corner_cutting``.
+    """
+    if not grid.in_bounds(source):
+        raise IndexError("source out of bounds")
+    moves = grid.moves
+    if weighted is None:
+        weighted = bool(grid.weights) or len({base for _, _, base in moves}) > 1
+    mask = passable_mask(grid)
+    directions = grid.directions
+    if weighted:
+        dist, parents = _dijkstra_field(mask, weight_array(grid), source, directions,
+                                        [base for _, _, base in moves], grid.corner_cutting)
+    else:
+        dist, parents = _bfs_field(mask, source, directions, grid.straight_cost, grid.corner_cutting)
+    return DistanceField(source, directions, dist, parents)
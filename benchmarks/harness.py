@@ -0,0 +1,361 @@
+from __future__ import annotations
+import argparse
+import copy
+import gc
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from benchmarks.runner import ALGS, UNIFORM_ONLY, build_grid, parse_sizes, path_cost, percentile
+from core.metrics import Instrumentation
+
+FORMAT_VERSION = 2
+BOOTSTRAP_RESAMPLES = 2000
+# Exact Mann-Whitney p-values are used up to this many run pairs (n1 * n2)
+EXACT_LIMIT = 2500
+
+_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def result_key(alg: str, rows: int, cols: int, density: float) -> str:
+    return f"{alg}/{rows}x{cols}/{density}"
+
+
+# -- statistics ------------------------------------------------------------------
+
+
+def bootstrap_ci(runs: Sequence[Sequence[float]], pct: float, confidence: float = 0.95,
+                 resamples: int = BOOTSTRAP_RESAMPLES, seed: int = 0) -> Tuple[float, float]:
+    """Confidence interval for the ``pct`` percentile of the pooled samples of ``runs``.
+
+    Resamples whole runs, then the samples within each, so the interval
+    carries the run-to-run spread and not just the noise inside one
+    process. Seeded, so the same runs always give the same interval.
+    """
+    rng = random.Random(seed)
+    stats = []
+    for _ in range(resamples):
+        pooled = []
+        for _ in range(len(runs)):
+            run = runs[rng.randrange(len(runs))]
+            pooled.extend(run[rng.randrange(len(run))] for _ in range(len(run)))
+        pooled.sort()
+        stats.append(percentile(pooled, pct))
+    stats.sort()
+    tail = (1.0 - confidence) / 2 * 100
+    return percentile(stats, tail), percentile(stats, 100 - tail)
+
+
+def tukey_outliers(values: List[float]) -> int:
+    # samples outside 1.5 IQR of the quartiles; values must be sorted
+    q1, q3 = percentile(values, 25), percentile(values, 75)
+    spread = 1.5 * (q3 - q1)
+    return sum(1 for v in values if v < q1 - spread or v > q3 + spread)
+
+
+def _median(values: Sequence[float]) -> float:
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+def summarize(runs: List[List[float]], confidence: float = 0.95) -> dict:
+    """Statistics of one configuration measured over several runs (one list of samples per run)."""
+    pooled = sorted(v for run in runs for v in run)
+    run_medians = [_median(run) for run in runs]
+    center = _median(run_medians)
+    out = {'runs': len(runs), 'n': len(pooled), 'mean_ms': sum(pooled) / len(pooled), 'min_ms': pooled[0],
+           'outliers': tukey_outliers(pooled), 'run_medians_ms': run_medians,
+           # relative spread of the run medians: the noise floor of this configuration
+           'noise': (max(run_medians) - min(run_medians)) / center if center else 0.0}
+    for name, pct in (('median', 50), ('p95', 95), ('p99', 99)):
+        out[f'{name}_ms'] = percentile(pooled, pct)
+        out[f'{name}_ci'] = list(bootstrap_ci(runs, pct, confidence))
+    return out
+
+
+def _u_statistic(base: Sequence[float], new: Sequence[float]) -> Tuple[float, float]:
+    # U of ``new`` (pairs where new is larger, ties count half) and the tie term
+    pooled = sorted([(v, 0) for v in base] + [(v, 1) for v in new])
+    n = len(pooled)
+    rank_new = 0.0
+    ties = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j < n and pooled[j][0] == pooled[i][0]:
+            j += 1
+        avg = (i + j + 1) / 2  # ranks are 1-based
+        rank_new += avg * sum(1 for k in range(i, j) if pooled[k][1])
+        t = j - i
+        ties += t ** 3 - t
+        i = j
+    return rank_new - len(new) * (len(new) + 1) / 2, ties
+
+
+def _exact_upper(n1: int, n2: int, u: float) -> float:
+    # P(U >= u) under the null, counting rank arrangements without ties
+    counts = [[[0] * (n1 * n2 + 1) for _ in range(n2 + 1)] for _ in range(n1 + 1)]
+    for i in range(n1 + 1):
+        counts[i][0][0] = 1
+    for j in range(n2 + 1):
+        counts[0][j][0] = 1
+    for i in range(1, n1 + 1):
+        for j in range(1, n2 + 1):
+            for x in range(i * j + 1):
+                # the largest value is from ``new`` (adds i to U) or from ``base``
+                counts[i][j][x] = (counts[i][j - 1][x - i] if x >= i else 0) + counts[i - 1][j][x]
+    table = counts[n1][n2]
+    return sum(table[math.ceil(u):]) / math.comb(n1 + n2, n1)
+
+
+def mann_whitney(base: Sequence[float], new: Sequence[float]) -> Tuple[float, float]:
+    """One-sided Mann-Whitney U p-values: (new tends to be larger, new tends to be smaller).
+
+    Exact for small tie-free samples (the usual case with a handful of run
+    medians), otherwise the normal approximation with tie and continuity
+    corrections.
+    """
+    n1, n2 = len(base), len(new)
+    u, ties = _u_statistic(base, new)
+    if not ties and n1 * n2 <= EXACT_LIMIT:
+        return _exact_upper(n1, n2, u), _exact_upper(n1, n2, n1 * n2 - u)
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    var = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if var <= 0:
+        return 1.0, 1.0
+    sd = math.sqrt(var)
+    greater = 0.5 * math.erfc((u - mean - 0.5) / sd / math.sqrt(2))
+    less = 0.5 * math.erfc((mean - u - 0.5) / sd / math.sqrt(2))
+    return min(1.0, greater), min(1.0, less)
+
+
+# -- measuring -------------------------------------------------------------------
+
+
+def measure(alg_name: str, rows: int, cols: int, density: float, seeds: List[int], warmup: int, trials: int,
+            max_weight: int = 1) -> dict:
+    """Time one algorithm on one configuration in this process: one run.
+
+    Each seed's grid is built once and searched corner to corner ``warmup``
+    times untimed, then ``trials`` rounds each search every grid once. A
+    sample is the wall time of one ``search`` call (``perf_counter_ns``) with
+    instrumentation off and the garbage collector paused, so the search
+    itself is all that is timed.
+    """
+    alg = copy.copy(ALGS[alg_name])
+    if hasattr(alg, 'instrumentation'):
+        alg.instrumentation = Instrumentation.OFF
+    grids = [build_grid(rows, cols, density, seed, max_weight) for seed in seeds]
+    start, goal = (0, 0), (rows - 1, cols - 1)
+    for grid in grids:
+        for _ in range(warmup):
+            alg.search(grid, start, goal)
+
+    samples: List[float] = []
+    enabled = gc.isenabled()
+    try:
+        for _ in range(trials):
+            for grid in grids:
+                gc.collect()
+                gc.disable()
+                t0 = time.perf_counter_ns()
+                alg.search(grid, start, goal)
+                samples.append((time.perf_counter_ns() - t0) / 1_000_000.0)
+                if enabled:
+                    gc.enable()
+    finally:
+        if enabled:
+            gc.enable()
+
+    # behaviour fingerprint, so a compare can tell a slower search from a different one
+    costs = []
+    for grid in grids:
+        path, _ = alg.search(grid, start, goal)
+        costs.append(path_cost(grid, path) if path else None)
+    return {'samples_ms': samples, 'path_costs': costs}
+
+
+def measure_in_process(alg_name: str, rows: int, cols: int, density: float, seeds: List[int], warmup: int,
+                       trials: int, max_weight: int = 1) -> dict:
+    """``measure`` in a fresh interpreter, so each run has its own heap, caches and allocator state."""
+    spec = json.dumps({'alg': alg_name, 'rows': rows, 'cols': cols, 'density': density, 'seeds': seeds,
+                       'warmup': warmup, 'trials': trials, 'max_weight': max_weight})
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (_REPO, env.get('PYTHONPATH')) if p)
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.harness', 'measure', spec], cwd=_REPO, env=env,
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def run(args: argparse.Namespace) -> int:
+    selected = args.algs.split(',') if args.algs else list(ALGS)
+    unknown = [name for name in selected if name not in ALGS]
+    if unknown:
+        print(f"unknown algorithm(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    if args.repeats < 2:
+        print("need at least 2 repeats to measure run-to-run noise", file=sys.stderr)
+        return 2
+    alg_names = [alg for alg in selected if not (args.max_weight > 1 and alg in UNIFORM_ONLY)]
+    densities = [float(d) for d in args.densities.split(',')]
+    seeds = [args.seed + i for i in range(args.runs)]
+    configs = [(alg_name, rows, cols, density) for rows, cols in parse_sizes(args.sizes)
+               for density in densities for alg_name in alg_names]
+
+    # repeats are the outer loop, so slow drift of the machine hits every configuration alike
+    measured = {config: [] for config in configs}
+    for repeat in range(args.repeats):
+        print(f"repeat {repeat + 1}/{args.repeats}", file=sys.stderr)
+        for config in configs:
+            measured[config].append(measure_in_process(*config, seeds, args.warmup, args.trials, args.max_weight))
+
+    baseline = {
+        'format': FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'warmup': args.warmup, 'trials': args.trials, 'repeats': args.repeats, 'seeds': seeds,
+                   'max_weight': args.max_weight, 'confidence': args.confidence},
+        'results': {},
+    }
+    print(f"{'key':<32}{'runs':>5}{'median ms':>11}{'ci':>20}{'p95 ms':>10}{'p99 ms':>10}{'noise':>7}")
+    for config, runs in measured.items():
+        alg_name, rows, cols, density = config
+        samples = [r['samples_ms'] for r in runs]
+        res = {'alg': alg_name, 'rows': rows, 'cols': cols, 'density': density,
+               'path_costs': runs[0]['path_costs']}
+        res.update(summarize(samples, args.confidence))
+        res['samples_ms'] = samples
+        key = result_key(alg_name, rows, cols, density)
+        baseline['results'][key] = res
+        lo, hi = res['median_ci']
+        print(f"{key:<32}{res['runs']:>5}{res['median_ms']:>11.3f}{f'[{lo:.3f}, {hi:.3f}]':>20}"
+              f"{res['p95_ms']:>10.3f}{res['p99_ms']:>10.3f}{res['noise']:>7.1%}")
+    with open(args.out, 'w') as fh:
+        json.dump(baseline, fh, indent=1)
+    print(f"Wrote {len(baseline['results'])} results to {args.out}")
+    return 0
+
+
+# -- comparing -------------------------------------------------------------------
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as fh:
+        data = json.load(fh)
+    if data.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{path}: not a benchmark baseline (format {FORMAT_VERSION})")
+    return data
+
+
+def compare_results(base: dict, new: dict, alpha: float = 0.01, threshold: float = 0.10) -> List[dict]:
+    """Compare every configuration present in both baselines.
+
+    The unit is the run: the test compares the run medians of the two
+    baselines (one-sided Mann-Whitney), since samples inside one process
+    share its drift and are not independent. A configuration regresses when
+    its new runs are significantly slower (p < ``alpha``) and the median of
+    run medians grew by more than the larger of ``threshold`` and the
+    run-to-run noise either baseline measured; improvements are the mirror
+    image. Anything else is unchanged, however the medians moved.
+    """
+    rows = []
+    for key in sorted(set(base['results']) & set(new['results'])):
+        b, n = base['results'][key], new['results'][key]
+        b_runs, n_runs = b['run_medians_ms'], n['run_medians_ms']
+        p_slower, p_faster = mann_whitney(b_runs, n_runs)
+        b_mid, n_mid = _median(b_runs), _median(n_runs)
+        ratio = n_mid / b_mid if b_mid else math.inf
+        floor = max(threshold, b['noise'], n['noise'])
+        if p_slower < alpha and ratio > 1 + floor:
+            verdict = 'REGRESSION'
+        elif p_faster < alpha and ratio < 1 / (1 + floor):
+            verdict = 'improved'
+        else:
+            verdict = 'same'
+        rows.append({'key': key, 'base_ms': b_mid, 'new_ms': n_mid, 'ratio': ratio, 'floor': floor,
+                     'p': p_slower if ratio >= 1 else p_faster, 'verdict': verdict,
+                     'runs': (len(b_runs), len(n_runs)),
+                     'behaviour_changed': b.get('path_costs') != n.get('path_costs')})
+    return rows
+
+
+def compare(args: argparse.Namespace) -> int:
+    base, new = load_baseline(args.base), load_baseline(args.new)
+    rows = compare_results(base, new, args.alpha, args.threshold)
+    print(f"{'key':<32}{'base ms':>10}{'new ms':>10}{'ratio':>8}{'floor':>7}{'p':>10}  verdict")
+    for row in rows:
+        notes = []
+        if row['behaviour_changed']:
+            notes.append('path costs differ')
+        n1, n2 = row['runs']
+        if 1 / math.comb(n1 + n2, n1) >= args.alpha:
+            notes.append(f'{n1} vs {n2} runs cannot reach alpha')
+        note = f"  ({'; '.join(notes)})" if notes else ''
+        print(f"{row['key']:<32}{row['base_ms']:>10.3f}{row['new_ms']:>10.3f}{row['ratio']:>8.3f}"
+              f"{row['floor']:>7.1%}{row['p']:>10.2g}  {row['verdict']}{note}")
+    for label, only in (('base', set(base['results']) - set(new['results'])),
+                        ('new', set(new['results']) - set(base['results']))):
+        for key in sorted(only):
+            print(f"{key:<32} only in {label}")
+    regressions = sum(row['verdict'] == 'REGRESSION' for row in rows)
+    if regressions:
+        print(f"{regressions} significant regression(s) at alpha={args.alpha}, threshold={args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def _measure_command(args: argparse.Namespace) -> int:
+    # one run for measure_in_process; the result goes to stdout as JSON
+    spec = json.loads(args.spec)
+    print(json.dumps(measure(spec['alg'], spec['rows'], spec['cols'], spec['density'], spec['seeds'],
+                             spec['warmup'], spec['trials'], spec['max_weight'])))
+    return 0
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Repeated-run benchmarks with JSON baselines.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_run = sub.add_parser('run', help='measure and write a baseline')
+    p_run.add_argument('--algs', type=str, default='astar', help='comma-separated algorithms')
+    p_run.add_argument('--sizes', type=str, default='100x100', help='comma-separated RxC list')
+    p_run.add_argument('--densities', type=str, default='0.2', help='comma-separated densities')
+    p_run.add_argument('--runs', type=int, default=3, help='seeded grids per configuration')
+    p_run.add_argument('--seed', type=int, default=0, help='base seed; grid i uses seed + i')
+    p_run.add_argument('--max-weight', type=int, default=1, help='random integer cell weights in [1, N]')
+    p_run.add_argument('--repeats', type=int, default=5,
+                       help='independent runs per configuration, each in a fresh process')
+    p_run.add_argument('--warmup', type=int, default=3, help='untimed searches per grid at the start of a run')
+    p_run.add_argument('--trials', type=int, default=10, help='timed rounds over all grids per run')
+    p_run.add_argument('--confidence', type=float, default=0.95, help='bootstrap interval confidence')
+    p_run.add_argument('--out', type=str, default='baseline.json')
+    p_run.set_defaults(func=run)
+
+    p_cmp = sub.add_parser('compare', help='flag significant regressions between two baselines')
+    p_cmp.add_argument('base', type=str)
+    p_cmp.add_argument('new', type=str)
+    p_cmp.add_argument('--alpha', type=float, default=0.01, help='significance level of the one-sided test')
+    p_cmp.add_argument('--threshold', type=float, default=0.10,
+                       help='smallest relative change of the median that counts (raised to the measured noise)')
+    p_cmp.set_defaults(func=compare)
+
+    p_one = sub.add_parser('measure')  # internal: one run, used by measure_in_process
+    p_one.add_argument('spec', type=str)
+    p_one.set_defaults(func=_measure_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
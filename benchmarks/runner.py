@@ -1,16 +1,25 @@
 from __future__ import annotations
 import argparse
+import copy
 import csv
 import random
 import time
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
 
+from core.chunked import ChunkedGrid, ProceduralTiles
 from core.grid import Grid
+from core.metrics import Instrumentation, Metrics
+from core.movingai import iter_scenarios, load_map
 from algorithms.astar import AStar
 from algorithms.dijkstra import Dijkstra
 from algorithms.bfs import BFS
-from algorithms.bidirectional import BidirectionalBFS
-from core.heuristics import manhattan, euclidean, octile
+from algorithms.bitbfs import BitBFS
+from algorithms.bidirectional import BidirectionalAStar, BidirectionalBFS, BidirectionalDijkstra
+from algorithms.jps import JumpPointSearch
+from algorithms.anytime import ARAStar, WeightedAStar
+from algorithms.flowfield import FlowField
+from core.heuristics import for_grid, manhattan, euclidean, octile
 
 Coord = Tuple[int, int]
 
@@ -20,54 +29,441 @@ ALGS = {
     'astar_euclid': AStar(euclidean),
     'dijkstra': Dijkstra(),
     'bfs': BFS(),
+    'bitbfs': BitBFS(),
     'bidir': BidirectionalBFS(),
+    'jps': JumpPointSearch(),
+    'bidir_dijkstra': BidirectionalDijkstra(),
+    'bidir_astar': BidirectionalAStar(manhattan),
+    'astar_dary': AStar(manhattan, queue='dary'),
+    'astar_bucket': AStar(manhattan, queue='bucket'),
+    'astar_radix': AStar(manhattan, queue='radix'),
+    'dijkstra_bucket': Dijkstra(queue='bucket'),
+    'dijkstra_radix': Dijkstra(queue='radix'),
+    'wastar': WeightedAStar(2.0, manhattan),
+    'arastar': ARAStar(3.0, 0.5, heuristic=manhattan),
 }
 
+# Algorithms whose path cost must equal the A* reference on the same seed
+COST_CHECKED = ('jps', 'bidir_dijkstra', 'bidir_astar', 'astar_dary', 'astar_bucket', 'astar_radix',
+                'dijkstra', 'dijkstra_bucket', 'dijkstra_radix', 'arastar')
+# Algorithms that only accept grids without cell weights
+UNIFORM_ONLY = ('jps',)
+# Algorithms on an integer open list, which only accept integral move costs and heuristics
+INTEGER_ONLY = ('astar_bucket', 'astar_radix', 'dijkstra_bucket', 'dijkstra_radix')
+# Algorithms whose hot-loop bookkeeping follows their ``instrumentation`` level
+INSTRUMENTED = ('astar', 'astar_euclid', 'dijkstra', 'bfs', 'bitbfs', 'bidir', 'astar_dary', 'astar_bucket',
+                'astar_radix', 'dijkstra_bucket', 'dijkstra_radix')
 
-def run_once(rows: int, cols: int, density: float, alg_name: str, seed: int) -> dict:
+
+def path_cost(grid: Grid, path: List[Coord]) -> float:
+    return sum(grid.get_cost(a, b) for a, b in zip(path, path[1:]))
+
+
+def integral_costs(grid: Grid) -> bool:
+    """True when every move cost (and so the default heuristic) is a whole number."""
+    if not float(grid.straight_cost).is_integer():
+        return False
+    if grid.diagonal and not float(grid.diagonal_cost).is_integer():
+        return False
+    return all(float(w).is_integer() for w in grid.weights.values())
+
+
+def build_grid(rows: int, cols: int, density: float, seed: int, max_weight: int = 1) -> Grid:
     rng = random.Random(seed)
     grid = Grid(rows, cols, diagonal=False)
     grid.randomize_blocks(density, rng)
+    if max_weight > 1:
+        for r in range(rows):
+            for c in range(cols):
+                grid.set_weight((r, c), rng.randint(1, max_weight))
+    return grid
+
+
+def _measure(grid: Grid, alg_name: str) -> dict:
     start = (0, 0)
-    goal = (rows - 1, cols - 1)
+    goal = (grid.rows - 1, grid.cols - 1)
 
     alg = ALGS[alg_name]
     start_time = time.perf_counter()
     path, metrics = alg.search(grid, start, goal)
     elapsed = (time.perf_counter() - start_time) * 1000.0
     result = metrics.to_dict()
-    result.update({'alg': alg_name, 'rows': rows, 'cols': cols, 'density': density, 'seed': seed, 'wall_time_ms': elapsed})
+    result.update({'alg': alg_name, 'wall_time_ms': elapsed, 'path_cost': path_cost(grid, path)})
     return result
 
 
+def run_once(rows: int, cols: int, density: float, alg_name: str, seed: int, max_weight: int = 1) -> dict:
+    result = _measure(build_grid(rows, cols, density, seed, max_weight), alg_name)
+    result.update({'rows': rows, 'cols': cols, 'density': density, 'seed': seed})
+    return result
+
+
+def run_grid(rows: int, cols: int, density: float, seed: int, alg_names: List[str], max_weight: int = 1) -> List[dict]:
+    """Build one seeded grid and run every algorithm in ``alg_names`` on it.
+
+    This is the unit of work handed to pool workers, so each grid is generated
+    once per (size, density, seed) instead of once per algorithm.
+    """
+    grid = build_grid(rows, cols, density, seed, max_weight)
+    results = []
+    for alg_name in alg_names:
+        result = _measure(grid, alg_name)
+        result.update({'rows': rows, 'cols': cols, 'density': density, 'seed': seed})
+        results.append(result)
+    return results
+
+
+def csv_fields() -> List[str]:
+    return sorted(list(Metrics().to_dict().keys()) +
+                  ['alg', 'rows', 'cols', 'density', 'seed', 'wall_time_ms', 'path_cost'])
+
+
+def parse_sizes(text: str) -> List[Tuple[int, int]]:
+    sizes = []
+    for item in text.split(','):
+        r, _, c = item.strip().lower().partition('x')
+        sizes.append((int(r), int(c or r)))
+    return sizes
+
+
+def check_costs(results: List[dict]) -> None:
+    ref = next((r['path_cost'] for r in results if r['alg'] == 'astar'), None)
+    if ref is None:
+        return
+    for res in results:
+        if res['alg'] in COST_CHECKED and abs(res['path_cost'] - ref) > 1e-9:
+            print(f"  WARNING: {res['alg']} cost {res['path_cost']} != astar cost {ref} "
+                  f"({res['rows']}x{res['cols']} density {res['density']} seed {res['seed']})")
+
+
+def print_summary(totals: Dict[tuple, List[float]]) -> None:
+    # totals: (rows, cols, density, alg) -> [count, sum nodes, sum runtime_ms]
+    configs = sorted({key[:3] for key in totals})
+    for rows, cols, density in configs:
+        print(f"-- {rows}x{cols} density {density}")
+        ref = totals.get((rows, cols, density, 'astar'))
+        ref_nodes = ref[1] / ref[0] if ref else 0
+        print(f"{'alg':<16}{'mean nodes':>12}{'vs astar':>10}{'mean ms':>10}")
+        for key, (count, nodes, ms) in totals.items():
+            if key[:3] != (rows, cols, density):
+                continue
+            ratio = f"{nodes / count / ref_nodes:.2f}x" if ref_nodes else '-'
+            print(f"{key[3]:<16}{nodes / count:>12.1f}{ratio:>10}{ms / count:>10.2f}")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    # nearest-rank percentile of an already sorted list
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def run_scenarios(map_path: str, scen_path: str, alg_names: List[str], out: str,
+                  limit: int = 0, tolerance: float = 1e-4) -> None:
+    """Replay a MovingAI scenario file against each algorithm.
+
+    Every query's path cost is checked against the scenario's optimal length
+    and per-bucket wall-time percentiles are printed at the end. Manhattan
+    overestimates on the 8-connected map, so those algorithms get the map's
+    octile heuristic instead.
+    """
+    grid = load_map(map_path)
+    fields = ['alg', 'bucket', 'start_row', 'start_col', 'goal_row', 'goal_col', 'optimal_length',
+              'path_cost', 'cost_ok', 'nodes_expanded', 'runtime_ms', 'wall_time_ms']
+    latencies: Dict[Tuple[str, int], List[float]] = {}
+    mismatches: Dict[Tuple[str, int], int] = {}
+    written = 0
+    with open(out, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fields)
+        writer.writeheader()
+        for alg_name in alg_names:
+            if grid.weights and alg_name in UNIFORM_ONLY:
+                continue
+            if alg_name in INTEGER_ONLY and not integral_costs(grid):
+                print(f"skipping {alg_name}: the map's move costs are not integral")
+                continue
+            alg = ALGS[alg_name]
+            if grid.diagonal and getattr(alg, 'heuristic', None) is manhattan:
+                alg = copy.copy(alg)
+                alg.heuristic = for_grid(grid)
+            for i, scen in enumerate(iter_scenarios(scen_path)):
+                if limit and i >= limit:
+                    break
+                start_time = time.perf_counter()
+                path, metrics = alg.search(grid, scen.start, scen.goal)
+                elapsed = (time.perf_counter() - start_time) * 1000.0
+                cost = path_cost(grid, path) if path else float('inf')
+                ok = abs(cost - scen.optimal_length) <= tolerance * max(1.0, scen.optimal_length)
+                key = (alg_name, scen.bucket)
+                latencies.setdefault(key, []).append(elapsed)
+                mismatches[key] = mismatches.get(key, 0) + (not ok)
+                writer.writerow({'alg': alg_name, 'bucket': scen.bucket,
+                                 'start_row': scen.start[0], 'start_col': scen.start[1],
+                                 'goal_row': scen.goal[0], 'goal_col': scen.goal[1],
+                                 'optimal_length': scen.optimal_length, 'path_cost': cost, 'cost_ok': int(ok),
+                                 'nodes_expanded': metrics.nodes_expanded, 'runtime_ms': metrics.runtime_ms,
+                                 'wall_time_ms': elapsed})
+                written += 1
+
+    print(f"{'alg':<16}{'bucket':>7}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'bad cost':>10}")
+    for (alg_name, bucket), values in sorted(latencies.items(), key=lambda kv: (alg_names.index(kv[0][0]), kv[0][1])):
+        values.sort()
+        print(f"{alg_name:<16}{bucket:>7}{len(values):>6}{percentile(values, 50):>10.2f}"
+              f"{percentile(values, 95):>10.2f}{percentile(values, 99):>10.2f}{mismatches[(alg_name, bucket)]:>10}")
+    print(f"Wrote {written} rows to {out}")
+
+
+def measure_overhead(sizes: List[Tuple[int, int]], densities: List[float], seeds: List[int],
+                     alg_names: List[str], max_weight: int = 1) -> None:
+    """Time each instrumented algorithm at every Instrumentation level.
+
+    Every level runs on the same seeded grids; the mean runtime is reported
+    relative to OFF so the cost of counters and of the full trace is visible.
+    """
+    names = [name for name in alg_names if name in INSTRUMENTED]
+    levels = list(Instrumentation)
+    print(f"{'alg':<16}{'size':>10}" + ''.join(f"{level.name + ' ms':>14}" for level in levels) +
+          f"{'full/off':>10}")
+    for rows, cols in sizes:
+        for density in densities:
+            grids = [build_grid(rows, cols, density, seed, max_weight) for seed in seeds]
+            for name in names:
+                means = []
+                for level in levels:
+                    alg = copy.copy(ALGS[name])
+                    alg.instrumentation = level
+                    total = 0.0
+                    for grid in grids:
+                        _, metrics = alg.search(grid, (0, 0), (rows - 1, cols - 1))
+                        total += metrics.runtime_ms
+                    means.append(total / len(grids))
+                ratio = f"{means[-1] / means[0]:.2f}x" if means[0] else '-'
+                print(f"{name:<16}{f'{rows}x{cols}':>10}" + ''.join(f"{ms:>14.2f}" for ms in means) +
+                      f"{ratio:>10}")
+
+
+def run_anytime(sizes: List[Tuple[int, int]], densities: List[float], seeds: List[int], deadline_ms: float,
+                epsilon: float, max_weight: int, out: str) -> None:
+    """Run ARA* under a deadline and chart solution quality against time.
+
+    Every published solution is written to ``out`` with its cost relative to
+    the optimal A* cost. The text chart shows, for each slice of the deadline,
+    the mean cost ratio of the best solution found by then and how many runs
+    had a solution at all.
+    """
+    alg = ARAStar(epsilon, 0.5, heuristic=manhattan, instrumentation=Instrumentation.COUNTERS)
+    fields = ['rows', 'cols', 'density', 'seed', 'ms', 'cost', 'bound', 'optimal_cost', 'ratio']
+    traces: List[List[Tuple[float, float]]] = []
+    with open(out, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fields)
+        writer.writeheader()
+        for rows, cols in sizes:
+            for density in densities:
+                for seed in seeds:
+                    grid = build_grid(rows, cols, density, seed, max_weight)
+                    goal = (rows - 1, cols - 1)
+                    ref, _ = ALGS['astar'].search(grid, (0, 0), goal)
+                    if not ref:
+                        continue
+                    optimal = path_cost(grid, ref)
+                    _, metrics = alg.search(grid, (0, 0), goal, deadline_ms=deadline_ms)
+                    trace = []
+                    for ms, cost, bound in metrics.solution_trace:
+                        ratio = cost / optimal if optimal else 1.0
+                        trace.append((ms, ratio))
+                        writer.writerow({'rows': rows, 'cols': cols, 'density': density, 'seed': seed, 'ms': ms,
+                                         'cost': cost, 'bound': bound, 'optimal_cost': optimal, 'ratio': ratio})
+                    traces.append(trace)
+
+    print(f"ARA* (epsilon {epsilon}) quality vs time over {len(traces)} solvable runs, deadline {deadline_ms:g} ms")
+    print(f"{'ms':>9}  {'cost/opt':>8}  {'solved':>7}")
+    width = 40
+    for i in range(1, 11):
+        t = deadline_ms * i / 10
+        best = [min((ratio for ms, ratio in trace if ms <= t), default=None) for trace in traces]
+        found = [ratio for ratio in best if ratio is not None]
+        if not found:
+            print(f"{t:>9.1f}  {'-':>8}  {0:>3}/{len(traces):<3}")
+            continue
+        mean = sum(found) / len(found)
+        # bar shrinks toward the optimum: a full bar is cost/opt >= 2
+        bar = '#' * max(1, round(width * min(1.0, mean - 1.0)))
+        print(f"{t:>9.1f}  {mean:>8.3f}  {len(found):>3}/{len(traces):<3} {bar if mean > 1.0 else '(optimal)'}")
+    print(f"Wrote solution trace to {out}")
+
+
+def run_flow_field(sizes: List[Tuple[int, int]], densities: List[float], seeds: List[int], agents: int,
+                   edits: int, max_weight: int = 1) -> None:
+    """Route ``agents`` random starts to one goal with A* per agent and with a FlowField.
+
+    Reports agents per second for both (the field's build time included) and
+    the cost of repairing the field after ``edits`` random block toggles
+    against rebuilding it. Path costs are checked against A*.
+    """
+    astar = copy.copy(ALGS['astar'])
+    astar.instrumentation = Instrumentation.OFF
+    print(f"{'size':>10}{'density':>9}{'agents':>8}{'astar/s':>12}{'field/s':>12}{'build ms':>10}"
+          f"{'repair ms':>11}{'rebuild ms':>12}{'repaired':>10}")
+    for rows, cols in sizes:
+        for density in densities:
+            for seed in seeds:
+                grid = build_grid(rows, cols, density, seed, max_weight)
+                rng = random.Random(seed)
+                goal = (rows - 1, cols - 1)
+                grid.remove_block(goal)
+                open_cells = [(r, c) for r in range(rows) for c in range(cols) if grid.passable((r, c))]
+                starts = [rng.choice(open_cells) for _ in range(agents)]
+
+                t0 = time.perf_counter()
+                expected = [path_cost(grid, astar.search(grid, s, goal)[0]) for s in starts]
+                astar_s = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                field = FlowField(grid, goal)
+                build_s = time.perf_counter() - t0
+                paths = [field.path_from(s) for s in starts]
+                field_s = time.perf_counter() - t0
+                for s, path, cost in zip(starts, paths, expected):
+                    if abs(path_cost(grid, path) - cost) > 1e-9:
+                        print(f"  cost mismatch from {s}: field {path_cost(grid, path)} vs A* {cost}")
+
+                for _ in range(edits):
+                    cell = rng.choice(open_cells)
+                    if cell != goal:
+                        (grid.remove_block if cell in grid.blocks else grid.add_block)(cell)
+                t0 = time.perf_counter()
+                field.update()
+                repair_s = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                FlowField(grid, goal)
+                rebuild_s = time.perf_counter() - t0
+
+                print(f"{f'{rows}x{cols}':>10}{density:>9}{agents:>8}{agents / astar_s:>12.0f}{agents / field_s:>12.0f}"
+                      f"{build_s * 1000:>10.1f}{repair_s * 1000:>11.2f}{rebuild_s * 1000:>12.1f}{field.repaired:>10}")
+
+
+def run_chunked_world(side: int, span: int, density: float, seeds: List[int], tile_size: int, max_tiles: int,
+                      max_weight: int = 1) -> None:
+    """A* on a procedural ``side`` x ``side`` ChunkedGrid, one query per seed.
+
+    Each query runs from the world's center to a random goal at most ``span``
+    cells away on each axis. Reports the search next to the tile cache
+    counters and the memory held by resident tiles.
+    """
+    astar = copy.copy(ALGS['astar'])
+    astar.instrumentation = Instrumentation.COUNTERS
+    center = (side // 2, side // 2)
+    print(f"{'seed':>6}{'pathlen':>9}{'nodes':>10}{'ms':>10}{'hits':>12}{'misses':>8}{'evicted':>9}"
+          f"{'resident':>10}{'tile KiB':>10}")
+    for seed in seeds:
+        grid = ChunkedGrid(side, side, ProceduralTiles(density, seed, max_weight), tile_size, max_tiles)
+        rng = random.Random(seed)
+        goal = (center[0] + rng.randint(-span, span), center[1] + rng.randint(-span, span))
+        grid.remove_block(center)
+        grid.remove_block(goal)
+        path, metrics = astar.search(grid, center, goal)
+        print(f"{seed:>6}{len(path):>9}{metrics.nodes_expanded:>10}{metrics.runtime_ms:>10.1f}{grid.hits:>12}"
+              f"{grid.misses:>8}{grid.evictions:>9}{grid.resident:>10}{grid.memory_bytes / 1024:>10.0f}")
+
+
 def cli():
     parser = argparse.ArgumentParser()
     parser.add_argument('--rows', type=int, default=50)
     parser.add_argument('--cols', type=int, default=50)
+    parser.add_argument('--sizes', type=str, default=None,
+                        help='comma-separated RxC list to sweep, e.g. 50x50,200x200 (overrides --rows/--cols)')
     parser.add_argument('--density', type=float, default=0.2)
+    parser.add_argument('--densities', type=str, default=None,
+                        help='comma-separated densities to sweep (overrides --density)')
     parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0, help='base seed; run i uses seed + i')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes (1 = run in this process)')
+    parser.add_argument('--max-weight', type=int, default=1,
+                        help='give every cell a random integer weight in [1, N] (1 = unweighted)')
+    parser.add_argument('--algs', type=str, default=None, help='comma-separated subset of algorithms to run')
+    parser.add_argument('--map', type=str, default=None, help='MovingAI .map file (use with --scen)')
+    parser.add_argument('--scen', type=str, default=None, help='MovingAI .scen file to replay against --map')
+    parser.add_argument('--limit', type=int, default=0, help='replay at most N scenario queries per algorithm')
+    parser.add_argument('--instrumentation-overhead', action='store_true',
+                        help='compare runtime at each instrumentation level instead of writing a CSV')
+    parser.add_argument('--anytime', action='store_true',
+                        help='chart ARA* solution quality against time instead of the normal sweep')
+    parser.add_argument('--deadline-ms', type=float, default=200.0, help='per-query deadline for --anytime')
+    parser.add_argument('--epsilon', type=float, default=3.0, help='initial ARA* epsilon for --anytime')
+    parser.add_argument('--flow-agents', type=int, default=0,
+                        help='compare per-agent A* against a shared flow field for N agents')
+    parser.add_argument('--flow-edits', type=int, default=10,
+                        help='random block toggles to repair after --flow-agents routing')
+    parser.add_argument('--world', type=int, default=0,
+                        help='run A* on a procedural N x N chunked world instead of the normal sweep')
+    parser.add_argument('--world-span', type=int, default=500, help='max goal offset from the center for --world')
+    parser.add_argument('--tile-size', type=int, default=64, help='tile side for --world')
+    parser.add_argument('--max-tiles', type=int, default=256, help='tile cache capacity for --world')
     parser.add_argument('--out', type=str, default='benchmarks.csv')
     args = parser.parse_args()
 
-    rows, cols = args.rows, args.cols
-    density = args.density
-    runs = args.runs
+    selected = args.algs.split(',') if args.algs else list(ALGS)
+    unknown = [name for name in selected if name not in ALGS]
+    if unknown:
+        parser.error(f"unknown algorithm(s): {', '.join(unknown)}")
+    if args.map or args.scen:
+        if not (args.map and args.scen):
+            parser.error('--map and --scen must be given together')
+        run_scenarios(args.map, args.scen, selected, args.out, args.limit)
+        return
 
-    rows_out: List[dict] = []
-    seeds = [int(time.time()) + i for i in range(runs)]
-    for alg in ALGS:
-        for i, seed in enumerate(seeds):
-            res = run_once(rows, cols, density, alg, seed)
-            rows_out.append(res)
-            print(f"{alg} run {i+1}/{runs}: nodes={res['nodes_expanded']} ms={res['runtime_ms']:.2f} pathlen={res['path_length']}")
+    sizes = parse_sizes(args.sizes) if args.sizes else [(args.rows, args.cols)]
+    densities = [float(d) for d in args.densities.split(',')] if args.densities else [args.density]
+    seeds = [args.seed + i for i in range(args.runs)]
+    alg_names = [alg for alg in selected if not (args.max_weight > 1 and alg in UNIFORM_ONLY)]
+    if args.anytime:
+        run_anytime(sizes, densities, seeds, args.deadline_ms, args.epsilon, args.max_weight, args.out)
+        return
+    if args.world:
+        run_chunked_world(args.world, args.world_span, densities[0], seeds, args.tile_size, args.max_tiles,
+                          args.max_weight)
+        return
+    if args.flow_agents:
+        run_flow_field(sizes, densities, seeds, args.flow_agents, args.flow_edits, args.max_weight)
+        return
+    if args.instrumentation_overhead:
+        measure_overhead(sizes, densities, seeds, alg_names, args.max_weight)
+        return
+    jobs = [(rows, cols, density, seed) for rows, cols in sizes for density in densities for seed in seeds]
 
-    # write CSV
-    keys = sorted(rows_out[0].keys()) if rows_out else []
+    totals: Dict[tuple, List[float]] = {}
+    written = 0
     with open(args.out, 'w', newline='') as fh:
-        writer = csv.DictWriter(fh, keys)
+        writer = csv.DictWriter(fh, csv_fields())
         writer.writeheader()
-        writer.writerows(rows_out)
-    print(f"Wrote {len(rows_out)} rows to {args.out}")
+
+        def record(results: List[dict]) -> None:
+            nonlocal written
+            writer.writerows(results)
+            fh.flush()
+            written += len(results)
+            for res in results:
+                print(f"{res['alg']} {res['rows']}x{res['cols']} d={res['density']} seed={res['seed']}: "
+                      f"nodes={res['nodes_expanded']} ms={res['runtime_ms']:.2f} pathlen={res['path_length']}")
+                acc = totals.setdefault((res['rows'], res['cols'], res['density'], res['alg']), [0, 0.0, 0.0])
+                acc[0] += 1
+                acc[1] += res['nodes_expanded']
+                acc[2] += res['runtime_ms']
+            check_costs(results)
+
+        if args.workers <= 1:
+            for rows, cols, density, seed in jobs:
+                record(run_grid(rows, cols, density, seed, alg_names, args.max_weight))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                futures = [pool.submit(run_grid, rows, cols, density, seed, alg_names, args.max_weight)
+                           for rows, cols, density, seed in jobs]
+                for future in as_completed(futures):
+                    record(future.result())
+
+    print_summary(totals)
+    print(f"Wrote {written} rows to {args.out}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1 @@
+# Makes the top-level packages (core, algorithms, ...) importable from tests/
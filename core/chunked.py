@@ -0,0 +1,364 @@
+from __future__ import annotations
+import os
+import random
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+from core.grid import SQRT2, CornerCutting, Grid
+from core.gridfile import MappedGrid, save_grid
+
+Coord = Tuple[int, int]
+TileKey = Tuple[int, int]  # (tile row, tile col)
+
+
+class TileProvider:
+    """Source of a :class:`ChunkedGrid`'s tiles.
+
+    ``load`` returns tile (tr, tc) as a ``size`` x ``size`` :class:`Grid` in
+    tile-local coordinates, or None for an all-open tile. ``save`` receives a
+    tile whose cells were edited when it leaves the cache (or on ``flush``).
+    ``weighted`` tells searches whether tiles may carry weights.
+    """
+
+    weighted = False
+
+    def load(self, tr: int, tc: int, size: int) -> Optional[Grid]:
+        raise NotImplementedError
+
+    def save(self, tr: int, tc: int, tile: Grid) -> None:
+        raise ValueError(f"{type(self).__name__} is read-only")
+
+
+class ProceduralTiles(TileProvider):
+    """Random obstacles (and optional integer weights in [1, ``max_weight``]),
+    generated per tile from ``seed`` and the tile position, so a tile comes
+    back identical every time it is reloaded. Edited tiles are kept in memory
+    from their first eviction on."""
+
+    def __init__(self, density: float = 0.2, seed: int = 0, max_weight: int = 1) -> None:
+        self.density = density
+        self.seed = seed
+        self.max_weight = max_weight
+        self.weighted = max_weight > 1
+        self._saved: Dict[TileKey, Grid] = {}
+
+    def load(self, tr: int, tc: int, size: int) -> Optional[Grid]:
+        saved = self._saved.get((tr, tc))
+        if saved is not None:
+            return saved.copy()
+        rng = random.Random(f'{self.seed}:{tr}:{tc}')
+        tile = Grid(size, size)
+        tile.randomize_blocks(self.density, rng)
+        if self.max_weight > 1:
+            for r in range(size):
+                for c in range(size):
+                    tile.weights[(r, c)] = float(rng.randint(1, self.max_weight))
+        return tile
+
+    def save(self, tr: int, tc: int, tile: Grid) -> None:
+        self._saved[(tr, tc)] = tile
+
+
+class DirectoryTiles(TileProvider):
+    """One grid file per tile (see ``core.gridfile``), named ``<tr>_<tc>.grid``.
+
+    Missing files come from ``fallback`` when given, else they are all open.
+    Edited tiles are written back to their files. ``write_tiles`` splits an
+    existing grid into such a directory.
+    """
+
+    def __init__(self, path: str, weighted: bool = False, fallback: Optional[TileProvider] = None) -> None:
+        self.path = path
+        self.weighted = weighted or (fallback is not None and fallback.weighted)
+        self.fallback = fallback
+
+    def tile_path(self, tr: int, tc: int) -> str:
+        return os.path.join(self.path, f'{tr}_{tc}.grid')
+
+    def load(self, tr: int, tc: int, size: int) -> Optional[Grid]:
+        path = self.tile_path(tr, tc)
+        if not os.path.exists(path):
+            return self.fallback.load(tr, tc, size) if self.fallback is not None else None
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        tile = MappedGrid.from_buffer(data, name=path)
+        if tile.rows != size or tile.cols != size:
+            tile.close()
+            raise ValueError(f"{path}: tile is {tile.rows}x{tile.cols}, expected {size}x{size}")
+        return tile
+
+    def save(self, tr: int, tc: int, tile: Grid) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        save_grid(tile, self.tile_path(tr, tc))
+
+
+def write_tiles(grid: Grid, path: str, size: int) -> DirectoryTiles:
+    """Split ``grid`` into ``size`` x ``size`` tile files under ``path``; edge tiles are padded open."""
+    tiles = DirectoryTiles(path, weighted=bool(grid.weights))
+    for tr in range((grid.rows + size - 1) // size):
+        for tc in range((grid.cols + size - 1) // size):
+            tile = Grid(size, size)
+            top, left = tr * size, tc * size
+            for r in range(top, min(top + size, grid.rows)):
+                for c in range(left, min(left + size, grid.cols)):
+                    if not grid.passable((r, c)):
+                        tile.blocks.add((r - top, c - left))
+                    weight = grid.weights.get((r, c), 1.0)
+                    if weight != 1.0:
+                        tile.weights[(r - top, c - left)] = weight
+            tiles.save(tr, tc, tile)
+    return tiles
+
+
+class _Tile:
+    """A resident tile: one byte per cell (1 = blocked) and an optional float32 weight plane."""
+
+    __slots__ = ('cells', 'weights', 'dirty')
+
+    def __init__(self, cells: bytearray, weights: Optional[array]) -> None:
+        self.cells = cells
+        self.weights = weights
+        self.dirty = False
+
+
+class _ChunkBlockView:
+    """Membership-only view of a ChunkedGrid's blocked cells (the world is too large to iterate)."""
+
+    def __init__(self, grid: 'ChunkedGrid') -> None:
+        self._grid = grid
+
+    def __contains__(self, coord) -> bool:
+        return self._grid.in_bounds(coord) and not self._grid.passable(coord)
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class _ChunkWeightView:
+    """Lookup-only view of a ChunkedGrid's weights; truthy when its provider is weighted."""
+
+    def __init__(self, grid: 'ChunkedGrid') -> None:
+        self._grid = grid
+
+    def get(self, coord: Coord, default: Optional[float] = None) -> Optional[float]:
+        if not self._grid.in_bounds(coord):
+            return default
+        weight = self._grid._weight(coord[0], coord[1])
+        return default if weight == 1.0 else weight
+
+    def __getitem__(self, coord: Coord) -> float:
+        weight = self.get(coord)
+        if weight is None:
+            raise KeyError(coord)
+        return weight
+
+    def __contains__(self, coord) -> bool:
+        return self.get(coord) is not None
+
+    def __bool__(self) -> bool:
+        return self._grid.provider.weighted or self._grid._weight_edited
+
+
+class ChunkedGrid(Grid):
+    """:class:`Grid` over a world of ``tile_size`` x ``tile_size`` tiles loaded on demand.
+
+    Tiles come from ``provider`` the first time a cell in them is touched and
+    are held in an LRU cache of at most ``max_tiles`` tiles; the least
+    recently used tile is dropped to make room, after being handed back to
+    the provider if it was edited. Memory is therefore bounded by the cache
+    and by what a search itself keeps, however large ``rows`` x ``cols`` is.
+    ``hits``, ``misses`` and ``evictions`` count tile lookups.
+
+    ``blocks`` and ``weights`` only answer membership and lookups. Edits go
+    through the usual change journal. Bulk operations that walk every cell
+    (``copy``, ``randomize_blocks``, whole-grid indexes) do not apply.
+    """
+
+    def __init__(self, rows: int, cols: int, provider: TileProvider, tile_size: int = 64, max_tiles: int = 256,
+                 diagonal: bool = False, journal_size: int = 4096, straight_cost: float = 1.0,
+                 diagonal_cost: float = SQRT2, corner_cutting: CornerCutting = CornerCutting.ALWAYS) -> None:
+        if tile_size < 1 or max_tiles < 1:
+            raise ValueError("tile_size and max_tiles must be at least 1")
+        super().__init__(rows, cols, diagonal=diagonal, journal_size=journal_size, straight_cost=straight_cost,
+                         diagonal_cost=diagonal_cost, corner_cutting=corner_cutting)
+        self.provider = provider
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.blocks = _ChunkBlockView(self)
+        self.weights = _ChunkWeightView(self)
+        self._tiles: OrderedDict[TileKey, _Tile] = OrderedDict()
+        # most recent tile, checked before the LRU: neighbors mostly share a tile
+        self._last_key: Optional[TileKey] = None
+        self._last: Optional[_Tile] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._weight_edited = False
+
+    # -- tile cache ------------------------------------------------------------
+
+    def _tile(self, tr: int, tc: int) -> _Tile:
+        key = (tr, tc)
+        if key == self._last_key:
+            self.hits += 1
+            return self._last
+        tiles = self._tiles
+        tile = tiles.get(key)
+        if tile is not None:
+            self.hits += 1
+            tiles.move_to_end(key)
+        else:
+            self.misses += 1
+            tile = self._load(tr, tc)
+            tiles[key] = tile
+            if len(tiles) > self.max_tiles:
+                old_key, old = tiles.popitem(last=False)
+                self.evictions += 1
+                if old.dirty:
+                    self._store(old_key, old)
+        self._last_key, self._last = key, tile
+        return tile
+
+    def _load(self, tr: int, tc: int) -> _Tile:
+        size = self.tile_size
+        source = self.provider.load(tr, tc, size)
+        cells = bytearray(size * size)
+        weights = None
+        if source is not None:
+            for r, c in source.blocks:
+                cells[r * size + c] = 1
+            if source.weights:
+                weights = array('f', [1.0]) * (size * size)
+                for (r, c), weight in source.weights.items():
+                    weights[r * size + c] = weight
+            if isinstance(source, MappedGrid):
+                source.close()
+        return _Tile(cells, weights)
+
+    def _store(self, key: TileKey, tile: _Tile) -> None:
+        size = self.tile_size
+        out = Grid(size, size)
+        for i, blocked in enumerate(tile.cells):
+            if blocked:
+                out.blocks.add(divmod(i, size))
+        if tile.weights is not None:
+            for i, weight in enumerate(tile.weights):
+                if weight != 1.0:
+                    out.weights[divmod(i, size)] = weight
+        self.provider.save(key[0], key[1], out)
+        tile.dirty = False
+
+    def flush(self) -> None:
+        """Hand every edited resident tile back to the provider."""
+        for key, tile in self._tiles.items():
+            if tile.dirty:
+                self._store(key, tile)
+
+    def clear_cache(self) -> None:
+        """Flush and drop all resident tiles (the counters are kept)."""
+        self.flush()
+        self._tiles.clear()
+        self._last_key = self._last = None
+
+    def __enter__(self) -> 'ChunkedGrid':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+    @property
+    def resident(self) -> int:
+        return len(self._tiles)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the resident tiles' cell and weight planes."""
+        total = 0
+        for tile in self._tiles.values():
+            total += len(tile.cells)
+            if tile.weights is not None:
+                total += len(tile.weights) * tile.weights.itemsize
+        return total
+
+    # -- cells -----------------------------------------------------------------
+
+    def _blocked(self, r: int, c: int) -> int:
+        size = self.tile_size
+        tr, lr = divmod(r, size)
+        tc, lc = divmod(c, size)
+        return self._tile(tr, tc).cells[lr * size + lc]
+
+    def _weight(self, r: int, c: int) -> float:
+        size = self.tile_size
+        tr, lr = divmod(r, size)
+        tc, lc = divmod(c, size)
+        weights = self._tile(tr, tc).weights
+        return 1.0 if weights is None else weights[lr * size + lc]
+
+    def passable(self, coord: Coord) -> bool:
+        return not self._blocked(coord[0], coord[1])
+
+    def successors(self, coord: Coord) -> Iterator[Tuple[Coord, float]]:
+        r, c = coord
+        rows, cols, size = self.rows, self.cols, self.tile_size
+        need = self.corner_cutting
+        blocked, tile_at = self._blocked, self._tile
+        for dr, dc, base in self.moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                tr, lr = divmod(nr, size)
+                tc, lc = divmod(nc, size)
+                tile = tile_at(tr, tc)
+                i = lr * size + lc
+                if tile.cells[i]:
+                    continue
+                if need and dr and dc and 2 - blocked(nr, c) - blocked(r, nc) < need:
+                    continue
+                yield (nr, nc), base if tile.weights is None else base * tile.weights[i]
+
+    def get_cost(self, from_coord: Coord, to_coord: Coord) -> float:
+        return self.move_cost(from_coord, to_coord) * self._weight(to_coord[0], to_coord[1])
+
+    # -- edits -----------------------------------------------------------------
+
+    def _edit(self, coord: Coord) -> Tuple[_Tile, int]:
+        size = self.tile_size
+        tr, lr = divmod(coord[0], size)
+        tc, lc = divmod(coord[1], size)
+        tile = self._tile(tr, tc)
+        tile.dirty = True
+        return tile, lr * size + lc
+
+    def add_block(self, coord: Coord) -> None:
+        if self.in_bounds(coord) and self.passable(coord):
+            tile, i = self._edit(coord)
+            tile.cells[i] = 1
+            self._record(coord)
+
+    def remove_block(self, coord: Coord) -> None:
+        if self.in_bounds(coord) and not self.passable(coord):
+            tile, i = self._edit(coord)
+            tile.cells[i] = 0
+            self._record(coord)
+
+    def set_weight(self, coord: Coord, weight: float) -> None:
+        if not self.in_bounds(coord):
+            raise IndexError("coord out of bounds")
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        tile, i = self._edit(coord)
+        if tile.weights is None:
+            tile.weights = array('f', [1.0]) * len(tile.cells)
+        tile.weights[i] = float(weight)
+        self._weight_edited = True
+        self._record(coord)
+
+    def copy(self) -> 'Grid':
+        raise TypeError("ChunkedGrid cannot be copied cell by cell")
+
+    def randomize_blocks(self, density: float, rng) -> None:
+        raise TypeError("ChunkedGrid obstacles come from its tile provider")
+
+    def enable_connectivity_index(self):
+        raise TypeError("ChunkedGrid does not support a whole-grid connectivity index")
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from array import array
+from typing import List, Tuple
+
+from core.grid import SQRT2, CornerCutting, Grid
+
+Coord = Tuple[int, int]
+CompactMove = Tuple[int, float, int, int]  # (offset, base cost, side offset, side offset)
+
+
+class CompactGrid:
+    """Flat, array-backed grid addressed by integer cell indices.
+
+    Cells are stored row-major with a one-cell blocked border around the map,
+    so a neighbor is always ``index + offset`` and never needs a bounds check.
+    Passability lives in a ``bytearray`` (1 = open) and weights in an
+    ``array('f')``; both are indexed by the same flat index. Weights are kept
+    in single precision, so costs that are not exactly representable as
+    float32 may differ from :class:`Grid` in the last few bits.
+
+    ``moves`` is the direction-cost table: flat offset, base cost and, for
+    diagonal moves under a corner-cutting policy, the offsets of the two
+    orthogonal cells (0 when there is nothing to check). At least
+    ``corner_cutting`` of those two cells must be open.
+    """
+
+    def __init__(self, rows: int, cols: int, diagonal: bool = False, straight_cost: float = 1.0,
+                 diagonal_cost: float = SQRT2, corner_cutting: CornerCutting = CornerCutting.ALWAYS) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.diagonal = diagonal
+        self.straight_cost = float(straight_cost)
+        self.diagonal_cost = float(diagonal_cost)
+        self.corner_cutting = CornerCutting(corner_cutting)
+        self.width = cols + 2
+        self.size = (rows + 2) * self.width
+
+        self.cells = bytearray(self.size)
+        row_open = b'\x01' * cols
+        for r in range(1, rows + 1):
+            base = r * self.width + 1
+            self.cells[base:base + cols] = row_open
+        self.weights = array('f', [1.0]) * self.size
+
+        w = self.width
+        self._offsets4 = (-w, w, -1, 1)
+        self._offsets8 = self._offsets4 + (-w - 1, -w + 1, w - 1, w + 1)
+        check = self.corner_cutting != CornerCutting.ALWAYS
+        self._moves4: Tuple[CompactMove, ...] = tuple((off, self.straight_cost, 0, 0) for off in self._offsets4)
+        self._moves8 = self._moves4 + tuple(
+            (dr * w + dc, self.diagonal_cost, dr * w if check else 0, dc if check else 0)
+            for dr, dc in ((-1, -1), (-1, 1), (1, -1), (1, 1)))
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> 'CompactGrid':
+        cgrid = cls(grid.rows, grid.cols, diagonal=grid.diagonal, straight_cost=grid.straight_cost,
+                    diagonal_cost=grid.diagonal_cost, corner_cutting=grid.corner_cutting)
+        for coord in grid.blocks:
+            if grid.in_bounds(coord):
+                cgrid.cells[cgrid.index(coord)] = 0
+        for coord, weight in grid.weights.items():
+            cgrid.weights[cgrid.index(coord)] = weight
+        return cgrid
+
+    @property
+    def offsets(self) -> Tuple[int, ...]:
+        return self._offsets8 if self.diagonal else self._offsets4
+
+    @property
+    def moves(self) -> Tuple[CompactMove, ...]:
+        return self._moves8 if self.diagonal else self._moves4
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.cells) + len(self.weights) * self.weights.itemsize
+
+    def index(self, coord: Coord) -> int:
+        r, c = coord
+        return (r + 1) * self.width + c + 1
+
+    def coord(self, index: int) -> Coord:
+        r, c = divmod(index, self.width)
+        return r - 1, c - 1
+
+    def in_bounds(self, coord: Coord) -> bool:
+        r, c = coord
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def passable(self, coord: Coord) -> bool:
+        return self.in_bounds(coord) and bool(self.cells[self.index(coord)])
+
+    def neighbors(self, index: int) -> List[int]:
+        cells, need = self.cells, self.corner_cutting
+        return [index + off for off, _, side_a, side_b in self.moves
+                if cells[index + off] and not (side_a and cells[index + side_a] + cells[index + side_b] < need)]
+
+    def set_weight(self, coord: Coord, weight: float) -> None:
+        if not self.in_bounds(coord):
+            raise IndexError("coord out of bounds")
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        self.weights[self.index(coord)] = weight
+
+    def add_block(self, coord: Coord) -> None:
+        if self.in_bounds(coord):
+            self.cells[self.index(coord)] = 0
+
+    def remove_block(self, coord: Coord) -> None:
+        if self.in_bounds(coord):
+            self.cells[self.index(coord)] = 1
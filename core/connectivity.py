@@ -0,0 +1,144 @@
+from __future__ import annotations
+from array import array
+from collections import deque
+from typing import List, Set, Tuple
+
+from core.grid import Grid
+
+Coord = Tuple[int, int]
+
+
+class ConnectivityIndex:
+    """Connected-component labels over a :class:`Grid`.
+
+    Answers "can start possibly reach goal?" in O(1) so searches between
+    different regions can return no path without flooding a component. The
+    index follows the grid's change journal:
+
+    - ``remove_block`` opens a cell and merges the components around it
+      (union-find over component labels), which is exact.
+    - ``add_block`` only clears the cell's label. If the cell's open
+      neighbors stay linked around it the components are unchanged; otherwise
+      the labels are marked possibly-split and relabelled lazily, the next
+      time a query would depend on them.
+
+    Rejections are always sound: two cells with different labels are never
+    connected, even while a relabel is pending.
+    """
+
+    def __init__(self, grid: Grid) -> None:
+        self.grid = grid
+        self.rebuilds = 0
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        grid = self.grid
+        cols = grid.cols
+        labels = array('i', [-1]) * (grid.rows * cols)
+        count = 0
+        for r in range(grid.rows):
+            for c in range(cols):
+                if labels[r * cols + c] >= 0 or not grid.passable((r, c)):
+                    continue
+                labels[r * cols + c] = count
+                queue = deque([(r, c)])
+                while queue:
+                    cur = queue.popleft()
+                    for nb in grid.neighbors(cur):
+                        idx = nb[0] * cols + nb[1]
+                        if labels[idx] < 0:
+                            labels[idx] = count
+                            queue.append(nb)
+                count += 1
+        self._labels = labels
+        self._parent: List[int] = list(range(count))
+        self._maybe_split = False
+        self._version = grid.version
+        self.rebuilds += 1
+
+    def _find(self, label: int) -> int:
+        parent = self._parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    def _label(self, coord: Coord) -> int:
+        label = self._labels[coord[0] * self.grid.cols + coord[1]]
+        return self._find(label) if label >= 0 else -1
+
+    def _sync(self) -> None:
+        grid = self.grid
+        changes = grid.changes_since(self._version)
+        if changes is None:
+            self.rebuild()
+            return
+        for cell in dict.fromkeys(changes):
+            idx = cell[0] * grid.cols + cell[1]
+            if grid.passable(cell):
+                if self._labels[idx] < 0:
+                    self._open_cell(cell, idx)
+            elif self._labels[idx] >= 0:
+                self._labels[idx] = -1
+                if not self._ring_connected(cell):
+                    self._maybe_split = True
+        self._version = grid.version
+
+    def _open_cell(self, cell: Coord, idx: int) -> None:
+        roots = {self._label(nb) for nb in self.grid.neighbors(cell)}
+        roots.discard(-1)
+        if not roots:
+            root = len(self._parent)
+            self._parent.append(root)
+        else:
+            root = roots.pop()
+            for other in roots:
+                self._parent[other] = root
+        self._labels[idx] = root
+
+    def _ring_connected(self, cell: Coord) -> bool:
+        # A newly blocked cell cannot split its component if its open
+        # neighbors are still linked to each other within the surrounding 3x3
+        # box, since any path through the cell can detour around it.
+        grid = self.grid
+        r, c = cell
+        around = list(grid.neighbors(cell))
+        if len(around) <= 1:
+            return True
+        seen: Set[Coord] = {around[0]}
+        stack = [around[0]]
+        while stack:
+            cur = stack.pop()
+            for nb in grid.neighbors(cur):
+                if nb != cell and abs(nb[0] - r) <= 1 and abs(nb[1] - c) <= 1 and nb not in seen:
+                    seen.add(nb)
+                    stack.append(nb)
+        return all(nb in seen for nb in around)
+
+    def _roots_from(self, coord: Coord) -> Set[int]:
+        # Searches expand a start cell even when it is blocked, so a blocked
+        # start reaches whatever its open neighbors reach
+        if self.grid.passable(coord):
+            return {self._label(coord)}
+        roots = {self._label(nb) for nb in self.grid.neighbors(coord)}
+        roots.discard(-1)
+        return roots
+
+    def may_connect(self, start: Coord, goal: Coord) -> bool:
+        """False only if no path from ``start`` to ``goal`` can exist."""
+        if start == goal:
+            return True
+        if not (self.grid.in_bounds(start) and self.grid.in_bounds(goal)):
+            return True  # leave out-of-range queries to the algorithm
+        self._sync()
+        if not self.grid.passable(goal):
+            return False
+        goal_root = self._label(goal)
+        if goal_root not in self._roots_from(start):
+            return False
+        if self._maybe_split:
+            self.rebuild()
+            return self._label(goal) in self._roots_from(start)
+        return True
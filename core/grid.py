@@ -1,8 +1,25 @@
 from __future__ import annotations
-from typing import Dict, Iterable, List, Set, Tuple
+import math
+from collections import deque
+from enum import IntEnum
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 
 Coord = Tuple[int, int]
+Move = Tuple[int, int, float]  # (dr, dc, base cost)
+
+SQRT2 = math.sqrt(2)
+
+
+class CornerCutting(IntEnum):
+    """When a diagonal move may pass the two orthogonal cells it squeezes between.
+
+    The value is the number of those two cells that must be open.
+    """
+
+    ALWAYS = 0
+    IF_ONE_OPEN = 1
+    NEVER = 2
 
 
 class Grid:
@@ -10,24 +27,63 @@ class Grid:
 
     Stores optional per-cell weights and blocked cells. Neighbors are computed
     from integer offsets so no O(V^2) neighbor construction is necessary.
+
+    A move costs its base cost (``straight_cost`` or ``diagonal_cost``) times
+    the weight of the cell it enters. ``corner_cutting`` decides whether a
+    diagonal move may pass blocked orthogonal cells. ``successors`` yields
+    neighbors together with their move costs from one precomputed table;
+    searches should prefer it over calling ``neighbors`` and ``get_cost``
+    per edge.
+
+    Every cell edit bumps ``version`` and is recorded in a bounded change
+    journal, so incremental consumers can ask for ``changes_since`` the
+    version they last saw instead of rescanning the grid.
     """
 
-    def __init__(self, rows: int, cols: int, diagonal: bool = False) -> None:
+    def __init__(self, rows: int, cols: int, diagonal: bool = False, journal_size: int = 4096,
+                 straight_cost: float = 1.0, diagonal_cost: float = SQRT2,
+                 corner_cutting: CornerCutting = CornerCutting.ALWAYS) -> None:
         self.rows = rows
         self.cols = cols
         self.diagonal = diagonal
         self.weights: Dict[Coord, float] = {}
         self.blocks: Set[Coord] = set()
+        self.version = 0
+        self._journal: Deque[Tuple[int, Coord]] = deque(maxlen=journal_size)
+        self.connectivity = None  # optional ConnectivityIndex, see enable_connectivity_index
+        self._init_moves(straight_cost, diagonal_cost, corner_cutting)
+
+    def _init_moves(self, straight_cost: float, diagonal_cost: float, corner_cutting: CornerCutting) -> None:
+        if straight_cost <= 0 or diagonal_cost <= 0:
+            raise ValueError("move costs must be positive")
+        self.straight_cost = float(straight_cost)
+        self.diagonal_cost = float(diagonal_cost)
+        self.corner_cutting = CornerCutting(corner_cutting)
 
         # 4-directional by default
         self._dirs4 = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         # 8-directional includes diagonals
         self._dirs8 = self._dirs4 + [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        # direction-cost table walked by successors()
+        self._moves4: List[Move] = [(dr, dc, self.straight_cost) for dr, dc in self._dirs4]
+        self._moves8: List[Move] = self._moves4 + [(dr, dc, self.diagonal_cost) for dr, dc in self._dirs8[4:]]
 
     @property
     def directions(self) -> List[Coord]:
         return self._dirs8 if self.diagonal else self._dirs4
 
+    @property
+    def moves(self) -> List[Move]:
+        return self._moves8 if self.diagonal else self._moves4
+
+    def copy(self) -> 'Grid':
+        """Plain in-memory copy of the cells and the cost model (no journal history)."""
+        grid = Grid(self.rows, self.cols, diagonal=self.diagonal, straight_cost=self.straight_cost,
+                    diagonal_cost=self.diagonal_cost, corner_cutting=self.corner_cutting)
+        grid.blocks = set(self.blocks)
+        grid.weights = dict(self.weights)
+        return grid
+
     def in_bounds(self, coord: Coord) -> bool:
         r, c = coord
         return 0 <= r < self.rows and 0 <= c < self.cols
@@ -36,11 +92,33 @@ class Grid:
         return coord not in self.blocks
 
     def neighbors(self, coord: Coord) -> Iterable[Coord]:
+        for nb, _ in self.successors(coord):
+            yield nb
+
+    def successors(self, coord: Coord) -> Iterator[Tuple[Coord, float]]:
+        """Yield ``(neighbor, move cost)`` for every legal move out of ``coord``."""
         r, c = coord
-        for dr, dc in self.directions:
-            nb = (r + dr, c + dc)
-            if self.in_bounds(nb) and self.passable(nb):
-                yield nb
+        rows, cols, blocks, weights = self.rows, self.cols, self.blocks, self.weights
+        need = self.corner_cutting
+        for dr, dc, base in self.moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                nb = (nr, nc)
+                if nb in blocks:
+                    continue
+                if need and dr and dc and ((nr, c) not in blocks) + ((r, nc) not in blocks) < need:
+                    continue
+                yield nb, base * weights.get(nb, 1.0)
+
+    def predecessors(self, coord: Coord) -> Iterator[Tuple[Coord, float]]:
+        """Yield ``(cell, move cost)`` for every legal move into ``coord``.
+
+        Moves and the corner rule are symmetric, so these are the successors
+        of ``coord`` priced as moves entering it.
+        """
+        get_cost = self.get_cost
+        for nb, _ in self.successors(coord):
+            yield nb, get_cost(nb, coord)
 
     def set_weight(self, coord: Coord, weight: float) -> None:
         if not self.in_bounds(coord):
@@ -48,17 +126,53 @@ class Grid:
         if weight <= 0:
             raise ValueError("weight must be positive")
         self.weights[coord] = float(weight)
+        self._record(coord)
+
+    def move_cost(self, from_coord: Coord, to_coord: Coord) -> float:
+        """Base cost of the move between two adjacent cells, before weights."""
+        if from_coord[0] == to_coord[0] or from_coord[1] == to_coord[1]:
+            return self.straight_cost
+        return self.diagonal_cost
 
     def get_cost(self, from_coord: Coord, to_coord: Coord) -> float:
-        # By default cost is the weight of the target cell (common convention)
-        return self.weights.get(to_coord, 1.0)
+        # base move cost scaled by the weight of the target cell
+        return self.move_cost(from_coord, to_coord) * self.weights.get(to_coord, 1.0)
 
     def add_block(self, coord: Coord) -> None:
-        if self.in_bounds(coord):
+        if self.in_bounds(coord) and coord not in self.blocks:
             self.blocks.add(coord)
+            self._record(coord)
 
     def remove_block(self, coord: Coord) -> None:
-        self.blocks.discard(coord)
+        if coord in self.blocks:
+            self.blocks.discard(coord)
+            self._record(coord)
+
+    def _record(self, coord: Coord) -> None:
+        self.version += 1
+        self._journal.append((self.version, coord))
+
+    def changes_since(self, version: int) -> Optional[List[Coord]]:
+        """Return cells edited after ``version`` (oldest first, may repeat).
+
+        Returns None when the journal no longer reaches back that far (or a
+        bulk edit such as ``randomize_blocks`` happened), in which case the
+        caller has to rebuild from scratch.
+        """
+        if version == self.version:
+            return []
+        if not self._journal or self._journal[0][0] > version + 1:
+            return None
+        return [coord for v, coord in self._journal if v > version]
+
+    def enable_connectivity_index(self):
+        """Attach (or return) a ConnectivityIndex that algorithms consult to
+        reject queries between disconnected regions without searching."""
+        from core.connectivity import ConnectivityIndex
+
+        if self.connectivity is None:
+            self.connectivity = ConnectivityIndex(self)
+        return self.connectivity
 
     def randomize_blocks(self, density: float, rng) -> None:
         # rng is expected to be random.Random or similar with .random() and .randint
@@ -69,3 +183,6 @@ class Grid:
             for c in range(self.cols):
                 if rng.random() < density:
                     self.blocks.add((r, c))
+        # bulk edit: invalidate the journal rather than logging every cell
+        self.version += 1
+        self._journal.clear()
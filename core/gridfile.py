@@ -0,0 +1,354 @@
+from __future__ import annotations
+import mmap
+import struct
+import sys
+from array import array
+from collections import deque
+from collections.abc import Mapping, Set as AbstractSet
+from typing import Dict, Iterator, List, Tuple
+
+from core.grid import SQRT2, CornerCutting, Grid
+
+Coord = Tuple[int, int]
+
+# File layout (all integers little-endian):
+#   header   magic, format version, rows, cols, flags, padded to HEADER_SIZE
+#   bits     rows * stride bytes, stride = ceil(cols / 8); bit (c & 7) of
+#            byte (c >> 3) in row r is set when (r, c) is blocked
+#   weights  optional float32 plane, rows * cols, 8-byte aligned
+MAGIC = b'PFGRID\x00\x00'
+FORMAT_VERSION = 1
+HEADER_SIZE = 32
+FLAG_DIAGONAL = 1
+FLAG_WEIGHTS = 2
+
+_HEADER = struct.Struct('<8sIIII')
+# Rows are streamed in blocks of roughly this many bytes on save/create
+CHUNK_BYTES = 1 << 20
+
+
+def _layout(rows: int, cols: int) -> Tuple[int, int, int]:
+    stride = (cols + 7) // 8
+    weights_offset = (HEADER_SIZE + rows * stride + 7) & ~7
+    return stride, HEADER_SIZE, weights_offset
+
+
+def _header(rows: int, cols: int, diagonal: bool, weighted: bool) -> bytes:
+    flags = (FLAG_DIAGONAL if diagonal else 0) | (FLAG_WEIGHTS if weighted else 0)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, rows, cols, flags).ljust(HEADER_SIZE, b'\x00')
+
+
+def _chunk_rows(row_bytes: int) -> int:
+    return max(1, CHUNK_BYTES // max(1, row_bytes))
+
+
+def _write_planes(fh, grid: Grid, weighted: bool) -> None:
+    rows, cols = grid.rows, grid.cols
+    stride, _, weights_offset = _layout(rows, cols)
+
+    if isinstance(grid, MappedGrid):
+        # same layout, copy the planes through in chunks
+        end = weights_offset + (rows * cols * 4 if weighted else 0)
+        for pos in range(HEADER_SIZE, end, CHUNK_BYTES):
+            fh.write(grid._view[pos:min(end, pos + CHUNK_BYTES)])
+        return
+
+    by_row: Dict[int, List[int]] = {}
+    for r, c in grid.blocks:
+        if grid.in_bounds((r, c)):
+            by_row.setdefault(r, []).append(c)
+    step = _chunk_rows(stride)
+    for top in range(0, rows, step):
+        chunk = bytearray(stride * min(step, rows - top))
+        for r in range(top, top + len(chunk) // stride):
+            base = (r - top) * stride
+            for c in by_row.get(r, ()):
+                chunk[base + (c >> 3)] |= 1 << (c & 7)
+        fh.write(chunk)
+    fh.write(b'\x00' * (weights_offset - HEADER_SIZE - rows * stride))
+
+    if weighted:
+        w_by_row: Dict[int, List[Tuple[int, float]]] = {}
+        for (r, c), weight in grid.weights.items():
+            w_by_row.setdefault(r, []).append((c, weight))
+        blank = array('f', [1.0]) * cols
+        for r in range(rows):
+            row = blank
+            if r in w_by_row:
+                row = array('f', blank)
+                for c, weight in w_by_row[r]:
+                    row[c] = weight
+            if sys.byteorder != 'little':
+                row = array('f', row)
+                row.byteswap()
+            fh.write(row.tobytes())
+
+
+def write_grid(grid: Grid, fh) -> None:
+    """Write ``grid`` in the binary grid format to a binary file object, a chunk of rows at a time.
+
+    A weight plane is only written when the grid has weights.
+    """
+    weighted = bool(grid.weights)
+    fh.write(_header(grid.rows, grid.cols, grid.diagonal, weighted))
+    _write_planes(fh, grid, weighted)
+
+
+def save_grid(grid: Grid, path: str) -> None:
+    """Write ``grid`` to ``path`` in the binary grid format (see ``write_grid``)."""
+    with open(path, 'wb') as fh:
+        write_grid(grid, fh)
+
+
+def create_grid_file(path: str, rows: int, cols: int, diagonal: bool = False, weighted: bool = False) -> None:
+    """Create an all-open grid file without building a :class:`Grid` first.
+
+    The passability plane is allocated sparsely; the weight plane (if any) is
+    streamed out as 1.0 in chunks.
+    """
+    stride, _, weights_offset = _layout(rows, cols)
+    with open(path, 'wb') as fh:
+        fh.write(_header(rows, cols, diagonal, weighted))
+        fh.truncate(weights_offset)
+        fh.seek(weights_offset)
+        if weighted:
+            step = _chunk_rows(cols * 4)
+            ones = array('f', [1.0]) * (cols * step)
+            if sys.byteorder != 'little':
+                ones.byteswap()
+            ones = ones.tobytes()
+            for top in range(0, rows, step):
+                fh.write(ones[:min(step, rows - top) * cols * 4])
+
+
+class _BlockView(AbstractSet):
+    """Read-only set view of a MappedGrid's blocked cells."""
+
+    def __init__(self, grid: 'MappedGrid') -> None:
+        self._grid = grid
+
+    def __contains__(self, coord) -> bool:
+        return self._grid.in_bounds(coord) and not self._grid.passable(coord)
+
+    def __iter__(self) -> Iterator[Coord]:
+        grid = self._grid
+        stride, bits = grid._stride, grid._bits
+        for r in range(grid.rows):
+            word = int.from_bytes(bits[r * stride:(r + 1) * stride], 'little')
+            while word:
+                low = word & -word
+                yield r, low.bit_length() - 1
+                word ^= low
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return any(self._grid._bits)
+
+
+class _WeightView(Mapping):
+    """Read-only mapping view of a MappedGrid's weight plane.
+
+    Like ``Grid.weights`` it only contains cells whose weight differs from the
+    default 1.0, but it is truthy whenever the file has a weight plane.
+    """
+
+    def __init__(self, grid: 'MappedGrid') -> None:
+        self._grid = grid
+
+    def __getitem__(self, coord) -> float:
+        grid = self._grid
+        if grid._weights is not None and grid.in_bounds(coord):
+            weight = grid._weights[coord[0] * grid.cols + coord[1]]
+            if weight != 1.0:
+                return weight
+        raise KeyError(coord)
+
+    def __iter__(self) -> Iterator[Coord]:
+        grid = self._grid
+        weights = grid._weights
+        if weights is None:
+            return
+        cols = grid.cols
+        for r in range(grid.rows):
+            base = r * cols
+            for c in range(cols):
+                if weights[base + c] != 1.0:
+                    yield r, c
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return self._grid._weights is not None
+
+
+class MappedGrid(Grid):
+    """:class:`Grid` backed by a memory-mapped grid file.
+
+    Cells are read straight out of the mapping, so opening a file costs only
+    the header parse and a search faults in just the pages it touches.
+    ``blocks`` and ``weights`` are read-only views; edit through
+    ``add_block``/``remove_block``/``set_weight``, which need ``writable=True``
+    and go through the usual change journal. Use as a context manager or call
+    ``close`` to release the mapping.
+
+    The file stores cells only; move costs and the corner-cutting policy are
+    given when opening it, with the same defaults as :class:`Grid`.
+    ``from_buffer`` maps the same layout held in memory instead of a file.
+    """
+
+    def __init__(self, path: str, writable: bool = False, journal_size: int = 4096,
+                 straight_cost: float = 1.0, diagonal_cost: float = SQRT2,
+                 corner_cutting: CornerCutting = CornerCutting.ALWAYS) -> None:
+        if sys.byteorder != 'little':
+            raise ValueError('MappedGrid requires a little-endian host')
+        self.path = path
+        self.writable = writable
+        self._fh = open(path, 'r+b' if writable else 'rb')
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self._fh.close()
+            raise
+        self._attach(memoryview(self._mm), journal_size, straight_cost, diagonal_cost, corner_cutting)
+
+    @classmethod
+    def from_buffer(cls, buffer, writable: bool = False, journal_size: int = 4096,
+                    straight_cost: float = 1.0, diagonal_cost: float = SQRT2,
+                    corner_cutting: CornerCutting = CornerCutting.ALWAYS,
+                    name: str = '<buffer>') -> 'MappedGrid':
+        """Map a grid held in a buffer (``bytes``, ``mmap``, shared memory, ...)
+        in the file layout written by ``write_grid``. ``close`` releases the
+        views but leaves the buffer itself to the caller."""
+        if sys.byteorder != 'little':
+            raise ValueError('MappedGrid requires a little-endian host')
+        grid = cls.__new__(cls)
+        grid.path = name
+        grid.writable = writable
+        grid._fh = grid._mm = None
+        grid._attach(memoryview(buffer), journal_size, straight_cost, diagonal_cost, corner_cutting)
+        return grid
+
+    def _attach(self, view: memoryview, journal_size: int, straight_cost: float, diagonal_cost: float,
+                corner_cutting: CornerCutting) -> None:
+        self._view = view
+        path = self.path
+        if len(view) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: not a grid file (version {FORMAT_VERSION})")
+        magic, fmt, rows, cols, flags = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a grid file (version {FORMAT_VERSION})")
+        stride, bits_offset, weights_offset = _layout(rows, cols)
+        weighted = bool(flags & FLAG_WEIGHTS)
+        expected = weights_offset + (rows * cols * 4 if weighted else 0)
+        if len(view) < expected:
+            self.close()
+            raise ValueError(f"{path}: truncated, expected {expected} bytes, found {len(view)}")
+
+        self.rows = rows
+        self.cols = cols
+        self.diagonal = bool(flags & FLAG_DIAGONAL)
+        self.version = 0
+        self._journal = deque(maxlen=journal_size)
+        self.connectivity = None
+        self._init_moves(straight_cost, diagonal_cost, corner_cutting)
+
+        self._stride = stride
+        self._bits = view[bits_offset:bits_offset + rows * stride]
+        self._weights = view[weights_offset:expected].cast('f') if weighted else None
+        self.blocks = _BlockView(self)
+        self.weights = _WeightView(self)
+
+    def __enter__(self) -> 'MappedGrid':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # views must be released before the mapping can be closed
+        for name in ('_bits', '_weights', '_view'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        if self._mm is not None:
+            self._mm.close()
+            self._fh.close()
+
+    def flush(self) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+
+    def passable(self, coord: Coord) -> bool:
+        r, c = coord
+        return not (self._bits[r * self._stride + (c >> 3)] >> (c & 7)) & 1
+
+    def successors(self, coord: Coord) -> Iterator[Tuple[Coord, float]]:
+        r, c = coord
+        rows, cols, bits, stride, weights = self.rows, self.cols, self._bits, self._stride, self._weights
+        need = self.corner_cutting
+        for dr, dc, base in self.moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and not (bits[nr * stride + (nc >> 3)] >> (nc & 7)) & 1:
+                if need and dr and dc:
+                    sides = (2 - ((bits[nr * stride + (c >> 3)] >> (c & 7)) & 1)
+                             - ((bits[r * stride + (nc >> 3)] >> (nc & 7)) & 1))
+                    if sides < need:
+                        continue
+                yield (nr, nc), base if weights is None else base * weights[nr * cols + nc]
+
+    def get_cost(self, from_coord: Coord, to_coord: Coord) -> float:
+        base = self.move_cost(from_coord, to_coord)
+        if self._weights is None:
+            return base
+        return base * self._weights[to_coord[0] * self.cols + to_coord[1]]
+
+    def _check_writable(self) -> None:
+        if not self.writable:
+            raise ValueError(f"{self.path}: opened read-only")
+
+    def _set_bit(self, coord: Coord, blocked: bool) -> None:
+        self._check_writable()
+        r, c = coord
+        idx = r * self._stride + (c >> 3)
+        if blocked:
+            self._bits[idx] |= 1 << (c & 7)
+        else:
+            self._bits[idx] &= ~(1 << (c & 7)) & 0xFF
+        self._record(coord)
+
+    def add_block(self, coord: Coord) -> None:
+        if self.in_bounds(coord) and self.passable(coord):
+            self._set_bit(coord, True)
+
+    def remove_block(self, coord: Coord) -> None:
+        if self.in_bounds(coord) and not self.passable(coord):
+            self._set_bit(coord, False)
+
+    def set_weight(self, coord: Coord, weight: float) -> None:
+        if not self.in_bounds(coord):
+            raise IndexError("coord out of bounds")
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        self._check_writable()
+        if self._weights is None:
+            raise ValueError(f"{self.path}: file has no weight plane")
+        self._weights[coord[0] * self.cols + coord[1]] = float(weight)
+        self._record(coord)
+
+    def randomize_blocks(self, density: float, rng) -> None:
+        self._check_writable()
+        stride = self._stride
+        for r in range(self.rows):
+            row = bytearray(stride)
+            for c in range(self.cols):
+                if rng.random() < density:
+                    row[c >> 3] |= 1 << (c & 7)
+            self._bits[r * stride:(r + 1) * stride] = row
+        self.version += 1
+        self._journal.clear()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 import math
-from typing import Tuple
+from typing import Callable, Tuple
 
 Coord = Tuple[int, int]
 
@@ -18,8 +18,39 @@ def octile(a: Coord, b: Coord) -> float:
     dx = abs(a[0] - b[0])
     dy = abs(a[1] - b[1])
     F = math.sqrt(2) - 1
-    return float((dx + dy) + (F) * min(dx, dy))
+    return float(max(dx, dy) + F * min(dx, dy))
+
+
+def chebyshev(a: Coord, b: Coord) -> float:
+    # Admissible for 8-neighbor grids where a diagonal step costs the same as a straight one
+    return float(max(abs(a[0] - b[0]), abs(a[1] - b[1])))
 
 
 def zero(a: Coord, b: Coord) -> float:
     return 0.0
+
+
+
+def diagonal_distance(straight: float, diagonal: float) -> Callable[[Coord, Coord], float]:
+    """Exact obstacle-free distance for 8-neighbor grids with the given move costs."""
+    # a diagonal never pays off once it costs more than two straight moves
+    extra = min(diagonal, 2 * straight) - straight
+
+    def h(a: Coord, b: Coord) -> float:
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return straight * max(dx, dy) + extra * min(dx, dy)
+    return h
+
+
+def for_grid(grid) -> Callable[[Coord, Coord], float]:
+    """Default admissible heuristic for a grid's connectivity and move costs."""
+    straight = getattr(grid, 'straight_cost', 1.0)
+    diagonal = getattr(grid, 'diagonal_cost', math.sqrt(2))
+    if not grid.diagonal:
+        return manhattan if straight == 1.0 else lambda a, b: straight * manhattan(a, b)
+    if straight == 1.0 and diagonal == math.sqrt(2):
+        return octile
+    if straight == 1.0 and diagonal == 1.0:
+        return chebyshev
+    return diagonal_distance(straight, diagonal)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import hashlib
+import heapq
+import random
+import struct
+from array import array
+from typing import List, Optional, Tuple
+
+from core.grid import Grid
+
+Coord = Tuple[int, int]
+
+INF = float('inf')
+
+_MAGIC = b'PFALT\x00\x00\x01'
+_HEADER = struct.Struct('<8sIII20s')  # magic, rows, cols, landmark count, grid fingerprint
+
+
+def grid_fingerprint(grid: Grid) -> bytes:
+    """SHA-1 over a grid's shape, connectivity, cost model, blocks and weights."""
+    digest = hashlib.sha1(struct.pack('<IIBddB', grid.rows, grid.cols, bool(grid.diagonal),
+                                      grid.straight_cost, grid.diagonal_cost, grid.corner_cutting))
+    for r, c in sorted(grid.blocks):
+        digest.update(struct.pack('<ii', r, c))
+    digest.update(b'|')
+    for (r, c), weight in sorted(grid.weights.items()):
+        digest.update(struct.pack('<iid', r, c, weight))
+    return digest.digest()
+
+
+def _distances(grid: Grid, source: Coord, reverse: bool) -> array:
+    """Dijkstra from ``source`` over the whole grid into a flat array.
+
+    Forward gives d(source, v); reverse walks edges backwards and gives
+    d(v, source). Unreachable cells stay at infinity.
+    """
+    cols = grid.cols
+    dist = array('d', [INF]) * (grid.rows * cols)
+    dist[source[0] * cols + source[1]] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, cur = heapq.heappop(heap)
+        if d > dist[cur[0] * cols + cur[1]]:
+            continue
+        if reverse and not grid.passable(cur):
+            continue  # a blocked cell has no incoming edges
+        for nb, cost in (grid.predecessors(cur) if reverse else grid.successors(cur)):
+            cand = d + cost
+            idx = nb[0] * cols + nb[1]
+            if cand < dist[idx]:
+                dist[idx] = cand
+                heapq.heappush(heap, (cand, nb))
+    if reverse:
+        # searches may start on a blocked cell, which can still step out
+        for cell in grid.blocks:
+            if grid.in_bounds(cell):
+                idx = cell[0] * cols + cell[1]
+                for nb, cost in grid.successors(cell):
+                    cand = cost + dist[nb[0] * cols + nb[1]]
+                    if cand < dist[idx]:
+                        dist[idx] = cand
+    return dist
+
+
+class LandmarkTable:
+    """ALT (A*, Landmarks, Triangle inequality) heuristic for one grid.
+
+    For every landmark L the table holds d(L, v) and d(v, L) for all cells in
+    flat ``array('d')`` rows, one forward and one reverse Dijkstra per
+    landmark. Calling the table as ``h(a, b)`` returns the best triangle
+    inequality bound ``max(d(L, b) - d(L, a), d(a, L) - d(b, L))``, which is
+    admissible and consistent, so it plugs into ``AStar(heuristic=table)``.
+
+    Landmarks are chosen by farthest-point selection. Any edit to the grid
+    invalidates the distances: ``refresh`` rebuilds with the same landmark
+    count when ``Grid.version`` moved. Calls never rebuild, so a rebuild is
+    never hidden inside a timed search; the algorithms that take a heuristic
+    refresh it before they start their clock.
+    """
+
+    def __init__(self, grid: Grid, count: int = 8, seed: int = 0) -> None:
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        self.grid = grid
+        self.count = count
+        self.seed = seed
+        self.rebuilds = 0
+        self.build()
+
+    def build(self, landmarks: Optional[List[Coord]] = None) -> None:
+        grid = self.grid
+        self.landmarks: List[Coord] = []
+        self._from: List[array] = []
+        self._to: List[array] = []
+        if landmarks is None:
+            for lm, d_from in self._select():
+                self._add(lm, d_from)
+        else:
+            for lm in landmarks:
+                self._add(lm)
+        self._version = grid.version
+        self.rebuilds += 1
+
+    def refresh(self) -> bool:
+        """Rebuild if the grid was edited since the last build; True if it was."""
+        if not self.stale:
+            return False
+        self.build()
+        return True
+
+    def _add(self, landmark: Coord, d_from: Optional[array] = None) -> None:
+        self.landmarks.append(landmark)
+        self._from.append(d_from if d_from is not None else _distances(self.grid, landmark, reverse=False))
+        self._to.append(_distances(self.grid, landmark, reverse=True))
+
+    def _select(self) -> List[Tuple[Coord, array]]:
+        # Farthest-point selection: start from the cell farthest from a random
+        # open cell, then repeatedly take the open cell whose nearest chosen
+        # landmark is farthest away (unreachable cells are skipped). Each
+        # landmark comes with its forward distances, which build keeps.
+        grid = self.grid
+        cols = grid.cols
+        rng = random.Random(self.seed)
+        open_cells = [(r, c) for r in range(grid.rows) for c in range(cols) if grid.passable((r, c))]
+        if not open_cells:
+            return []
+        seed_dist = _distances(grid, rng.choice(open_cells), reverse=False)
+        chosen: List[Tuple[Coord, array]] = []
+        nearest = seed_dist
+        while len(chosen) < min(self.count, len(open_cells)):
+            best, best_d = None, -1.0
+            for r, c in open_cells:
+                d = nearest[r * cols + c]
+                if d != INF and d > best_d:
+                    best, best_d = (r, c), d
+            if best is None or best_d <= 0.0:
+                break
+            dist = _distances(grid, best, reverse=False)
+            chosen.append((best, dist))
+            if nearest is seed_dist:
+                nearest = dist
+            else:
+                nearest = array('d', map(min, nearest, dist))
+        return chosen
+
+    @property
+    def stale(self) -> bool:
+        return self.grid.version != self._version
+
+    def __call__(self, a: Coord, b: Coord) -> float:
+        cols = self.grid.cols
+        ia = a[0] * cols + a[1]
+        ib = b[0] * cols + b[1]
+        best = 0.0
+        for d_from, d_to in zip(self._from, self._to):
+            # inf - inf is nan, which never beats ``best``
+            bound = d_from[ib] - d_from[ia]
+            if bound > best:
+                best = bound
+            bound = d_to[ia] - d_to[ib]
+            if bound > best:
+                best = bound
+        return best
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(len(a) * a.itemsize for a in self._from + self._to)
+
+    def save(self, path: str) -> None:
+        """Write the table with the grid's fingerprint, one distance row at a time."""
+        self.refresh()
+        grid = self.grid
+        with open(path, 'wb') as fh:
+            fh.write(_HEADER.pack(_MAGIC, grid.rows, grid.cols, len(self.landmarks), grid_fingerprint(grid)))
+            for r, c in self.landmarks:
+                fh.write(struct.pack('<ii', r, c))
+            for d_from, d_to in zip(self._from, self._to):
+                d_from.tofile(fh)
+                d_to.tofile(fh)
+
+    @classmethod
+    def load(cls, path: str, grid: Grid) -> 'LandmarkTable':
+        """Read a table saved by ``save``.
+
+        Raises ValueError if the file was built for a different grid (shape,
+        cost model, blocks or weights); rebuild and save again in that case.
+        """
+        with open(path, 'rb') as fh:
+            magic, rows, cols, count, fingerprint = _HEADER.unpack(fh.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"{path}: not a landmark table")
+            if (rows, cols) != (grid.rows, grid.cols) or fingerprint != grid_fingerprint(grid):
+                raise ValueError(f"{path}: built for a different grid")
+            table = cls.__new__(cls)
+            table.grid = grid
+            table.count = count
+            table.seed = 0
+            table.rebuilds = 0
+            table.landmarks = [struct.unpack('<ii', fh.read(8)) for _ in range(count)]
+            table._from, table._to = [], []
+            for _ in range(count):
+                for target in (table._from, table._to):
+                    dist = array('d')
+                    dist.fromfile(fh, rows * cols)
+                    target.append(dist)
+        table._version = grid.version
+        return table
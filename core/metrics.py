@@ -1,9 +1,23 @@
 from __future__ import annotations
 from dataclasses import dataclass, asdict, field
-from typing import Dict, Set, Tuple
+from enum import IntEnum
+from typing import Dict, List, Set, Tuple
 import time
 
 
+class Instrumentation(IntEnum):
+    """How much bookkeeping a search does in its hot loop.
+
+    OFF records only runtime and path length; COUNTERS adds nodes_expanded and
+    max_open_size; FULL also fills ``explored`` and ``explored_order`` for the
+    renderer.
+    """
+
+    OFF = 0
+    COUNTERS = 1
+    FULL = 2
+
+
 @dataclass
 class Metrics:
     nodes_expanded: int = 0
@@ -11,8 +25,14 @@ class Metrics:
     runtime_ms: float = 0.0
     max_open_size: int = 0
     memory_estimate_bytes: int = 0
+    abstract_ms: float = 0.0  # hierarchical planners: time spent on the abstract graph
+    refine_ms: float = 0.0  # hierarchical planners: time spent refining abstract edges
+    rejected_unreachable: int = 0  # 1 when the connectivity index answered "no path" without searching
+    suboptimality_bound: float = 0.0  # bounded searches: path cost <= bound * optimal (0 = not reported)
     explored: Set[Tuple[int, int]] = field(default_factory=set)
     explored_order: Dict[Tuple[int, int], int] = field(default_factory=dict)  # coord -> step number
+    # anytime searches: (ms since start, path cost, bound) for each published solution
+    solution_trace: List[Tuple[float, float, float]] = field(default_factory=list)
 
     def start_timer(self) -> float:
         return time.perf_counter_ns()
@@ -21,8 +41,25 @@ class Metrics:
         end_ns = time.perf_counter_ns()
         self.runtime_ms = (end_ns - start_ns) / 1_000_000.0
 
+    def merge(self, other: 'Metrics') -> None:
+        """Add another search's counters into this one, e.g. for batch totals.
+
+        Counts and times are summed, sizes and bounds keep the maximum; the
+        per-cell traces are not merged.
+        """
+        self.nodes_expanded += other.nodes_expanded
+        self.path_length += other.path_length
+        self.runtime_ms += other.runtime_ms
+        self.abstract_ms += other.abstract_ms
+        self.refine_ms += other.refine_ms
+        self.rejected_unreachable += other.rejected_unreachable
+        self.max_open_size = max(self.max_open_size, other.max_open_size)
+        self.memory_estimate_bytes = max(self.memory_estimate_bytes, other.memory_estimate_bytes)
+        self.suboptimality_bound = max(self.suboptimality_bound, other.suboptimality_bound)
+
     def to_dict(self) -> Dict[str, float]:
         d = asdict(self)
         d.pop('explored', None)  # Remove set from dict for CSV
         d.pop('explored_order', None)
+        d.pop('solution_trace', None)
         return d
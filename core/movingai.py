@@ -0,0 +1,83 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+
+from core.grid import CornerCutting, Grid
+
+Coord = Tuple[int, int]
+
+# Terrain a ground unit can enter; everything else ('@', 'O', 'T', 'W', ...) is blocked
+PASSABLE_TERRAIN = '.GS'
+
+_BLOCKED = re.compile('[^' + re.escape(PASSABLE_TERRAIN) + ']')
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One query line of a MovingAI ``.scen`` file (coords are (row, col))."""
+
+    bucket: int
+    map_name: str
+    width: int
+    height: int
+    start: Coord
+    goal: Coord
+    optimal_length: float
+
+
+def load_map(path: str, diagonal: bool = True,
+             corner_cutting: CornerCutting = CornerCutting.NEVER) -> Grid:
+    """Stream a MovingAI ``.map`` file into a :class:`Grid`.
+
+    Rows are read one at a time and only blocked cells are stored, so memory
+    is proportional to the obstacle count rather than the text size. The
+    defaults match the benchmark's scenario lengths: diagonal moves cost
+    sqrt(2) and may not cut corners.
+    """
+    with open(path, 'r') as fh:
+        header = {}
+        for line in fh:
+            line = line.strip()
+            if line == 'map':
+                break
+            key, _, value = line.partition(' ')
+            header[key] = value
+        else:
+            raise ValueError(f"{path}: missing 'map' line")
+        try:
+            rows, cols = int(header['height']), int(header['width'])
+        except KeyError as exc:
+            raise ValueError(f"{path}: missing {exc.args[0]!r} in header") from None
+
+        grid = Grid(rows, cols, diagonal=diagonal, corner_cutting=corner_cutting)
+        blocks = grid.blocks
+        r = -1
+        for r, line in enumerate(fh):
+            if r >= rows:
+                break
+            line = line.rstrip('\r\n')
+            if len(line) != cols:
+                raise ValueError(f"{path}: row {r} has {len(line)} cells, expected {cols}")
+            blocks.update((r, m.start()) for m in _BLOCKED.finditer(line))
+        if r + 1 < rows:
+            raise ValueError(f"{path}: expected {rows} rows, found {r + 1}")
+    return grid
+
+
+def iter_scenarios(path: str) -> Iterator[Scenario]:
+    """Yield the queries of a MovingAI ``.scen`` file in file order."""
+    with open(path, 'r') as fh:
+        for lineno, line in enumerate(fh, 1):
+            fields = line.split()
+            if not fields or fields[0] == 'version':
+                continue
+            if len(fields) != 9:
+                raise ValueError(f"{path}:{lineno}: expected 9 fields, got {len(fields)}")
+            bucket, map_name, width, height, sx, sy, gx, gy, optimal = fields
+            yield Scenario(int(bucket), map_name, int(width), int(height),
+                           (int(sy), int(sx)), (int(gy), int(gx)), float(optimal))
+
+
+def load_scenarios(path: str) -> List[Scenario]:
+    return list(iter_scenarios(path))
@@ -0,0 +1,257 @@
+from __future__ import annotations
+import heapq
+import itertools
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, List, Tuple, Union
+
+# Open-list backends for best-first searches. All share one interface:
+#
+#   push(item, priority)  insert, or lower the priority of a queued item
+#   pop() -> (priority, item)  remove the live item with the smallest priority
+#   len(queue), item in queue, iter(queue) over queued items
+#
+# Pushing a higher priority for a queued item is ignored. Equal priorities pop
+# in insertion order for the heaps and the bucket queue; the radix heap makes
+# no tie-break guarantee.
+
+
+class BinaryHeap:
+    """``heapq`` with lazy deletion: a decrease pushes a new entry and the
+    superseded one is skipped when it surfaces."""
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._prio: Dict[Hashable, float] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._prio)
+
+    def __contains__(self, item) -> bool:
+        return item in self._prio
+
+    def __iter__(self):
+        return iter(self._prio)
+
+    def push(self, item, priority: float) -> None:
+        old = self._prio.get(item)
+        if old is not None and old <= priority:
+            return
+        self._prio[item] = priority
+        heapq.heappush(self._heap, (priority, next(self._counter), item))
+
+    def pop(self) -> Tuple[float, Hashable]:
+        heap, prio = self._heap, self._prio
+        while heap:
+            priority, _, item = heapq.heappop(heap)
+            if prio.get(item) == priority:
+                del prio[item]
+                return priority, item
+        raise IndexError('pop from empty queue')
+
+
+class DaryHeap:
+    """Indexed d-ary heap with in-place decrease-key (no stale entries)."""
+
+    def __init__(self, d: int = 4) -> None:
+        if d < 2:
+            raise ValueError('d must be at least 2')
+        self.d = d
+        self._keys: List[Tuple[float, int]] = []
+        self._items: List[Hashable] = []
+        self._pos: Dict[Hashable, int] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item) -> bool:
+        return item in self._pos
+
+    def __iter__(self):
+        return iter(self._pos)
+
+    def push(self, item, priority: float) -> None:
+        i = self._pos.get(item)
+        if i is None:
+            i = len(self._items)
+            self._keys.append((priority, next(self._counter)))
+            self._items.append(item)
+        elif self._keys[i][0] <= priority:
+            return
+        else:
+            self._keys[i] = (priority, self._keys[i][1])
+        self._sift_up(i, item)
+
+    def pop(self) -> Tuple[float, Hashable]:
+        if not self._items:
+            raise IndexError('pop from empty queue')
+        keys, items = self._keys, self._items
+        priority, top = keys[0][0], items[0]
+        del self._pos[top]
+        last_key, last = keys.pop(), items.pop()
+        if items:
+            keys[0], items[0] = last_key, last
+            self._sift_down(0)
+        return priority, top
+
+    def _sift_up(self, i: int, item) -> None:
+        keys, items, pos, d = self._keys, self._items, self._pos, self.d
+        key = keys[i]
+        while i > 0:
+            parent = (i - 1) // d
+            if keys[parent] <= key:
+                break
+            keys[i], items[i] = keys[parent], items[parent]
+            pos[items[i]] = i
+            i = parent
+        keys[i], items[i] = key, item
+        pos[item] = i
+
+    def _sift_down(self, i: int) -> None:
+        keys, items, pos, d = self._keys, self._items, self._pos, self.d
+        n = len(items)
+        key, item = keys[i], items[i]
+        while True:
+            first = i * d + 1
+            if first >= n:
+                break
+            best = min(range(first, min(first + d, n)), key=keys.__getitem__)
+            if keys[best] >= key:
+                break
+            keys[i], items[i] = keys[best], items[best]
+            pos[items[i]] = i
+            i = best
+        keys[i], items[i] = key, item
+        pos[item] = i
+
+
+def _as_int(priority: float) -> int:
+    key = int(priority)
+    if key != priority or key < 0:
+        raise ValueError(f"integer queue needs non-negative integer priorities, got {priority!r}")
+    return key
+
+
+class BucketQueue:
+    """Dial's bucket queue for non-negative integer priorities.
+
+    Pops must be monotone (nothing pushed below the last popped priority),
+    which holds for Dijkstra and for A* with a consistent integer heuristic.
+    Push and pop are O(1) amortized plus the span of empty buckets skipped.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[int, Deque[Hashable]] = {}
+        self._prio: Dict[Hashable, int] = {}
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return len(self._prio)
+
+    def __contains__(self, item) -> bool:
+        return item in self._prio
+
+    def __iter__(self):
+        return iter(self._prio)
+
+    def push(self, item, priority: float) -> None:
+        key = _as_int(priority)
+        old = self._prio.get(item)
+        if old is not None and old <= key:
+            return
+        if key < self._cursor:
+            raise ValueError(f"priority {key} is below the last popped priority {self._cursor}")
+        self._prio[item] = key
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = deque()
+        bucket.append(item)
+
+    def pop(self) -> Tuple[int, Hashable]:
+        buckets, prio = self._buckets, self._prio
+        while prio:
+            bucket = buckets.get(self._cursor)
+            while bucket:
+                item = bucket.popleft()
+                if prio.get(item) == self._cursor:
+                    del prio[item]
+                    return self._cursor, item
+            buckets.pop(self._cursor, None)
+            self._cursor += 1
+        raise IndexError('pop from empty queue')
+
+
+class RadixHeap:
+    """Monotone radix heap for non-negative integer priorities.
+
+    Entries live in buckets by the highest bit in which their key differs
+    from the last popped key, so each entry moves down at most once per bit.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: List[List[Tuple[int, Hashable]]] = [[]]
+        self._prio: Dict[Hashable, int] = {}
+        self._last = 0
+
+    def __len__(self) -> int:
+        return len(self._prio)
+
+    def __contains__(self, item) -> bool:
+        return item in self._prio
+
+    def __iter__(self):
+        return iter(self._prio)
+
+    def push(self, item, priority: float) -> None:
+        key = _as_int(priority)
+        old = self._prio.get(item)
+        if old is not None and old <= key:
+            return
+        if key < self._last:
+            raise ValueError(f"priority {key} is below the last popped priority {self._last}")
+        self._prio[item] = key
+        self._insert(key, item)
+
+    def _insert(self, key: int, item) -> None:
+        b = (key ^ self._last).bit_length()
+        buckets = self._buckets
+        while len(buckets) <= b:
+            buckets.append([])
+        buckets[b].append((key, item))
+
+    def pop(self) -> Tuple[int, Hashable]:
+        buckets, prio = self._buckets, self._prio
+        while prio:
+            if not buckets[0]:
+                b = next(i for i in range(1, len(buckets)) if buckets[i])
+                entries, buckets[b] = buckets[b], []
+                live = [(key, item) for key, item in entries if prio.get(item) == key]
+                if not live:
+                    continue
+                self._last = min(key for key, _ in live)
+                for key, item in live:
+                    self._insert(key, item)
+            key, item = buckets[0].pop()
+            if prio.get(item) == key:
+                del prio[item]
+                return key, item
+        raise IndexError('pop from empty queue')
+
+
+QUEUES: Dict[str, Callable[[], object]] = {
+    'binary': BinaryHeap,
+    'dary': DaryHeap,
+    'bucket': BucketQueue,
+    'radix': RadixHeap,
+}
+
+
+def queue_factory(queue: Union[str, Callable[[], object]]) -> Callable[[], object]:
+    """Resolve a backend name from QUEUES (or pass a factory through)."""
+    if callable(queue):
+        return queue
+    try:
+        return QUEUES[queue]
+    except KeyError:
+        raise ValueError(f"unknown queue {queue!r}; expected one of {', '.join(QUEUES)}") from None
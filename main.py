@@ -1,271 +1,277 @@
 import pygame
-import time
 from algorithms.astar import AStar
 from algorithms.dijkstra import Dijkstra
 from algorithms.bfs import BFS
 from algorithms.bidirectional import BidirectionalBFS
+from core.grid import Grid
 from core.heuristics import manhattan
+from core.metrics import Instrumentation
+from ui.worker import SearchWorker
 
 
-class Spot:
-    def __init__(self, row, col, screen, square_size):
-        self.row = row
-        self.col = col
-        self.black = (0, 0, 0)
-        self.white = (255, 255, 255)
-        self.red = (255, 0, 0)
-        self.screen = screen
-        self.square_size = square_size
-        self.draw(self.black)
-        self.neighbors = []
-        self.barrier = False
+class Main:
+    """Interactive grid editor and search visualizer.
 
-    def draw(self, color):
-        pygame.draw.rect(self.screen, color, pygame.Rect(self.col * self.square_size - self.square_size,
-                                                         self.row * self.square_size - self.square_size,
-                                                         self.square_size, self.square_size))
-        pygame.draw.line(self.screen, self.white, (
-            self.col * self.square_size - self.square_size, self.row * self.square_size - self.square_size),
-                         (self.col * self.square_size - self.square_size, self.row * self.square_size))
-        pygame.draw.line(self.screen, self.white, (
-            self.col * self.square_size - self.square_size, self.row * self.square_size - self.square_size),
-                         (self.col * self.square_size, self.row * self.square_size - self.square_size))
+    Cells live in a ``core.grid.Grid`` addressed by ``(row, col)``; the screen
+    position of a cell is computed from its coordinates, so no per-cell
+    objects or neighbor lists are kept. Every draw records the rectangle it
+    touched and the frame only pushes those rectangles to the display.
 
+    Searches run on a ``SearchWorker`` thread against a snapshot of the grid
+    and stream explored cells back through its queue, so the window keeps
+    responding. C or ESC cancels; starting another search replaces it.
+    """
 
-class Main:
     def __init__(self):
         pygame.init()  # Initialize pygame first
         self.width = 800
         self.height = 800
         self.square_size = 50
-        self.rows = int(self.height / self.square_size)
-        self.columns = int(self.width / self.square_size)
+        self.min_square_size = 1
         self.black = (0, 0, 0)
         self.white = (255, 255, 255)
         self.red = (255, 0, 0)
         self.green = (0, 255, 0)
         self.gold = (255, 215, 0)
         self.gray = (220, 220, 220)
-        self.spots = []
-        self.target = None
-        self.starting_spot = None
+        self.blue = (100, 149, 237)
         self.backgroundColor = self.black
         self.screen = pygame.display.set_mode((self.width, self.height))
-        self.screen.fill(self.backgroundColor)
         self.font = pygame.font.SysFont('arial', 20)  # Font for help text
+        self.help_rect = pygame.Rect(0, self.height - 60, self.width, 60)
         self.keys_pressed = set()  # Track currently pressed keys
+        self.dirty = []  # screen rects changed since the last display update
+        self.worker = SearchWorker()
+        self.search_name = None
+        self.search_budget_s = 30.0  # give up on a single search after this long
         self.draw_squares()
         self.game()
 
-    def assign_neighbors(self):
-        for spot in self.spots:
-            for spot2 in self.spots:
-                if spot2.col == spot.col or spot2.col == spot.col + 1 or spot2.col == spot.col - 1:
-                    if spot2.row == spot.row + 1 or spot2.row == spot.row - 1:
-                        spot.neighbors.append(spot2)
-                if spot2.row == spot.row:
-                    if spot2.col == spot.col + 1 or spot2.col == spot.col - 1:
-                        spot.neighbors.append(spot2)
-
     def draw_squares(self):
-        # Recalculate grid dimensions based on current square size
-        self.rows = int(self.height / self.square_size)
-        self.columns = int(self.width / self.square_size)
-        
-        self.spots = []
-        for row in range(1, self.rows + 1):
-            for col in range(1, self.columns + 1):
-                self.spots.append(Spot(row, col, self.screen, self.square_size))
-        self.assign_neighbors()
-        pygame.display.update()
+        # Recalculate grid dimensions based on current square size; zooming
+        # starts from an empty grid like before
+        self.rows = self.height // self.square_size
+        self.columns = self.width // self.square_size
+        self.grid = Grid(self.rows, self.columns, diagonal=False)
+        self.starting_spot = None
+        self.target = None
+        self.overlay = {}  # coord -> (color, step label or None) for explored/path cells
 
-    def draw_target(self, x, y):
-        for s in self.spots:
-            if s is not self.starting_spot:
-                if x < s.col < x + 2:
-                    if y < s.row < y + 2:
-                        s.draw(self.red)
-                        self.target = s
+        self.screen.fill(self.backgroundColor)
+        if self.square_size >= 3:
+            size = self.square_size
+            for col in range(self.columns + 1):
+                pygame.draw.line(self.screen, self.white, (col * size, 0), (col * size, self.rows * size))
+            for row in range(self.rows + 1):
+                pygame.draw.line(self.screen, self.white, (0, row * size), (self.columns * size, row * size))
+        self.draw_help_text()
         pygame.display.update()
+        self.dirty = []
 
-    def draw_starting_spot(self, x, y):
-        for s in self.spots:
-            if s is not self.target:
-                if x < s.col < x + 2:
-                    if y < s.row < y + 2:
-                        s.draw(self.gold)
-                        self.starting_spot = s
-        pygame.display.update()
+    def cell_at(self, pos):
+        """Grid coordinate under a screen position, or None outside the grid."""
+        coord = (pos[1] // self.square_size, pos[0] // self.square_size)
+        return coord if self.grid.in_bounds(coord) else None
 
-    def draw_barrier(self, x, y):
-        for s in self.spots:
-            if s is not self.target and s is not self.starting_spot:
-                if x < s.col < x + 2:
-                    if y < s.row < y + 2:
-                        s.draw(self.gray)
-                        s.barrier = True
-        pygame.display.update()
+    def cell_rect(self, coord):
+        row, col = coord
+        return pygame.Rect(col * self.square_size, row * self.square_size, self.square_size, self.square_size)
+
+    def cell_color(self, coord):
+        if coord == self.starting_spot:
+            return self.gold
+        if coord == self.target:
+            return self.red
+        if not self.grid.passable(coord):
+            return self.gray
+        if coord in self.overlay:
+            return self.overlay[coord][0]
+        return self.black
+
+    def draw_cell(self, coord):
+        rect = self.cell_rect(coord)
+        pygame.draw.rect(self.screen, self.cell_color(coord), rect)
+        if self.square_size >= 3:
+            pygame.draw.line(self.screen, self.white, rect.topleft, rect.bottomleft)
+            pygame.draw.line(self.screen, self.white, rect.topleft, rect.topright)
+        label = self.overlay.get(coord, (None, None))[1]
+        if label is not None and coord not in (self.starting_spot, self.target):
+            self.draw_number_on_spot(coord, label)
+        self.dirty.append(rect)
+
+    def draw_target(self, coord):
+        if coord != self.starting_spot:
+            self.grid.remove_block(coord)
+            self.target = coord
+            self.draw_cell(coord)
+
+    def draw_starting_spot(self, coord):
+        if coord != self.target:
+            self.grid.remove_block(coord)
+            self.starting_spot = coord
+            self.draw_cell(coord)
+
+    def draw_barrier(self, coord):
+        if coord not in (self.target, self.starting_spot) and self.grid.passable(coord):
+            self.grid.add_block(coord)
+            self.draw_cell(coord)
 
     def draw_path(self, path):
         for coord in path:
-            row, col = coord
-            for spot in self.spots:
-                if spot.row == row and spot.col == col:
-                    spot.draw(self.green)
-        pygame.display.update()
+            self.overlay[coord] = (self.green, None)
+            self.draw_cell(coord)
 
     def draw_help_text(self):
         """Draw help text on the screen with background"""
         help_text = [
-            "LEFT: Set Start | MID: Set Target | RIGHT: Clear Path | R: Reset",
+            "LEFT: Set Start | MID: Set Target | RIGHT: Clear Path | R: Reset | C/ESC: Cancel",
             "A: A* | D: Dijkstra | F: BFS | I: Bidirectional | B: Draw Barrier | SCROLL: Zoom"
         ]
-        # Draw semi-transparent background
-        help_bg = pygame.Surface((self.width, 60))
-        help_bg.set_alpha(200)
-        help_bg.fill((40, 40, 40))
-        self.screen.blit(help_bg, (0, self.height - 60))
-        
+        # Opaque panel: it is redrawn whenever cells beneath it change
+        self.screen.fill((40, 40, 40), self.help_rect)
+
         # Draw text in white
         y = self.height - 55
         for line in help_text:
             text_surf = self.font.render(line, True, (255, 255, 255))
             self.screen.blit(text_surf, (10, y))
             y += 25
+        self.dirty.append(self.help_rect)
 
     def clear_path(self):
-        # Clear path only (green cells), keep start/target/barriers
-        for spot in self.spots:
-            # Only redraw if it's not start, target, or barrier
-            if spot != self.starting_spot and spot != self.target and not spot.barrier:
-                spot.draw(self.black)
-        pygame.display.update()
+        # Clear path only (explored and path cells), keep start/target/barriers
+        cells = list(self.overlay)
+        self.overlay = {}
+        for coord in cells:
+            self.draw_cell(coord)
+
+    def reset(self):
+        # Reset: clear path and barriers, keep start/target
+        self.clear_path()
+        for coord in list(self.grid.blocks):
+            self.grid.remove_block(coord)
+            self.draw_cell(coord)
+
+    def zoom(self, step):
+        size = self.square_size + step
+        if self.min_square_size <= size <= 100:
+            self.cancel_search()
+            self.square_size = size
+            self.draw_squares()
 
+    def flush(self):
+        if not self.dirty:
+            return
+        if self.help_rect.collidelist(self.dirty) >= 0:
+            self.draw_help_text()
+        if len(self.dirty) > 2000:
+            pygame.display.update()  # cheaper than clipping thousands of rects
+        else:
+            pygame.display.update(self.dirty)
+        self.dirty = []
 
     def game(self):
+        # the worker streams explored cells itself, so no per-search trace is needed
+        counters = Instrumentation.COUNTERS
+        algorithms = {
+            pygame.K_a: (lambda: AStar(manhattan, instrumentation=counters), "A*"),
+            pygame.K_d: (lambda: Dijkstra(instrumentation=counters), "Dijkstra"),
+            pygame.K_f: (lambda: BFS(instrumentation=counters), "BFS"),
+            pygame.K_i: (lambda: BidirectionalBFS(instrumentation=counters), "Bidirectional BFS"),
+        }
+        clock = pygame.time.Clock()
         running = True
-        self.draw_squares()
-        pygame.display.update()
 
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEWHEEL:
-                    self.target = None
-                    self.starting_spot = None
-                    if event.y == -1 and self.square_size > 5:
-                        self.square_size -= 1
-                        self.draw_squares()
-                    if event.y == 1 and self.square_size < 100:
-                        self.square_size += 1
-                        self.draw_squares()
+                    if event.y < 0:
+                        self.zoom(-1)
+                    elif event.y > 0:
+                        self.zoom(1)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
+                    coord = self.cell_at(event.pos)
                     if event.button == 1:
-                        if self.starting_spot is None:
-                            self.draw_starting_spot(event.pos[0] // self.square_size, event.pos[1] // self.square_size)
+                        if self.starting_spot is None and coord is not None:
+                            self.draw_starting_spot(coord)
                     elif event.button == 2:
-                        if self.target is None:
-                            self.draw_target(event.pos[0] // self.square_size, event.pos[1] // self.square_size)
+                        if self.target is None and coord is not None:
+                            self.draw_target(coord)
                     elif event.button == 3:
                         # Right click: clear only the path, keep start/target/barriers
                         self.clear_path()
                 elif event.type == pygame.KEYDOWN:
                     self.keys_pressed.add(event.key)
                     if event.key == pygame.K_r:
-                        # Reset: clear only path and barriers, keep start/target
-                        for spot in self.spots:
-                            if spot != self.starting_spot and spot != self.target:
-                                spot.barrier = False
-                                spot.draw(self.black)
-                        if self.starting_spot:
-                            self.starting_spot.draw(self.gold)
-                        if self.target:
-                            self.target.draw(self.red)
-                    if event.key == pygame.K_a:
-                        if self.target is not None and self.starting_spot is not None:
-                            self.run_algorithm(AStar(manhattan), "A*")
-                    if event.key == pygame.K_d:
+                        self.cancel_search()
+                        self.reset()
+                    if event.key in (pygame.K_c, pygame.K_ESCAPE):
+                        self.cancel_search()
+                    if event.key in algorithms:
                         if self.target is not None and self.starting_spot is not None:
-                            self.run_algorithm(Dijkstra(), "Dijkstra")
-                    if event.key == pygame.K_f:
-                        if self.target is not None and self.starting_spot is not None:
-                            self.run_algorithm(BFS(), "BFS")
-                    if event.key == pygame.K_i:
-                        if self.target is not None and self.starting_spot is not None:
-                            self.run_algorithm(BidirectionalBFS(), "Bidirectional BFS")
+                            factory, name = algorithms[event.key]
+                            self.run_algorithm(factory(), name)
                 elif event.type == pygame.KEYUP:
                     self.keys_pressed.discard(event.key)
-            
+
             # Continuous barrier drawing when 'b' is held
             if pygame.K_b in self.keys_pressed:
-                pos = pygame.mouse.get_pos()
-                self.draw_barrier(pos[0] // self.square_size, pos[1] // self.square_size)
-            
-            # Draw help text (always on top)
-            self.draw_help_text()
-            pygame.display.flip()
+                coord = self.cell_at(pygame.mouse.get_pos())
+                if coord is not None:
+                    self.draw_barrier(coord)
+
+            self.apply_search_updates()
+            self.flush()
+            clock.tick(120)
+        self.worker.cancel()
 
     def run_algorithm(self, algorithm, name):
-        # Convert spot coordinates (1-indexed) to grid coordinates (0-indexed)
-        start = (self.starting_spot.row - 1, self.starting_spot.col - 1)
-        goal = (self.target.row - 1, self.target.col - 1)
-        
-        # Build grid from current spots
-        from core.grid import Grid
-        grid = Grid(self.rows, self.columns, diagonal=False)
-        for spot in self.spots:
-            if spot.barrier:
-                # Convert spot coordinates to grid coordinates
-                grid.add_block((spot.row - 1, spot.col - 1))
-        
-        path, metrics = algorithm.search(grid, start, goal)
-        
-        # Clear previous path by redrawing all spots
-        for spot in self.spots:
-            if spot.barrier:
-                spot.draw(self.gray)
+        # Replace the previous result; the worker gets its own copy of the
+        # grid so painting can continue while it searches
+        self.clear_path()
+        snapshot = self.grid.copy()
+        self.search_name = name
+        self.search_steps = 0
+        self.worker.start(algorithm, snapshot, self.starting_spot, self.target, max_seconds=self.search_budget_s)
+
+    def cancel_search(self):
+        if self.search_name is not None:
+            self.worker.cancel()
+            print(f"{self.search_name}: cancelled")
+            self.search_name = None
+
+    def apply_search_updates(self):
+        """Draw whatever the worker has posted since the last frame."""
+        # Step numbers only when the label fits in a cell
+        labelled = self.square_size >= 20
+        for update in self.worker.poll():
+            for coord in update.closed:
+                self.overlay[coord] = (self.blue, self.search_steps if labelled else None)
+                self.search_steps += 1
+                self.draw_cell(coord)
+            if update.kind == 'progress':
+                continue
+            name, metrics = self.search_name, update.metrics
+            self.search_name = None
+            if update.kind == 'done' and update.path:
+                # Draw new path (start and target keep their own colors)
+                self.draw_path(update.path)
+                print(f"{name}: nodes={metrics.nodes_expanded} path_len={metrics.path_length} time={metrics.runtime_ms:.2f}ms")
+            elif update.kind == 'done':
+                print(f"{name}: No path found")
+            elif update.kind == 'error':
+                print(f"{name}: failed with {type(update.error).__name__}: {update.error}")
             else:
-                spot.draw(self.black)
-        
-        # Draw explored nodes in blue (excluding start and target)
-        blue = (100, 149, 237)
-        for coord in metrics.explored:
-            row, col = coord
-            spot_row, spot_col = row + 1, col + 1
-            if (spot_row, spot_col) != (self.starting_spot.row, self.starting_spot.col) and (spot_row, spot_col) != (self.target.row, self.target.col):
-                for spot in self.spots:
-                    if spot.row == spot_row and spot.col == spot_col:
-                        spot.draw(blue)
-                        # Draw step number
-                        step = metrics.explored_order.get(coord, "?")
-                        self.draw_number_on_spot(spot, step)
-        
-        # Redraw start and target in original colors
-        self.starting_spot.draw(self.gold)
-        self.target.draw(self.red)
-        
-        if path:
-            # Draw new path (excluding start and target)
-            # Convert grid coordinates back to spot coordinates (add 1)
-            for coord in path:
-                row, col = coord
-                spot_row, spot_col = row + 1, col + 1
-                if (spot_row, spot_col) != (self.starting_spot.row, self.starting_spot.col) and (spot_row, spot_col) != (self.target.row, self.target.col):
-                    for spot in self.spots:
-                        if spot.row == spot_row and spot.col == spot_col:
-                            spot.draw(self.green)
-            print(f"{name}: nodes={metrics.nodes_expanded} path_len={metrics.path_length} time={metrics.runtime_ms:.2f}ms")
-        else:
-            print(f"{name}: No path found")
+                print(f"{name}: over the {self.search_budget_s:g}s budget, stopped after {metrics.nodes_expanded} nodes")
 
-    def draw_number_on_spot(self, spot, step):
-        """Draw step number on a spot"""
-        x = spot.col * spot.square_size - spot.square_size // 2
-        y = spot.row * spot.square_size - spot.square_size // 2
+    def draw_number_on_spot(self, coord, step):
+        """Draw step number on a cell"""
+        rect = self.cell_rect(coord)
         text_surf = self.font.render(str(step), True, (255, 255, 0))
-        self.screen.blit(text_surf, (x, y))
-
+        # crop to the cell so the label stays inside its dirty rect
+        self.screen.blit(text_surf, rect.center, pygame.Rect(0, 0, rect.right - rect.centerx, rect.bottom - rect.centery))
 
 
 if __name__ == "__main__":
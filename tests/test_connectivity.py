@@ -0,0 +1,119 @@
+import random
+from collections import deque
+
+from core.grid import CornerCutting, Grid
+from algorithms.astar import AStar
+from algorithms.bfs import BFS
+
+
+def _corridor(rows, width):
+    # a vertical corridor ``width`` cells wide, walled on both sides
+    grid = Grid(rows, width + 2)
+    for r in range(rows):
+        grid.add_block((r, 0))
+        grid.add_block((r, width + 1))
+    return grid
+
+
+def _reachable(grid, start, goal):
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        cur = queue.popleft()
+        if cur == goal:
+            return True
+        for nb in grid.neighbors(cur):
+            if nb not in seen:
+                seen.add(nb)
+                queue.append(nb)
+    return False
+
+
+def test_split_and_reopen_corridor():
+    grid = _corridor(9, 1)
+    index = grid.enable_connectivity_index()
+    top, bottom = (0, 1), (8, 1)
+    assert index.may_connect(top, bottom)
+
+    grid.add_block((4, 1))
+    assert not index.may_connect(top, bottom)
+    path, metrics = AStar().search(grid, top, bottom)
+    assert path == [] and metrics.rejected_unreachable == 1
+    rebuilds = index.rebuilds
+
+    grid.remove_block((4, 1))
+    path, metrics = AStar().search(grid, top, bottom)
+    assert path and metrics.rejected_unreachable == 0
+    assert index.rebuilds == rebuilds  # reopening merges labels, no relabel
+
+
+def test_block_that_keeps_component_skips_relabel():
+    grid = _corridor(9, 2)
+    index = grid.enable_connectivity_index()
+    top, bottom = (0, 1), (8, 2)
+    rebuilds = index.rebuilds
+
+    grid.add_block((4, 1))  # the other lane still links the ring around it
+    path, metrics = BFS().search(grid, top, bottom)
+    assert path and metrics.rejected_unreachable == 0
+    assert index.rebuilds == rebuilds
+
+    grid.add_block((4, 2))  # now the corridor is cut
+    path, metrics = BFS().search(grid, top, bottom)
+    assert path == [] and metrics.rejected_unreachable == 1
+
+    grid.remove_block((4, 2))
+    assert index.may_connect(top, bottom)
+
+
+def test_batch_of_blocks_that_each_look_local():
+    # Blocking either cell alone leaves its 3x3 ring linked through the
+    # other lane; both at once (one sync) split the corridor, so the ring
+    # checks have to see the final grid
+    grid = _corridor(9, 2)
+    index = grid.enable_connectivity_index()
+    top, bottom = (0, 1), (8, 2)
+    grid.add_block((4, 1))
+    grid.add_block((4, 2))
+    assert not index.may_connect(top, bottom)
+    path, metrics = AStar().search(grid, top, bottom)
+    assert path == [] and metrics.rejected_unreachable == 1
+
+    grid.remove_block((4, 1))
+    path, metrics = AStar().search(grid, top, bottom)
+    assert path and metrics.rejected_unreachable == 0
+
+
+def test_blocking_a_corner_closes_a_diagonal_squeeze():
+    # (0, 0) reaches (1, 1) only by squeezing past the open corner (0, 1);
+    # blocking that corner cuts a move that never entered it
+    grid = Grid(3, 3, diagonal=True, corner_cutting=CornerCutting.IF_ONE_OPEN)
+    for cell in ((1, 0), (2, 0)):
+        grid.add_block(cell)
+    index = grid.enable_connectivity_index()
+    grid.add_block((0, 2))
+    grid.add_block((1, 2))
+    assert index.may_connect((0, 0), (2, 2))
+    grid.add_block((0, 1))
+    assert not _reachable(grid, (0, 0), (2, 2))
+    assert not index.may_connect((0, 0), (2, 2))
+
+
+def test_random_edits_never_reject_a_reachable_query():
+    rng = random.Random(11)
+    for diagonal, rule in ((False, CornerCutting.ALWAYS), (True, CornerCutting.ALWAYS),
+                           (True, CornerCutting.IF_ONE_OPEN), (True, CornerCutting.NEVER)):
+        grid = Grid(10, 10, diagonal=diagonal, corner_cutting=rule)
+        grid.randomize_blocks(0.35, rng)
+        index = grid.enable_connectivity_index()
+        for _ in range(150):
+            for _ in range(rng.randint(1, 3)):
+                cell = (rng.randrange(10), rng.randrange(10))
+                if rng.random() < 0.55:
+                    grid.add_block(cell)
+                else:
+                    grid.remove_block(cell)
+            start = (rng.randrange(10), rng.randrange(10))
+            goal = (rng.randrange(10), rng.randrange(10))
+            if grid.passable(start) and grid.passable(goal):
+                assert index.may_connect(start, goal) == _reachable(grid, start, goal)
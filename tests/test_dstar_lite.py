@@ -0,0 +1,29 @@
+from core.grid import CornerCutting, Grid
+from algorithms.dijkstra import Dijkstra
+from algorithms.dstar_lite import DStarLite
+
+
+def _cost(grid, path):
+    return sum(grid.get_cost(a, b) for a, b in zip(path, path[1:]))
+
+
+def test_replan_after_blocking_matches_dijkstra():
+    # Keys of the start and of an under-consistent cell tie on k1 up to
+    # float rounding; an exact comparison used to stop the repair early
+    rows = ['..#..', 'S..#.', '..#.T', '...#.', '.....', '.....', '.....', '..#.#']
+    late = [(0, 2), (7, 2), (3, 3)]
+    grid = Grid(8, 5, diagonal=True, corner_cutting=CornerCutting.IF_ONE_OPEN)
+    for r, line in enumerate(rows):
+        for c, ch in enumerate(line):
+            if ch == '#' and (r, c) not in late:
+                grid.add_block((r, c))
+    start, goal = (1, 0), (2, 4)
+    planner = DStarLite()
+    assert planner.search(grid, start, goal)[0]
+
+    for cell in late:
+        grid.add_block(cell)
+    path, _ = planner.search(grid, start, goal)
+    expected, _ = Dijkstra().search(grid, start, goal)
+    assert path and path[0] == start and path[-1] == goal
+    assert abs(_cost(grid, path) - _cost(grid, expected)) < 1e-9
@@ -0,0 +1,96 @@
+import random
+
+import algorithms.flowfield as flowfield
+from core.grid import CornerCutting, Grid
+from algorithms.dijkstra import Dijkstra
+from algorithms.flowfield import FlowField
+
+
+def _cost(grid, path):
+    return sum(grid.get_cost(a, b) for a, b in zip(path, path[1:]))
+
+
+def _check(field, grid, rng, queries=6):
+    fresh = FlowField(grid, field.goal)
+    field.update()
+    assert list(field.dist) == list(fresh.dist)
+    for _ in range(queries):
+        start = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        if not grid.passable(start):
+            continue
+        path = field.path_from(start)
+        expected, _ = Dijkstra().search(grid, start, field.goal)
+        assert bool(path) == bool(expected)
+        if path:
+            assert path[0] == start and path[-1] == field.goal
+            for a, b in zip(path, path[1:]):
+                assert any(v == b for v, _ in grid.successors(a)), (a, b)
+            assert abs(_cost(grid, path) - _cost(grid, expected)) < 1e-9
+            assert abs(_cost(grid, path) - fresh.distance(start)) < 1e-9
+
+
+def test_random_edits_match_fresh_field_and_dijkstra():
+    rng = random.Random(21)
+    for diagonal, rule, weighted in ((False, CornerCutting.ALWAYS, False), (False, CornerCutting.ALWAYS, True),
+                                     (True, CornerCutting.ALWAYS, False), (True, CornerCutting.IF_ONE_OPEN, True),
+                                     (True, CornerCutting.NEVER, True)):
+        grid = Grid(12, 13, diagonal=diagonal, corner_cutting=rule)
+        grid.randomize_blocks(0.25, rng)
+        goal = (rng.randrange(12), rng.randrange(13))
+        grid.remove_block(goal)
+        field = FlowField(grid, goal)
+        for _ in range(60):
+            for _ in range(rng.randint(1, 3)):
+                # goal-adjacent edits half the time, so the goal's own subtree is hit often
+                if rng.random() < 0.5:
+                    cell = (rng.randrange(12), rng.randrange(13))
+                else:
+                    cell = (min(11, max(0, goal[0] + rng.randint(-1, 1))),
+                            min(12, max(0, goal[1] + rng.randint(-1, 1))))
+                roll = rng.random()
+                if roll < 0.4:
+                    grid.add_block(cell)
+                elif roll < 0.8 or not weighted:
+                    grid.remove_block(cell)
+                else:
+                    grid.set_weight(cell, rng.randint(1, 6))
+            _check(field, grid, rng)
+
+
+def test_goal_edit_rebuilds():
+    grid = Grid(6, 6)
+    field = FlowField(grid, (3, 3))
+    rebuilds = field.rebuilds
+    grid.add_block((3, 3))
+    assert field.path_from((0, 0)) == []
+    assert field.rebuilds == rebuilds + 1
+    grid.remove_block((3, 3))
+    assert field.path_from((0, 0))[-1] == (3, 3)
+    assert field.rebuilds == rebuilds + 2
+
+
+def test_rebuild_fraction_cutover(monkeypatch):
+    rng = random.Random(4)
+    grid = Grid(20, 20)
+    field = FlowField(grid, (0, 0))
+    rebuilds = field.rebuilds
+
+    grid.add_block((19, 18))  # invalidates only a corner of the field: repaired in place
+    _check(field, grid, rng)
+    assert field.rebuilds == rebuilds
+    assert 0 < field.repaired <= flowfield.REBUILD_FRACTION * 400
+
+    # next to the goal: most routes pass through one of its two neighbors
+    busy = max(((0, 1), (1, 0)), key=lambda cell: len(field._subtrees([cell])))
+    assert len(field._subtrees([busy])) > flowfield.REBUILD_FRACTION * 400
+    grid.add_block(busy)
+    _check(field, grid, rng)
+    assert field.rebuilds == rebuilds + 1
+
+    monkeypatch.setattr(flowfield, 'REBUILD_FRACTION', 1.0)
+    grid.remove_block(busy)
+    grid.add_block((1, 1))
+    grid.add_block((0, 1) if busy == (1, 0) else (1, 0))
+    _check(field, grid, rng)
+    assert field.rebuilds == rebuilds + 1
+    assert field.repaired > 0.25 * 400
@@ -0,0 +1,86 @@
+import io
+import random
+
+from core.grid import CornerCutting, Grid
+from core.gridfile import MappedGrid, _layout, save_grid, write_grid
+from algorithms.astar import AStar
+from algorithms.dijkstra import Dijkstra
+
+
+def _source(rows, cols, diagonal, weighted, seed):
+    rng = random.Random(seed)
+    grid = Grid(rows, cols, diagonal=diagonal, corner_cutting=CornerCutting.IF_ONE_OPEN)
+    grid.randomize_blocks(0.25, rng)
+    for r in range(rows):
+        grid.add_block((r, cols - 1))  # the last column sits next to the padding bits
+    grid.remove_block((0, 0))
+    grid.remove_block((rows - 1, cols - 2))
+    if weighted:
+        for _ in range(rows * cols // 4):
+            grid.set_weight((rng.randrange(rows), rng.randrange(cols)), rng.choice((1.5, 2.0, 4.25)))
+    return grid
+
+
+def _assert_same(source, mapped):
+    assert (mapped.rows, mapped.cols, mapped.diagonal) == (source.rows, source.cols, source.diagonal)
+    assert set(mapped.blocks) == set(source.blocks)
+    assert dict(mapped.weights) == source.weights
+    for r in range(source.rows):
+        for c in range(source.cols):
+            assert mapped.passable((r, c)) == source.passable((r, c))
+            assert sorted(mapped.successors((r, c))) == sorted(source.successors((r, c)))
+
+
+def _assert_same_searches(source, mapped, seed):
+    rng = random.Random(seed)
+    for alg in (AStar(), Dijkstra()):
+        for _ in range(10):
+            start = (rng.randrange(source.rows), rng.randrange(source.cols))
+            goal = (rng.randrange(source.rows), rng.randrange(source.cols))
+            assert alg.search(mapped, start, goal)[0] == alg.search(source, start, goal)[0]
+
+
+def test_save_and_map_round_trip(tmp_path):
+    for i, (rows, cols, diagonal, weighted) in enumerate(((9, 13, False, False), (7, 17, True, True),
+                                                          (5, 8, True, False), (3, 1, False, True))):
+        source = _source(rows, cols, diagonal, weighted, i)
+        path = str(tmp_path / f'grid{i}.grid')
+        save_grid(source, path)
+        with MappedGrid(path, corner_cutting=CornerCutting.IF_ONE_OPEN) as mapped:
+            _assert_same(source, mapped)
+            _assert_same_searches(source, mapped, i)
+
+
+def test_padding_bits_stay_clear():
+    source = _source(6, 11, False, False, 3)
+    buffer = io.BytesIO()
+    write_grid(source, buffer)
+    data = buffer.getvalue()
+    stride, bits_offset, _ = _layout(6, 11)
+    for r in range(6):
+        last = data[bits_offset + r * stride + stride - 1]
+        assert last >> (11 & 7) == 0
+
+
+def test_from_buffer_matches_source():
+    # the path batch.solve_many takes: the file layout in (shared) memory
+    source = _source(8, 15, True, True, 5)
+    buffer = io.BytesIO()
+    write_grid(source, buffer)
+    shared = bytearray(buffer.getvalue())
+    mapped = MappedGrid.from_buffer(shared, corner_cutting=CornerCutting.IF_ONE_OPEN)
+    try:
+        _assert_same(source, mapped)
+        _assert_same_searches(source, mapped, 5)
+    finally:
+        mapped.close()
+
+
+def test_mapped_grid_saves_unchanged(tmp_path):
+    source = _source(6, 10, True, True, 7)
+    first, second = str(tmp_path / 'a.grid'), str(tmp_path / 'b.grid')
+    save_grid(source, first)
+    with MappedGrid(first) as mapped:
+        save_grid(mapped, second)
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        assert a.read() == b.read()
@@ -0,0 +1,77 @@
+import json
+import math
+
+from benchmarks import harness
+from benchmarks.harness import bootstrap_ci, compare_results, mann_whitney, summarize, tukey_outliers
+
+
+def test_mann_whitney_exact():
+    # every new value beats every base value: U = 9, and only 1 of the
+    # C(6, 3) = 20 rank arrangements is that extreme
+    assert mann_whitney([3, 1, 2], [4, 6, 5]) == (1 / 20, 1.0)
+    p_slower, p_faster = mann_whitney(list(range(5)), list(range(5, 10)))
+    assert math.isclose(p_slower, 1 / 252)
+    assert p_faster == 1.0
+    # interleaved ranks 1 3 5 | 2 4 6: U = 6 of 9; U counts 0..9 occur
+    # 1 1 2 3 3 3 3 2 1 1 times, so P(U >= 6) = 7/20
+    assert math.isclose(mann_whitney([1, 3, 5], [2, 4, 6])[0], 7 / 20)
+
+
+def test_mann_whitney_normal_with_ties():
+    # ranks 1, 2.5, 2.5, 4: U = 3.5, mean 2, tie-corrected variance 1.5
+    p_slower, p_faster = mann_whitney([1, 2], [2, 3])
+    assert math.isclose(p_slower, 0.5 * math.erfc(1.0 / math.sqrt(1.5) / math.sqrt(2)))
+    assert math.isclose(p_slower, 0.20711, abs_tol=1e-5)
+    assert math.isclose(p_faster, 0.94876, abs_tol=1e-5)
+    # all values tied: no evidence either way
+    assert mann_whitney([2, 2, 2], [2, 2]) == (1.0, 1.0)
+
+
+def test_tukey_outliers():
+    assert tukey_outliers([1, 2, 3, 4, 100]) == 1
+    assert tukey_outliers([1, 2, 3, 4, 5]) == 0
+    assert tukey_outliers([-50, 10, 10, 11, 12, 12]) == 1
+
+
+def test_bootstrap_ci_is_seeded_and_brackets_the_statistic():
+    runs = [[1.0, 1.2, 1.1, 0.9], [1.3, 1.4, 1.2, 1.5], [1.0, 1.1, 1.0, 1.2]]
+    lo, hi = bootstrap_ci(runs, 50, resamples=300)
+    assert (lo, hi) == bootstrap_ci(runs, 50, resamples=300)
+    assert 0.9 <= lo <= 1.15 <= hi <= 1.5
+    assert bootstrap_ci([[2.0] * 4] * 3, 95, resamples=50) == (2.0, 2.0)
+
+
+def _baseline(runs, scale=1.0):
+    results = {}
+    for key in ('astar/50x50/0.2', 'bfs/50x50/0.2'):
+        scaled = [[v * scale for v in run] for run in runs]
+        res = {'path_costs': [10.0, None]}
+        res.update(summarize(scaled))
+        res['samples_ms'] = scaled
+        results[key] = res
+    return {'format': harness.FORMAT_VERSION, 'results': results}
+
+
+RUNS = [[10.0 + 0.1 * ((r * 7 + i * 3) % 5) + 0.05 * r for i in range(8)] for r in range(5)]
+
+
+def test_compare_gates_on_slowdown_only():
+    base = _baseline(RUNS)
+    assert all(row['verdict'] == 'same' for row in compare_results(base, _baseline(RUNS)))
+    slower = compare_results(base, _baseline(RUNS, 2.0))
+    assert all(row['verdict'] == 'REGRESSION' for row in slower)
+    assert all(math.isclose(row['ratio'], 2.0) for row in slower)
+    faster = compare_results(base, _baseline(RUNS, 0.5))
+    assert all(row['verdict'] == 'improved' for row in faster)
+    # significant but inside the threshold
+    assert all(row['verdict'] == 'same' for row in compare_results(base, _baseline(RUNS, 1.06)))
+
+
+def test_compare_command_exit_status(tmp_path):
+    paths = {}
+    for name, scale in (('base', 1.0), ('same', 1.0), ('slow', 2.0)):
+        paths[name] = str(tmp_path / f'{name}.json')
+        with open(paths[name], 'w') as fh:
+            json.dump(_baseline(RUNS, scale), fh)
+    assert harness.cli(['compare', paths['base'], paths['same']]) == 0
+    assert harness.cli(['compare', paths['base'], paths['slow']]) == 1
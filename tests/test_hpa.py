@@ -0,0 +1,88 @@
+import random
+
+from core.grid import CornerCutting, Grid
+from algorithms.dijkstra import Dijkstra
+from algorithms.hpa import HierarchicalAStar
+
+
+def _cost(grid, path):
+    return sum(grid.get_cost(a, b) for a, b in zip(path, path[1:]))
+
+
+def _assert_valid(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert any(v == b for v, _ in grid.successors(a)), (a, b)
+
+
+def _rebuilt_clusters(planner, monkeypatch):
+    rebuilt = []
+    original = planner._build_intra
+
+    def record(cluster):
+        rebuilt.append(cluster)
+        original(cluster)
+
+    def no_full_build(grid):
+        raise AssertionError("journal edits should not rebuild the whole graph")
+
+    monkeypatch.setattr(planner, '_build_intra', record)
+    monkeypatch.setattr(planner, 'build', no_full_build)
+    return rebuilt
+
+
+def test_edit_rebuilds_only_touched_clusters(monkeypatch):
+    grid = Grid(12, 12)
+    planner = HierarchicalAStar(cluster_size=4)
+    start, goal = (0, 0), (11, 11)
+    assert planner.search(grid, start, goal)[0]
+    rebuilt = _rebuilt_clusters(planner, monkeypatch)
+
+    grid.add_block((5, 5))  # inside cluster (1, 1), away from its borders
+    path, metrics = planner.search(grid, start, goal)
+    assert set(rebuilt) == {(1, 1)}
+    _assert_valid(grid, path, start, goal)
+    assert metrics.abstract_ms > 0 and metrics.refine_ms > 0
+
+    rebuilt.clear()
+    grid.set_weight((7, 5), 9)  # bottom row of cluster (1, 1): also rebuilds the cluster below
+    path, _ = planner.search(grid, start, goal)
+    assert set(rebuilt) == {(1, 1), (2, 1)}
+    _assert_valid(grid, path, start, goal)
+
+
+def test_edits_keep_reachability_of_dijkstra():
+    rng = random.Random(3)
+    for diagonal, rule in ((False, CornerCutting.ALWAYS), (True, CornerCutting.ALWAYS),
+                           (True, CornerCutting.IF_ONE_OPEN), (True, CornerCutting.NEVER)):
+        grid = Grid(14, 11, diagonal=diagonal, corner_cutting=rule)
+        grid.randomize_blocks(0.3, rng)
+        planner = HierarchicalAStar(cluster_size=3)
+        for _ in range(40):
+            cell = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+            if rng.random() < 0.5:
+                grid.add_block(cell)
+            else:
+                grid.remove_block(cell)
+                grid.set_weight(cell, rng.randint(1, 4))
+            start = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+            goal = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+            if not (grid.passable(start) and grid.passable(goal)):
+                continue
+            path, metrics = planner.search(grid, start, goal)
+            expected, _ = Dijkstra().search(grid, start, goal)
+            assert bool(path) == bool(expected)
+            if path:
+                _assert_valid(grid, path, start, goal)
+                assert _cost(grid, path) >= _cost(grid, expected) - 1e-9
+
+
+def test_diagonal_step_through_cluster_corner():
+    # The only way across is the diagonal step (1, 1) -> (2, 2), which
+    # passes through the corner shared by all four 2x2 clusters
+    grid = Grid(4, 4, diagonal=True)
+    for cell in ((0, 2), (0, 3), (1, 2), (1, 3), (2, 0), (2, 1), (3, 0), (3, 1)):
+        grid.add_block(cell)
+    path, _ = HierarchicalAStar(cluster_size=2).search(grid, (0, 0), (3, 3))
+    _assert_valid(grid, path, (0, 0), (3, 3))
+    assert ((1, 1), (2, 2)) in list(zip(path, path[1:]))
@@ -0,0 +1,56 @@
+import random
+
+import core.landmarks as landmarks
+from core.grid import Grid
+from algorithms.astar import AStar
+from algorithms.dijkstra import Dijkstra
+from core.landmarks import LandmarkTable
+
+
+def _cost(grid, path):
+    return sum(grid.get_cost(a, b) for a, b in zip(path, path[1:]))
+
+
+def _weighted_grid(seed):
+    rng = random.Random(seed)
+    grid = Grid(15, 15)
+    grid.randomize_blocks(0.2, rng)
+    for cell in ((0, 0), (7, 7), (14, 14)):
+        grid.remove_block(cell)
+    for _ in range(60):
+        grid.set_weight((rng.randrange(15), rng.randrange(15)), rng.randint(1, 5))
+    return grid
+
+
+def test_build_reuses_selection_distances(monkeypatch):
+    calls = []
+    original = landmarks._distances
+
+    def counted(grid, source, reverse):
+        calls.append(reverse)
+        return original(grid, source, reverse)
+
+    monkeypatch.setattr(landmarks, '_distances', counted)
+    table = LandmarkTable(_weighted_grid(1), count=4)
+    # one seed flood, then one forward and one reverse Dijkstra per landmark
+    assert len(table.landmarks) == 4
+    assert calls.count(False) == 1 + 4 and calls.count(True) == 4
+
+
+def test_calls_never_rebuild_and_search_refreshes_first():
+    grid = _weighted_grid(2)
+    table = LandmarkTable(grid, count=4)
+    grid.add_block((7, 7))
+    table((0, 0), (14, 14))
+    assert table.rebuilds == 1 and table.stale
+
+    start, goal = (0, 0), (14, 14)
+    path, _ = AStar(heuristic=table).search(grid, start, goal)
+    assert table.rebuilds == 2 and not table.stale
+    expected, _ = Dijkstra().search(grid, start, goal)
+    assert abs(_cost(grid, path) - _cost(grid, expected)) < 1e-9
+
+    assert not table.refresh()
+    grid.set_weight((3, 3), 4)
+    AStar(heuristic=table).stepper(grid, start, goal)
+    assert table.rebuilds == 3
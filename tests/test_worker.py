@@ -0,0 +1,37 @@
+import time
+
+from core.grid import Grid
+from algorithms.astar import AStar
+from ui.worker import SearchWorker
+
+
+class _Broken(AStar):
+    def _steps(self, grid, start, goal, metrics):
+        yield start, []
+        raise RuntimeError("boom")
+
+
+def _wait(worker, timeout=5.0):
+    updates = []
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        updates += worker.poll()
+        if updates and updates[-1].kind != 'progress':
+            return updates
+        time.sleep(0.01)
+    raise AssertionError("worker posted no final update")
+
+
+def test_search_error_is_posted():
+    worker = SearchWorker(chunk=1)
+    worker.start(_Broken(), Grid(5, 5), (0, 0), (4, 4))
+    last = _wait(worker)[-1]
+    assert last.kind == 'error'
+    assert isinstance(last.error, RuntimeError)
+
+
+def test_finished_search_posts_done():
+    worker = SearchWorker()
+    worker.start(AStar(), Grid(5, 5), (0, 0), (4, 4))
+    last = _wait(worker)[-1]
+    assert last.kind == 'done' and last.path[-1] == (4, 4)
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Iterable, Tuple
+from typing import Iterable, List, Tuple
+import numpy as np
 import pygame
 
 Coord = Tuple[int, int]
@@ -9,6 +10,12 @@ class Renderer:
     """Simple Pygame renderer for the grid and pathfinding instrumentation.
 
     Keeps rendering code separated from algorithm logic.
+
+    ``mode='rects'`` draws every cell with ``pygame.draw.rect``. ``mode='surfarray'``
+    keeps a per-cell color index buffer instead: a frame writes the buffer into
+    an 8-bit palettized surface (one pixel per cell), scales it to the window
+    and blits it once, and ``set_cells``/``present`` repaint only the cells that
+    changed.
     """
 
     COLORS = {
@@ -21,22 +28,54 @@ class Renderer:
         'closed': (100, 100, 255),
         'path': (200, 200, 30),
     }
+    # Color index of each kind in the surfarray buffer; later kinds draw on top
+    KINDS = ('grid', 'block', 'open', 'closed', 'path', 'start', 'goal')
+    MODES = ('rects', 'surfarray')
+    # Above this many changed cells, present() repaints the whole grid at once
+    PARTIAL_LIMIT = 4096
 
-    def __init__(self, grid_rows: int, grid_cols: int, cell_size: int = 20, margin: int = 1):
+    def __init__(self, grid_rows: int, grid_cols: int, cell_size: int = 20, margin: int = 1, mode: str = 'rects'):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown render mode {mode!r}")
         pygame.init()
         self.cell_size = cell_size
         self.margin = margin
         self.rows = grid_rows
         self.cols = grid_cols
+        self.mode = mode
         w = grid_cols * (cell_size + margin) + margin
         h = grid_rows * (cell_size + margin) + margin + 80
         self.screen = pygame.display.set_mode((w, h))
         pygame.display.set_caption('Pathfinding Engine')
         self.font = pygame.font.SysFont('Consolas', 18)
         self.clock = pygame.time.Clock()
+        if mode == 'surfarray':
+            self._init_buffers()
+
+    def _init_buffers(self):
+        pitch = self.cell_size + self.margin
+        self._index = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self._changed: List[Coord] = []
+        self._cells = pygame.Surface((self.cols, self.rows), depth=8)
+        self._cells.set_palette([self.COLORS[kind] for kind in self.KINDS])
+        # margins between cells, drawn over the scaled buffer; cell interiors are transparent
+        transparent = (255, 0, 255)
+        inside_x = np.arange(self.cols * pitch) % pitch < self.cell_size
+        inside_y = np.arange(self.rows * pitch) % pitch < self.cell_size
+        lines = np.where((inside_x[:, None] & inside_y[None, :])[..., None],
+                         np.array(transparent, dtype=np.uint8), np.array(self.COLORS['bg'], dtype=np.uint8))
+        self._lines = pygame.Surface((self.cols * pitch, self.rows * pitch))
+        pygame.surfarray.blit_array(self._lines, lines)
+        self._lines.set_colorkey(transparent)
 
     def draw_grid(self, grid, start: Coord = None, goal: Coord = None,
                   open_set: Iterable[Coord] = (), closed_set: Iterable[Coord] = (), path: Iterable[Coord] = ()):  # pragma: no cover - UI
+        if self.mode == 'surfarray':
+            self._fill_index(grid, start, goal, open_set, closed_set, path)
+            self._blit_all()
+            pygame.display.flip()
+            return
+
         self.screen.fill(self.COLORS['bg'])
 
         for r in range(self.rows):
@@ -71,6 +110,62 @@ class Renderer:
                            self.margin + r * (self.cell_size + self.margin),
                            self.cell_size, self.cell_size)
         pygame.draw.rect(self.screen, color, rect)
+        return rect
+
+    def _set_index(self, coords: Iterable[Coord], kind: str):
+        cells = np.array(list(coords), dtype=np.intp).reshape(-1, 2)
+        if len(cells):
+            inside = ((cells[:, 0] >= 0) & (cells[:, 0] < self.rows) &
+                      (cells[:, 1] >= 0) & (cells[:, 1] < self.cols))
+            cells = cells[inside]
+            self._index[cells[:, 0], cells[:, 1]] = self.KINDS.index(kind)
+        return cells
+
+    def _fill_index(self, grid, start, goal, open_set, closed_set, path):
+        self._index.fill(self.KINDS.index('grid'))
+        self._set_index(getattr(grid, 'blocks', ()), 'block')
+        self._set_index(open_set, 'open')
+        self._set_index(closed_set, 'closed')
+        self._set_index(path, 'path')
+        self._set_index([start] if start else (), 'start')
+        self._set_index([goal] if goal else (), 'goal')
+        self._changed = []
+
+    def _blit_all(self):
+        # surfarray is indexed (x, y), the buffer (row, col)
+        pygame.surfarray.blit_array(self._cells, self._index.T)
+        scaled = pygame.transform.scale(self._cells, self._lines.get_size())
+        self.screen.fill(self.COLORS['bg'], (0, 0, self.screen.get_width(), self.margin))
+        self.screen.fill(self.COLORS['bg'], (0, 0, self.margin, self.screen.get_height() - 80))
+        self.screen.blit(scaled, (self.margin, self.margin))
+        self.screen.blit(self._lines, (self.margin, self.margin))
+
+    def redraw(self):  # pragma: no cover - UI
+        """Surfarray mode: repaint the whole grid from the current buffer."""
+        self._changed = []
+        self._blit_all()
+        pygame.display.flip()
+
+    def set_cells(self, coords: Iterable[Coord], kind: str):
+        """Surfarray mode: recolor ``coords`` as ``kind`` (a key of KINDS) in the buffer.
+
+        Nothing is drawn until ``present``.
+        """
+        for r, c in self._set_index(coords, kind).tolist():
+            self._changed.append((r, c))
+
+    def present(self):  # pragma: no cover - UI
+        """Surfarray mode: draw cells changed by ``set_cells`` and update only their rects."""
+        changed, self._changed = self._changed, []
+        if not changed:
+            return
+        if len(changed) > self.PARTIAL_LIMIT:
+            self.redraw()
+            return
+        palette = [self.COLORS[kind] for kind in self.KINDS]
+        index = self._index
+        rects = [self._draw_cell(coord, palette[index[coord]]) for coord in dict.fromkeys(changed)]
+        pygame.display.update(rects)
 
     def draw_metrics(self, metrics):  # pragma: no cover - UI
         lines = [f"nodes: {metrics.nodes_expanded}", f"len: {metrics.path_length}",
@@ -0,0 +1,122 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from core.grid import Grid
+from core.metrics import Metrics
+
+Coord = Tuple[int, int]
+
+
+class CancelToken:
+    """Thread-safe flag a running search checks between expansion chunks."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+@dataclass
+class SearchUpdate:
+    """Message posted from the worker thread to the UI loop.
+
+    ``kind`` is 'progress' (more cells opened/closed), 'done' (``path`` is
+    final, empty if there is none), 'budget' (stopped at the time or node
+    budget) or 'error' (the search raised ``error``). A cancelled search
+    posts nothing further.
+    """
+
+    job: int
+    kind: str
+    opened: List[Coord] = field(default_factory=list)
+    closed: List[Coord] = field(default_factory=list)
+    path: List[Coord] = field(default_factory=list)
+    metrics: Optional[Metrics] = None
+    error: Optional[Exception] = None
+
+
+class SearchWorker:
+    """Runs one search at a time on a daemon thread.
+
+    The search is driven through ``Algorithm.stepper`` in chunks of ``chunk``
+    expansions; after each chunk the worker posts a progress update and
+    checks its cancel token and budget. ``cancel`` retires the current job
+    and starting a new search cancels the running one; ``poll`` drops
+    updates from retired jobs, so the UI never sees cells of a search it
+    has cancelled.
+    """
+
+    def __init__(self, chunk: int = 256) -> None:
+        self.chunk = chunk
+        self.updates: 'queue.Queue[SearchUpdate]' = queue.Queue()
+        self._job = 0
+        self._token: Optional[CancelToken] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._token.cancelled
+
+    def start(self, algorithm, grid: Grid, start: Coord, goal: Coord,
+              max_seconds: Optional[float] = None, max_nodes: Optional[int] = None) -> int:
+        """Cancel any running search and start a new one; returns its job id.
+
+        The grid is used from the worker thread, so pass a copy if the caller
+        keeps editing it.
+        """
+        self.cancel()
+        self._job += 1
+        self._token = CancelToken()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        args=(self._job, self._token, algorithm, grid, start, goal,
+                                              max_seconds, max_nodes))
+        self._thread.start()
+        return self._job
+
+    def cancel(self) -> None:
+        if self._token is not None:
+            self._token.cancel()
+            # updates the thread already queued belong to a retired job now
+            self._job += 1
+
+    def poll(self) -> List[SearchUpdate]:
+        """Drain pending updates of the current job without blocking."""
+        updates = []
+        while True:
+            try:
+                update = self.updates.get_nowait()
+            except queue.Empty:
+                return updates
+            if update.job == self._job:
+                updates.append(update)
+
+    def _run(self, job: int, token: CancelToken, algorithm, grid: Grid, start: Coord, goal: Coord,
+             max_seconds: Optional[float], max_nodes: Optional[int]) -> None:
+        post = self.updates.put
+        deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+        try:
+            stepper = algorithm.stepper(grid, start, goal)
+            while True:
+                delta = stepper.step(self.chunk)
+                post(SearchUpdate(job, 'progress', delta.opened, delta.closed))
+                if delta.done:
+                    post(SearchUpdate(job, 'done', path=delta.path, metrics=stepper.metrics))
+                    return
+                if token.cancelled:
+                    return
+                if ((deadline is not None and time.perf_counter() >= deadline) or
+                        (max_nodes is not None and stepper.metrics.nodes_expanded >= max_nodes)):
+                    post(SearchUpdate(job, 'budget', metrics=stepper.metrics))
+                    return
+        except Exception as exc:
+            # the thread would otherwise die silently and leave the UI waiting
+            post(SearchUpdate(job, 'error', error=exc))